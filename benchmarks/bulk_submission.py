@@ -0,0 +1,65 @@
+"""Compare per-note bundle generation with batched generation and hashing.
+
+Usage:
+    python benchmarks/bulk_submission.py [notes] [content_bytes] [hash_workers]
+"""
+
+import sys
+import threading
+import time
+
+import structlog
+from koi_net.components import KobjQueue
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote
+
+from koi_net_hackmd_sensor_node.batching import generate_bundles, push_bundles
+
+
+def make_items(count: int, content_bytes: int):
+    return [
+        (
+            HackMDNote(f"note{i:06d}", "bench"),
+            {"note_id": f"note{i:06d}", "title": f"Note {i}", "content": f"{i} " * (content_bytes // 2)},
+        )
+        for i in range(count)
+    ]
+
+
+def make_queue() -> KobjQueue:
+    return KobjQueue(log=structlog.stdlib.get_logger(), shutdown_signal=threading.Event())
+
+
+def per_note(items) -> float:
+    kobj_queue = make_queue()
+    start = time.perf_counter()
+    for rid, contents in items:
+        bundle = Bundle.generate(rid=rid, contents=contents)
+        kobj_queue.push(bundle=bundle)
+    return time.perf_counter() - start
+
+
+def batched(items, hash_workers: int) -> float:
+    kobj_queue = make_queue()
+    start = time.perf_counter()
+    push_bundles(kobj_queue, generate_bundles(items, hash_workers))
+    return time.perf_counter() - start
+
+
+def main():
+    notes = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    content_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    hash_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    items = make_items(notes, content_bytes)
+
+    results = {
+        "per-note push": per_note(items),
+        "batched, inline hashing": batched(items, 0),
+        f"batched, {hash_workers} hash workers": batched(items, hash_workers),
+    }
+    for label, seconds in results.items():
+        print(f"{label:<32} {seconds:8.3f}s  {notes / seconds:10.0f} notes/s")
+
+
+if __name__ == "__main__":
+    main()
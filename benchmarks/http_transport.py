@@ -0,0 +1,146 @@
+"""Compare HackMD client transport settings against the local fake API.
+
+Serves `FakeHackMDAPI` over real sockets on localhost with injected
+per-request latency, then fetches every note one request at a time
+(`get_note_metadata_for_ids`) under each transport profile:
+
+    python benchmarks/http_transport.py --notes 500 --content-bytes 16384 --latency 0.02
+
+The server is hypercorn when installed, which also lets the HTTP/2 profile
+run as h2c (prior knowledge, no TLS); otherwise uvicorn and HTTP/1.1 only.
+Loopback has no bandwidth limit, so the wire-bytes column is the figure
+that carries over to a real network for compression.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import logging
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+
+from koi_net_hackmd_sensor_node.fake_api import FakeHackMDAPI
+from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.http_options import HTTPOptions, http2_available
+
+PROFILES = [
+    # name, options, concurrent requests, h2c prior knowledge
+    ("http1 uncompressed c4", HTTPOptions(compression=False), 4, False),
+    ("http1 gzip c4 (default)", HTTPOptions(), 4, False),
+    ("http1 gzip c16", HTTPOptions(keepalive_expiry=30.0), 16, False),
+    ("h2c gzip c16", HTTPOptions(http2=True, keepalive_expiry=30.0), 16, True),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Fake API did not start on port {port}")
+
+
+def serve(app, port: int) -> tuple[str, threading.Event]:
+    """Run `app` on a background thread; returns the server name and a stop event."""
+    stop = threading.Event()
+    if importlib.util.find_spec("hypercorn"):
+        from hypercorn.asyncio import serve as hypercorn_serve
+        from hypercorn.config import Config
+
+        config = Config()
+        config.bind = [f"127.0.0.1:{port}"]
+        config.loglevel = "WARNING"
+
+        async def run():
+            trigger = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            threading.Thread(target=lambda: (stop.wait(), loop.call_soon_threadsafe(trigger.set)), daemon=True).start()
+            await hypercorn_serve(app, config, shutdown_trigger=trigger.wait)
+
+        threading.Thread(target=asyncio.run, args=(run(),), daemon=True).start()
+        name = "hypercorn"
+    else:
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        threading.Thread(target=lambda: (stop.wait(), setattr(server, "should_exit", True)), daemon=True).start()
+        name = "uvicorn"
+    wait_for_port(port)
+    return name, stop
+
+
+def run_profile(base_url: str, note_ids: list[str], options: HTTPOptions, concurrency: int, h2c: bool) -> dict:
+    wire_bytes = 0
+    versions: set[str] = set()
+
+    def count(response: httpx.Response):
+        nonlocal wire_bytes
+        response.read()
+        wire_bytes += response.num_bytes_downloaded
+        versions.add(response.http_version)
+
+    client = HackMDClient(
+        api_token="bench", base_url=base_url, max_concurrent_requests=concurrency,
+        http_options=options, log=logging.getLogger("bench"),
+    )
+    kwargs = client._http_client_kwargs()
+    if h2c:
+        # Plain-text HTTP/2 needs prior knowledge; TLS endpoints negotiate it via ALPN
+        client.client = httpx.Client(http1=False, **kwargs)
+    client.client.event_hooks["response"].append(count)
+
+    started = time.perf_counter()
+    fetched = client.get_note_metadata_for_ids(note_ids)
+    elapsed = time.perf_counter() - started
+    client.client.close()
+    assert len(fetched) == len(note_ids), f"fetched {len(fetched)} of {len(note_ids)}"
+    return {"notes_per_sec": len(note_ids) / elapsed, "wire_mb": wire_bytes / 1e6, "versions": versions}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--content-bytes", type=int, default=16384)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    api = FakeHackMDAPI(notes=args.notes, content_bytes=args.content_bytes, latency=args.latency)
+    port = free_port()
+    server_name, stop = serve(api.app(), port)
+    base_url = f"http://127.0.0.1:{port}/v1"
+    note_ids = list(api.notes)
+
+    print(f"{args.notes} notes of ~{args.content_bytes} bytes, {args.latency * 1000:.0f}ms latency, {server_name}")
+    print(f"{'profile':<26} {'notes/s':>10} {'wire MB':>9} {'protocol':>10}")
+    try:
+        for name, options, concurrency, h2c in PROFILES:
+            if h2c and (server_name != "hypercorn" or not http2_available()):
+                print(f"{name:<26} skipped (needs hypercorn and h2)")
+                continue
+            runs = [run_profile(base_url, note_ids, options, concurrency, h2c) for _ in range(args.repeats)]
+            rate = statistics.median(run["notes_per_sec"] for run in runs)
+            print(
+                f"{name:<26} {rate:>10.1f} {runs[-1]['wire_mb']:>9.2f} "
+                f"{','.join(sorted(runs[-1]['versions'])):>10}"
+            )
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
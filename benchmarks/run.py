@@ -0,0 +1,318 @@
+"""Benchmarks for the ingestion hot paths at several corpus sizes.
+
+Each (benchmark, size) pair runs in a fresh interpreter so peak RSS is
+per benchmark. Results are written as JSON and can be compared against a
+previous run:
+
+    python benchmarks/run.py --sizes 1000 10000 --output bench.json
+    python benchmarks/run.py --sizes 1000 10000 --compare bench.json --fail-on-regression 0.15
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import structlog
+from koi_net.components import KobjQueue
+from koi_net.protocol.event import EventType
+from koi_net.protocol.knowledge_object import KnowledgeObject
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote
+
+from koi_net_hackmd_sensor_node.config import HackMDConfig
+from koi_net_hackmd_sensor_node.fake_api import FakeHackMDAPI
+from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.handlers import hackmd_bundle_handler
+from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from koi_net_hackmd_sensor_node.metrics import HackMDMetrics
+from koi_net_hackmd_sensor_node.mock_loader import HackMDMockLoader
+from koi_net_hackmd_sensor_node.models import HackMDNoteObject
+from koi_net_hackmd_sensor_node.note_index import NoteIndex
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Timed repeats for benchmarks whose single op covers the whole corpus
+CORPUS_REPEATS = 5
+
+
+def corpus(size: int, content_bytes: int) -> FakeHackMDAPI:
+    return FakeHackMDAPI(notes=size, teams=["bench"], content_bytes=content_bytes)
+
+
+def payloads(api: FakeHackMDAPI) -> list[dict]:
+    return list(api.notes.values())
+
+
+def timed(op: Callable[[], object], repeats: int) -> list[int]:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        op()
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def timed_each(op: Callable[[object], object], items: list) -> list[int]:
+    latencies = []
+    for item in items:
+        start = time.perf_counter_ns()
+        op(item)
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def make_service(tmp: Path, api: FakeHackMDAPI, state_backend: str = "json") -> HackMDIngestionService:
+    config = types.SimpleNamespace(
+        env=types.SimpleNamespace(HACKMD_API_TOKEN="bench"),
+        hackmd=HackMDConfig(
+            workspace_id="bench",
+            max_notes_per_poll=len(api.notes),
+            state_path=str(tmp / "state" / "hackmd_state.json"),
+            state_backend=state_backend,
+            http_cache_path=None,
+            body_cache_path=None,
+        ),
+    )
+    kobj_queue = KobjQueue(log=structlog.stdlib.get_logger(), shutdown_signal=threading.Event())
+    service = HackMDIngestionService(config, kobj_queue)
+    service.client.client = httpx.Client(transport=api.transport())
+    return service
+
+
+def bench_parse_note(size, content_bytes, tmp):
+    records = payloads(corpus(size, content_bytes))
+    client = HackMDClient(api_token="bench", workspace_id="bench")
+    return timed_each(client._parse_note, records), 1
+
+
+def bench_model_validate(size, content_bytes, tmp):
+    records = payloads(corpus(size, content_bytes))
+    return timed_each(HackMDNoteObject.model_validate, records), 1
+
+
+def bench_poll_change_detection(size, content_bytes, tmp):
+    api = corpus(size, content_bytes)
+    service = make_service(tmp, api)
+    # Every note is already known, so each poll lists metadata and finds nothing
+    for note in api.notes.values():
+        service.state[f"bench/{note['id']}"] = note["lastChangedAt"]
+
+    def poll():
+        service.state["__cursor__/bench"] = 0
+        service.poll_once()
+
+    return timed(poll, CORPUS_REPEATS), size
+
+
+def bench_state(backend):
+    def bench(size, content_bytes, tmp):
+        api = corpus(size, content_bytes)
+        service = make_service(tmp, api, state_backend=backend)
+        keys = [f"bench/{note_id}" for note_id in api.notes]
+        for i, key in enumerate(keys):
+            service.state[key] = i
+        service._save_state()
+
+        touched = keys[: max(1, size // 100)]
+
+        def save():
+            for key in touched:
+                service.state[key] += 1
+            service._save_state()
+
+        save_latencies = timed(save, CORPUS_REPEATS)
+        service.state.close()
+        load_latencies = timed(lambda: service._load_state().close(), CORPUS_REPEATS)
+        return {"save": (save_latencies, size), "load": (load_latencies, size)}
+
+    return bench
+
+
+def bench_bundle_generate(size, content_bytes, tmp):
+    records = payloads(corpus(size, content_bytes))
+    items = [(HackMDNote(r["id"], r["teamPath"]), r) for r in records]
+    return timed_each(lambda item: Bundle.generate(rid=item[0], contents=item[1]), items), 1
+
+
+def bench_bundle_handler(size, content_bytes, tmp):
+    records = payloads(corpus(size, content_bytes))
+    bundles = [Bundle.generate(rid=HackMDNote(r["id"], r["teamPath"]), contents=r) for r in records]
+
+    class MemoryCache:
+        def __init__(self, bundles):
+            self.entries = {b.rid: b for b in bundles}
+
+        def read(self, rid):
+            return self.entries.get(rid)
+
+        def list_rids(self, rid_types=None):
+            return list(self.entries)
+
+    # Half the corpus is already cached, so the handler sees a mix of stale and new notes
+    cache = MemoryCache(bundles[: size // 2])
+    ctx = types.SimpleNamespace(cache=cache, note_index=NoteIndex(cache), metrics=HackMDMetrics())
+    ctx.note_index.warm()
+    kobjs = [KnowledgeObject.from_bundle(b, event_type=EventType.UPDATE) for b in bundles]
+    return timed_each(lambda kobj: hackmd_bundle_handler(ctx, kobj), kobjs), 1
+
+
+def bench_mock_loader(size, content_bytes, tmp):
+    records = payloads(corpus(size, content_bytes))
+    mock_dir = tmp / "mock"
+    mock_dir.mkdir()
+    for record in records:
+        rid = HackMDNote(record["id"], record["teamPath"])
+        bundle = Bundle.generate(rid=rid, contents=record)
+        (mock_dir / f"{record['id']}.json").write_text(bundle.model_dump_json())
+
+    def load():
+        kobj_queue = KobjQueue(log=structlog.stdlib.get_logger(), shutdown_signal=threading.Event())
+        loader = HackMDMockLoader(str(mock_dir), kobj_queue)
+        assert loader.load_all() == size
+
+    return timed(load, CORPUS_REPEATS), size
+
+
+BENCHMARKS = {
+    "parse_note": bench_parse_note,
+    "model_validate": bench_model_validate,
+    "poll_change_detection": bench_poll_change_detection,
+    "state_json": bench_state("json"),
+    "state_sqlite": bench_state("sqlite"),
+    "bundle_generate": bench_bundle_generate,
+    "bundle_handler": bench_bundle_handler,
+    "mock_loader": bench_mock_loader,
+}
+
+
+def summarize(name: str, size: int, latencies: list[int], items_per_op: int) -> dict:
+    latencies = sorted(latencies)
+    total = sum(latencies) / 1e9
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "name": name,
+        "size": size,
+        "ops": len(latencies),
+        "items_per_op": items_per_op,
+        "ops_per_sec": len(latencies) / total if total else None,
+        "items_per_sec": len(latencies) * items_per_op / total if total else None,
+        "p50_ms": quantiles[49] / 1e6,
+        "p99_ms": quantiles[98] / 1e6,
+    }
+
+
+def run_single(name: str, size: int, content_bytes: int) -> list[dict]:
+    """Run one benchmark in this process and return its result rows."""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        outcome = BENCHMARKS[name](size, content_bytes, Path(tmp))
+    if isinstance(outcome, tuple):
+        outcome = {"": outcome}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    rows = []
+    for suffix, (latencies, items_per_op) in outcome.items():
+        row = summarize(f"{name}.{suffix}" if suffix else name, size, latencies, items_per_op)
+        row["peak_rss_mb"] = peak_mb
+        rows.append(row)
+    return rows
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> list[str]:
+    """Print throughput changes against a baseline file; returns regressed rows."""
+    baseline = {(r["name"], r["size"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<28} {'size':>8} {'items/s':>12} {'baseline':>12} {'change':>8}")
+    for row in results:
+        base = baseline.get((row["name"], row["size"]))
+        if not base or not base["items_per_sec"] or not row["items_per_sec"]:
+            continue
+        change = row["items_per_sec"] / base["items_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(f"{row['name']}@{row['size']}")
+        print(
+            f"{row['name']:<28} {row['size']:>8} {row['items_per_sec']:>12.0f} "
+            f"{base['items_per_sec']:>12.0f} {change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--content-bytes", type=int, default=4096, help="note body size")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="FRACTION",
+                        help="exit non-zero if items/s drops by more than this fraction")
+    parser.add_argument("--single", nargs=2, metavar=("NAME", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        name, size = args.single
+        print(json.dumps(run_single(name, int(size), args.content_bytes)))
+        return
+
+    results = []
+    print(f"{'benchmark':<28} {'size':>8} {'items/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'rss MB':>8}")
+    for name in args.only or BENCHMARKS:
+        for size in args.sizes:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--single", name, str(size), "--content-bytes", str(args.content_bytes)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode:
+                print(f"{name:<28} {size:>8} failed:\n{proc.stderr}", file=sys.stderr)
+                continue
+            for row in json.loads(proc.stdout.strip().splitlines()[-1]):
+                results.append(row)
+                print(
+                    f"{row['name']:<28} {row['size']:>8} {row['items_per_sec']:>12.0f} "
+                    f"{row['p50_ms']:>10.3f} {row['p99_ms']:>10.3f} {row['peak_rss_mb']:>8.1f}"
+                )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "content_bytes": args.content_bytes,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.fail_on_regression or 0.1)
+        if regressions and args.fail_on_regression is not None:
+            print(f"\nRegressed: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+from .metrics import HackMDMetrics
+
+
+class QueueBackpressure:
+    """Pauses ingestion while the kobj queue is backed up.
+
+    `depth` reports the current number of queued knowledge objects (or None
+    when it can't be measured). Once the depth reaches `high_water`, `wait`
+    blocks until the kobj worker has drained it to `low_water`, so a large
+    first sync can't outrun the pipeline. A `high_water` of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        depth: Callable[[], int | None],
+        high_water: int,
+        low_water: int | None = None,
+        check_interval: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: HackMDMetrics | None = None,
+    ):
+        self.depth = depth
+        self.high_water = max(0, high_water)
+        if low_water is None:
+            low_water = self.high_water // 4
+        self.low_water = min(max(0, low_water), self.high_water)
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.metrics = metrics
+
+        # Reporting
+        self.pauses = 0
+        self.wait_seconds = 0.0
+        self.max_depth = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.high_water > 0
+
+    def _should_pause(self) -> bool:
+        depth = self.depth() if self.enabled else None
+        if depth is None:
+            return False
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+        return depth >= self.high_water
+
+    def _drained(self) -> bool:
+        depth = self.depth()
+        return depth is None or depth <= self.low_water
+
+    def _record(self, started: float) -> float:
+        waited = self._clock() - started
+        with self._lock:
+            self.pauses += 1
+            self.wait_seconds += waited
+        if self.metrics:
+            self.metrics.backpressure_pauses.inc()
+            self.metrics.backpressure_wait.inc(waited)
+        return waited
+
+    def wait(self, stop_event: threading.Event | None = None) -> float:
+        """Block while the queue is above the high-water mark; returns seconds waited."""
+        if not self._should_pause():
+            return 0.0
+        started = self._clock()
+        stop_event = stop_event or threading.Event()
+        while not self._drained():
+            if stop_event.wait(self.check_interval):
+                break
+        return self._record(started)
+
+    async def wait_async(self) -> float:
+        """Async counterpart of `wait`, yielding to the event loop between checks."""
+        if not self._should_pause():
+            return 0.0
+        started = self._clock()
+        while not self._drained():
+            await asyncio.sleep(self.check_interval)
+        return self._record(started)
+
+    def stats(self) -> dict[str, Any]:
+        """Backpressure snapshot for reporting."""
+        with self._lock:
+            return {
+                "depth": self.depth() if self.enabled else None,
+                "max_depth": self.max_depth,
+                "high_water": self.high_water,
+                "low_water": self.low_water,
+                "pauses": self.pauses,
+                "wait_seconds": self.wait_seconds,
+            }
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import structlog
+from rid_lib.core import RID
+from rid_lib.ext import Bundle
+
+log = structlog.stdlib.get_logger()
+
+
+def generate_bundles(
+    items: list[tuple[RID, dict[str, Any]]], hash_workers: int = 0
+) -> list[Bundle | None]:
+    """Build bundles (and their manifest hashes) for `items`, keeping order.
+
+    With `hash_workers` > 1 manifests are hashed on a thread pool. Hashing
+    is dominated by JSON serialization, which holds the GIL, so this only
+    helps on free-threaded interpreters; inline hashing is the default.
+    Items that fail to serialize come back as None.
+    """
+
+    def generate(item: tuple[RID, dict[str, Any]]) -> Bundle | None:
+        rid, contents = item
+        try:
+            return Bundle.generate(rid=rid, contents=contents)
+        except Exception as e:
+            log.error(f"Failed to generate bundle for {rid}: {e}")
+            return None
+
+    workers = min(hash_workers, len(items))
+    if workers <= 1:
+        return [generate(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hackmd-hash") as pool:
+        return list(pool.map(generate, items))
+
+
+def push_bundles(kobj_queue, bundles: list[Bundle]) -> list[bool]:
+    """Push `bundles` to the kobj queue in order.
+
+    Returns whether each bundle was accepted, in order. Rejections are
+    logged once for the whole batch.
+    """
+    accepted = []
+    failures: list[tuple[Bundle, Exception]] = []
+    for bundle in bundles:
+        try:
+            kobj_queue.push(bundle=bundle)
+            accepted.append(True)
+        except Exception as e:
+            failures.append((bundle, e))
+            accepted.append(False)
+    if failures:
+        bundle, error = failures[0]
+        log.error(
+            f"Failed to queue {len(failures)} of {len(bundles)} bundles "
+            f"(first: {bundle.rid}: {error})"
+        )
+    return accepted
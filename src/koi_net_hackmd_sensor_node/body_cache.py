@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+class NoteBodyCache:
+    """Disk-backed, content-addressed cache of emitted note records.
+
+    Blobs are stored once per content hash under `blobs/` and indexed by note
+    RID in a small SQLite database. The total blob size is kept under
+    `max_bytes` by evicting least recently used blobs, so memory and disk use
+    stay bounded regardless of workspace size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        log: logging.Logger = logging.getLogger(__name__),
+    ):
+        self.path = Path(path)
+        self.max_bytes = max(0, max_bytes)
+        self.log = log
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.path / "blobs", exist_ok=True)
+        self._db = sqlite3.connect(self.path / "index.sqlite3", check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                rid TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                last_changed_at INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+            """
+        )
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.path / "blobs" / digest[:2] / digest
+
+    def get(self, rid: str, last_changed_at: int | None = None) -> dict[str, Any] | None:
+        """Return cached contents for `rid`, optionally only if they match `last_changed_at`."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, last_changed_at FROM notes WHERE rid = ?", (rid,)
+            ).fetchone()
+            if not row or (last_changed_at is not None and row[1] != last_changed_at):
+                self.misses += 1
+                return None
+            digest = row[0]
+            try:
+                with open(self._blob_path(digest), "rb") as f:
+                    contents = json.loads(f.read())
+            except (OSError, ValueError) as e:
+                self.log.warning(f"Dropping unreadable body cache blob {digest}: {e}")
+                self._drop_blob(digest)
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+            self._db.commit()
+            self.hits += 1
+            return contents
+
+    def put(self, rid: str, contents: dict[str, Any]) -> str:
+        """Store `contents` for `rid` and return its content hash."""
+        data = json.dumps(contents, sort_keys=True, separators=(",", ":")).encode()
+        digest = hashlib.sha256(data).hexdigest()
+        last_changed_at = contents.get("last_changed_at")
+
+        with self._lock:
+            exists = self._db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not exists:
+                blob_path = self._blob_path(digest)
+                os.makedirs(blob_path.parent, exist_ok=True)
+                tmp = blob_path.with_suffix(f".{threading.get_ident()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, blob_path)
+                self._total_bytes += len(data)
+            self._db.execute(
+                "INSERT INTO blobs (digest, size, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access",
+                (digest, len(data), time.time()),
+            )
+            self._db.execute(
+                "INSERT INTO notes (rid, digest, last_changed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(rid) DO UPDATE SET digest = excluded.digest, "
+                "last_changed_at = excluded.last_changed_at",
+                (rid, digest, last_changed_at),
+            )
+            self._evict()
+            self._db.commit()
+        return digest
+
+    def _drop_blob(self, digest: str):
+        row = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            self._total_bytes -= row[0]
+        self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        self._db.execute("DELETE FROM notes WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT digest FROM blobs ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            self._drop_blob(row[0])
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._total_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
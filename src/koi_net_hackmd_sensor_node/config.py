@@ -12,36 +12,164 @@ from koi_net.config import (
 from pydantic import BaseModel, Field, model_validator
 from rid_lib.types import KoiNetNode, HackMDNote
 
+from .delta import HackMDNoteDelta
+from .sections import HackMDNoteSection
+
 
 class HackMDEnvConfig(EnvConfig):
     HACKMD_API_TOKEN: str = "HACKMD_API_TOKEN"
+    HACKMD_API_BASE_URL: str = "HACKMD_API_BASE_URL"
     HACKMD_WORKSPACE_ID: str = "HACKMD_WORKSPACE_ID"
+    HACKMD_WORKSPACE_IDS: str = "HACKMD_WORKSPACE_IDS"
     HACKMD_NOTE_IDS: str = "HACKMD_NOTE_IDS"
     HACKMD_POLL_INTERVAL_SECONDS: str = "HACKMD_POLL_INTERVAL_SECONDS"
     HACKMD_MAX_NOTES_PER_POLL: str = "HACKMD_MAX_NOTES_PER_POLL"
+    HACKMD_PAGE_SIZE: str = "HACKMD_PAGE_SIZE"
     HACKMD_STATE_PATH: str = "HACKMD_STATE_PATH"
+    HACKMD_STATE_BACKEND: str = "HACKMD_STATE_BACKEND"
+    HACKMD_CHECKPOINT_BATCH_SIZE: str = "HACKMD_CHECKPOINT_BATCH_SIZE"
+    HACKMD_ADAPTIVE_POLLING: str = "HACKMD_ADAPTIVE_POLLING"
+    HACKMD_ADAPTIVE_MIN_INTERVAL_SECONDS: str = "HACKMD_ADAPTIVE_MIN_INTERVAL_SECONDS"
+    HACKMD_ADAPTIVE_MAX_INTERVAL_SECONDS: str = "HACKMD_ADAPTIVE_MAX_INTERVAL_SECONDS"
     HACKMD_RETRIES: str = "HACKMD_RETRIES"
     HACKMD_BACKOFF_BASE_SECONDS: str = "HACKMD_BACKOFF_BASE_SECONDS"
     HACKMD_BACKOFF_MAX_SECONDS: str = "HACKMD_BACKOFF_MAX_SECONDS"
+    HACKMD_MAX_CONCURRENT_REQUESTS: str = "HACKMD_MAX_CONCURRENT_REQUESTS"
+    HACKMD_ASYNC_MODE: str = "HACKMD_ASYNC_MODE"
+    HACKMD_RATE_LIMIT_PER_SECOND: str = "HACKMD_RATE_LIMIT_PER_SECOND"
+    HACKMD_HTTP_CACHE_PATH: str = "HACKMD_HTTP_CACHE_PATH"
+    HACKMD_HTTP_CACHE_MAX_BYTES: str = "HACKMD_HTTP_CACHE_MAX_BYTES"
+    HACKMD_BODY_CACHE_PATH: str = "HACKMD_BODY_CACHE_PATH"
+    HACKMD_BODY_CACHE_MAX_BYTES: str = "HACKMD_BODY_CACHE_MAX_BYTES"
+    HACKMD_DELTA_MODE: str = "HACKMD_DELTA_MODE"
+    HACKMD_DELTA_SNAPSHOT_EVERY: str = "HACKMD_DELTA_SNAPSHOT_EVERY"
+    HACKMD_DELTA_MIN_BYTES: str = "HACKMD_DELTA_MIN_BYTES"
+    HACKMD_SECTION_CHUNKING: str = "HACKMD_SECTION_CHUNKING"
+    HACKMD_SECTION_MAX_LEVEL: str = "HACKMD_SECTION_MAX_LEVEL"
+    HACKMD_BUNDLE_HASH_WORKERS: str = "HACKMD_BUNDLE_HASH_WORKERS"
+    HACKMD_QUEUE_HIGH_WATER: str = "HACKMD_QUEUE_HIGH_WATER"
+    HACKMD_QUEUE_LOW_WATER: str = "HACKMD_QUEUE_LOW_WATER"
+    HACKMD_WEBHOOK_ENABLED: str = "HACKMD_WEBHOOK_ENABLED"
+    HACKMD_WEBHOOK_SECRET: str = "HACKMD_WEBHOOK_SECRET"
+    HACKMD_WEBHOOK_DEBOUNCE_SECONDS: str = "HACKMD_WEBHOOK_DEBOUNCE_SECONDS"
+    HACKMD_WEBHOOK_MAX_WAIT_SECONDS: str = "HACKMD_WEBHOOK_MAX_WAIT_SECONDS"
+    HACKMD_RECONCILE_INTERVAL_SECONDS: str = "HACKMD_RECONCILE_INTERVAL_SECONDS"
+    HACKMD_METRICS_ENABLED: str = "HACKMD_METRICS_ENABLED"
+    HACKMD_PROFILING_ENABLED: str = "HACKMD_PROFILING_ENABLED"
+    HACKMD_PROFILE_DIR: str = "HACKMD_PROFILE_DIR"
+    HACKMD_PROFILE_TOKEN: str = "HACKMD_PROFILE_TOKEN"
+    HACKMD_HTTP2: str = "HACKMD_HTTP2"
+    HACKMD_HTTP_COMPRESSION: str = "HACKMD_HTTP_COMPRESSION"
+    HACKMD_HTTP_MAX_CONNECTIONS: str = "HACKMD_HTTP_MAX_CONNECTIONS"
+    HACKMD_HTTP_KEEPALIVE_EXPIRY_SECONDS: str = "HACKMD_HTTP_KEEPALIVE_EXPIRY_SECONDS"
+    HACKMD_HTTP_READ_TIMEOUT_SECONDS: str = "HACKMD_HTTP_READ_TIMEOUT_SECONDS"
     COORDINATOR_RID: str = "COORDINATOR_RID"
     COORDINATOR_URL: str = "COORDINATOR_URL"
     # Mock data configuration
     USE_MOCK_DATA: str = "USE_MOCK_DATA"
     MOCK_DATA_PATH: str = "MOCK_DATA_PATH"
+    MOCK_FORGET_DELETED: str = "MOCK_FORGET_DELETED"
+    MOCK_FAST_LOAD: str = "MOCK_FAST_LOAD"
+    MOCK_LOAD_WORKERS: str = "MOCK_LOAD_WORKERS"
+    MOCK_LOAD_BATCH_SIZE: str = "MOCK_LOAD_BATCH_SIZE"
 
 class HackMDConfig(BaseModel):
+    # HackMD API root; point at a local `fake_api` server for offline load tests
+    api_base_url: str = "https://api.hackmd.io/v1"
     workspace_id: str | None = None
+    # Several teams polled by one service; takes precedence over workspace_id
+    workspace_ids: list[str] | None = None
     note_ids: list[str] | None = None
     poll_interval_seconds: int = 300
+    # Per-note intervals from observed change frequency (note_ids mode only)
+    adaptive_polling: bool = False
+    adaptive_min_interval_seconds: float = 15.0
+    adaptive_max_interval_seconds: float = 3600.0
+    # Notes listed per poll; larger listings resume from a stored cursor next poll
     max_notes_per_poll: int = 100
+    page_size: int = 100
     state_path: str = "./state/hackmd_state.json"
+    # "json" (whole-file rewrite) or "sqlite" (WAL, per-note upserts; imports state_path on first start)
+    state_backend: str = "json"
+    # Notes fetched and queued between state checkpoints within a poll
+    checkpoint_batch_size: int = 50
     retries: int = 3
     backoff_base_seconds: float = 1.0
     backoff_max_seconds: float = 10.0
+    max_concurrent_requests: int = 4
+    # Run ingestion as a task on the node server's event loop instead of a thread
+    async_mode: bool = False
+    # Static request pacing until HackMD's rate-limit headers are observed
+    rate_limit_per_second: float | None = None
+    # HTTP/2 multiplexing; needs the `transport` extra (h2), else HTTP/1.1 is used
+    http2: bool = False
+    # Ask for compressed bodies (gzip/deflate; br with the `transport` extra)
+    http_compression: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    # Idle pooled connections are closed after this long
+    http_keepalive_expiry_seconds: float = 5.0
+    http_connect_timeout_seconds: float = 30.0
+    http_read_timeout_seconds: float = 60.0
+    http_write_timeout_seconds: float = 30.0
+    http_pool_timeout_seconds: float = 30.0
+    # Read timeout per API route, overriding http_read_timeout_seconds:
+    # "/notes", "/notes/{id}", "/teams/{team}/notes"
+    http_endpoint_timeouts: dict[str, float] | None = None
+    # ETag/Last-Modified validators and bodies for conditional note fetches; opt-in
+    http_cache_path: str | None = None
+    # Least recently used entries are evicted past this size
+    http_cache_max_bytes: int = 64 * 1024 * 1024
+    # Content-addressed cache of emitted notes, LRU-evicted past the byte budget; opt-in
+    body_cache_path: str | None = None
+    body_cache_max_bytes: int = 256 * 1024 * 1024
+    # Send HackMDNoteDelta subscribers line patches instead of full notes (needs the body cache)
+    delta_mode: bool = False
+    # Full snapshot after this many revisions of a note, so receivers can resync
+    delta_snapshot_every: int = 20
+    # Notes smaller than this are always sent in full
+    delta_min_bytes: int = 16384
+    # Also emit a bundle per heading-delimited section, only for sections that changed
+    section_chunking: bool = False
+    # Deepest heading level that starts a new section
+    section_max_level: int = 3
+    # Threads hashing bundle manifests for a batch of notes; 0 hashes inline
+    bundle_hash_workers: int = 0
+    # Pause fetching at this kobj queue depth until drained to queue_low_water; 0 disables
+    queue_high_water: int = 1000
+    queue_low_water: int = 250
+    # Signed webhook route on the node server; polling drops to reconcile_interval_seconds
+    webhook_enabled: bool = False
+    webhook_path: str = "/hackmd/webhook"
+    # Shared secret for the X-HackMD-Signature HMAC-SHA256 header; required
+    webhook_secret: str | None = None
+    # Events for the same note within this window are fetched once
+    webhook_debounce_seconds: float = 2.0
+    # A note edited continuously is still fetched this long after its first event
+    webhook_max_wait_seconds: float = 30.0
+    reconcile_interval_seconds: int = 3600
+    # Prometheus text metrics for polls, HackMD requests, state commits and the handler
+    metrics_enabled: bool = True
+    metrics_path: str = "/metrics"
+    # POST /hackmd/profile?polls=N (or SIGUSR2) samples the next polls into profile_dir
+    profiling_enabled: bool = False
+    profile_dir: str = "./state/profiles"
+    # Bearer token required by the profile route, which stays unmounted without one
+    profile_token: str | None = None
+    # Polls profiled per SIGUSR2
+    profile_polls: int = 1
     # Mock data configuration
     use_mock_data: bool = False
     mock_data_path: str | None = None
     mock_poll_interval_seconds: int = 60
+    # Forget notes whose mock file was deleted between scans
+    mock_forget_deleted: bool = False
+    # Take RIDs from base64 RID filenames and read files on mock_load_workers threads;
+    # mock_data_path may also be (or contain) NDJSON/JSONL bundle dumps
+    mock_fast_load: bool = False
+    mock_load_workers: int = 8
+    # Mock notes parsed and queued per batch, bounding loader memory
+    mock_load_batch_size: int = 1000
 
 class HackMDSensorConfig(FullNodeConfig):
     hackmd: HackMDConfig = Field(default_factory=HackMDConfig)
@@ -50,8 +178,8 @@ class HackMDSensorConfig(FullNodeConfig):
         node_name="hackmd_sensor",
         node_profile=FullNodeProfile(
             provides=NodeProvides(
-                event=[HackMDNote],
-                state=[HackMDNote, KoiNetNode]
+                event=[HackMDNote, HackMDNoteSection, HackMDNoteDelta],
+                state=[HackMDNote, HackMDNoteSection, HackMDNoteDelta, KoiNetNode]
             ),
         ),
         rid_types_of_interest=[KoiNetNode],
@@ -2,7 +2,10 @@ from koi_net.core import FullNode
 
 from . import handlers
 from .config import HackMDSensorConfig
+from .delta import DeltaEvents
 from .ingestion import HackMDIngestionService
+from .metrics import HackMDMetrics
+from .note_index import NoteIndex
 
 
 class HackMDSensorNode(FullNode):
@@ -10,6 +13,10 @@ class HackMDSensorNode(FullNode):
     suppress_peer_node_rebroadcast_handler = (
         handlers.SuppressPeerNodeRebroadcastHandler
     )
+    note_index: NoteIndex = NoteIndex
+    metrics: HackMDMetrics = HackMDMetrics
+    delta_events: DeltaEvents = DeltaEvents
     hackmd_bundle_handler = handlers.HackMDBundleHandler
+    hackmd_delta_event_handler = handlers.HackMDDeltaEventHandler
     hackmd_logging_handler = handlers.HackMDLoggingHandler
     ingestion_service: HackMDIngestionService = HackMDIngestionService
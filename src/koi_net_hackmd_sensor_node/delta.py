@@ -0,0 +1,222 @@
+import difflib
+import hashlib
+import json
+import threading
+from typing import Any
+
+from rid_lib.core import ORN
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote
+
+from .models import HackMDNoteDeltaObject
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def diff_lines(old: str, new: str) -> list[list[Any]]:
+    """Line-based ops turning `old` into `new`.
+
+    Ops are applied in order to the lines of `old`: `["=", n]` keeps the next
+    n lines, `["-", n]` drops them and `["+", lines]` inserts new lines (each
+    with its line ending).
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops: list[list[Any]] = []
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append(["-", i2 - i1])
+        if j2 > j1:
+            ops.append(["+", new_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(base: str, ops: list[list[Any]]) -> str:
+    """Rebuild content from `base` and ops produced by `diff_lines`."""
+    lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    for op, arg in ops:
+        if op == "=":
+            out.extend(lines[pos:pos + arg])
+            pos += arg
+        elif op == "-":
+            pos += arg
+        elif op == "+":
+            out.extend(arg)
+        else:
+            raise ValueError(f"Unknown delta op: {op!r}")
+    return "".join(out)
+
+
+class HackMDNoteDelta(ORN):
+    """The latest content delta emitted for a HackMD note.
+
+    Shares its reference with the note, so each note has one delta RID
+    whose bundle is replaced on every delta revision.
+    """
+    namespace = "hackmd.note.delta"
+
+    def __init__(self, note_id: str, workspace_id: str | None = None):
+        self.note_id = note_id
+        self.workspace_id = workspace_id
+
+    @property
+    def reference(self) -> str:
+        if self.workspace_id:
+            return f"{self.workspace_id}/{self.note_id}"
+        return self.note_id
+
+    @classmethod
+    def from_reference(cls, reference: str) -> "HackMDNoteDelta":
+        if "/" in reference:
+            workspace_id, note_id = reference.split("/", 1)
+            return cls(note_id=note_id, workspace_id=workspace_id)
+        return cls(note_id=reference)
+
+    @property
+    def note_rid(self) -> HackMDNote:
+        return HackMDNote(self.note_id, self.workspace_id)
+
+
+def delta_bundle(
+    note_rid: HackMDNote,
+    base: Bundle,
+    target: Bundle,
+    delta: dict[str, Any],
+) -> Bundle:
+    """Bundle carrying `delta` from the note bundle `base` to `target`.
+
+    `base_sha256` and `sha256` are the manifest hashes of the two note
+    bundles, so a receiver can check it holds the base before applying the
+    patch and verify the note it rebuilds.
+    """
+    return Bundle.generate(
+        rid=HackMDNoteDelta(note_rid.note_id, note_rid.workspace_id),
+        contents={
+            "note_rid": str(note_rid),
+            "base_sha256": base.manifest.sha256_hash,
+            "sha256": target.manifest.sha256_hash,
+            **delta,
+            "note": {**target.contents, "content": None},
+        },
+    )
+
+
+def apply_note_delta(base: Bundle, delta: dict[str, Any] | HackMDNoteDeltaObject) -> Bundle:
+    """Rebuild the note bundle a delta bundle's contents describe.
+
+    Raises ValueError if `base` is not the bundle the delta was made
+    against, or if the rebuilt note does not match; receivers should then
+    fetch the full note bundle instead.
+    """
+    delta = HackMDNoteDeltaObject.model_validate(delta)
+    if base.manifest.sha256_hash != delta.base_sha256:
+        raise ValueError(f"Delta for {base.rid} does not apply to the cached revision")
+    content = apply_delta(base.contents.get("content") or "", delta.ops)
+    bundle = Bundle.generate(rid=base.rid, contents={**delta.note, "content": content})
+    if bundle.manifest.sha256_hash != delta.sha256:
+        raise ValueError(f"Rebuilt note for {base.rid} does not match the delta")
+    return bundle
+
+
+class DeltaEncoder:
+    """Chooses between full snapshots and content deltas for note events.
+
+    A note revision gets a delta only when the previously emitted content
+    is known, the body is at least `min_bytes`, the patch is smaller than the
+    body and fewer than `snapshot_every` revisions have passed since the last
+    full snapshot. Deltas carry `content_hash` so receivers can verify what
+    they rebuild with `apply_delta`.
+    """
+
+    def __init__(self, snapshot_every: int = 20, min_bytes: int = 16384):
+        self.snapshot_every = max(1, snapshot_every)
+        self.min_bytes = max(0, min_bytes)
+        self._lock = threading.Lock()
+        # Revisions emitted per RID since its last full snapshot
+        self._since_snapshot: dict[str, int] = {}
+        self.deltas = 0
+        self.snapshots = 0
+        self.bytes_saved = 0
+
+    def encode(
+        self,
+        rid: str,
+        contents: dict[str, Any],
+        previous: dict[str, Any] | None,
+    ) -> dict[str, Any] | None:
+        """Patch from the last full contents emitted for `rid`, or None for a snapshot."""
+        content = contents.get("content") or ""
+        base = previous.get("content") if previous else None
+
+        with self._lock:
+            count = self._since_snapshot.get(rid)
+            size = len(content.encode())
+            if (
+                base is not None
+                and count is not None
+                and count + 1 < self.snapshot_every
+                and size >= self.min_bytes
+            ):
+                ops = diff_lines(base, content)
+                patch_size = len(json.dumps(ops).encode())
+                if patch_size < size:
+                    self._since_snapshot[rid] = count + 1
+                    self.deltas += 1
+                    self.bytes_saved += size - patch_size
+                    return {
+                        "content_hash": content_hash(content),
+                        "base_hash": content_hash(base),
+                        "ops": ops,
+                    }
+
+            self._since_snapshot[rid] = 0
+            self.snapshots += 1
+            return None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "deltas": self.deltas,
+                "snapshots": self.snapshots,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+class DeltaEvents:
+    """Delta bundles waiting for their note bundle's network phase.
+
+    The ingestion service always queues full note bundles, so the node
+    cache, bundle fetches and the note's own events see the whole note.
+    Delta bundles are parked here keyed by note RID and the full bundle's
+    manifest hash; once that revision is cached, the network handler queues
+    the delta for subscribers of `HackMDNoteDelta`. An entry for an older
+    revision is replaced by the next one, so at most one is kept per note.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[Any, tuple[str, Bundle]] = {}
+
+    def put(self, rid, manifest_hash: str, bundle: Bundle):
+        with self._lock:
+            self._pending[rid] = (manifest_hash, bundle)
+
+    def pop(self, rid, manifest_hash: str) -> Bundle | None:
+        """Delta bundle for this exact revision of `rid`, if any."""
+        with self._lock:
+            entry = self._pending.get(rid)
+            if entry is None or entry[0] != manifest_hash:
+                return None
+            del self._pending[rid]
+            return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,345 @@
+"""
+Local stand-in for the HackMD API, for offline load and retry testing.
+
+Serves `/v1/notes`, `/v1/notes/{id}` and `/v1/teams/{team}/notes` from a
+generated corpus, with optional latency, rate limiting (429 + Retry-After),
+5xx bursts and random edits over time. Use it in-process through
+`FakeHackMDAPI.transport()` / `async_transport()`, or as a local server:
+
+    python -m koi_net_hackmd_sensor_node.fake_api --port 8765 --notes 10000
+
+and point the node at it with `HACKMD_API_BASE_URL=http://127.0.0.1:8765/v1`.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import httpx
+
+API_PREFIX = "/v1"
+
+
+@dataclass
+class FakeResponse:
+    status: int
+    body: Any = None
+    headers: dict[str, str] = field(default_factory=dict)
+    # Injected latency the transport should wait before answering
+    delay: float = 0.0
+
+
+class FakeHackMDAPI:
+    """Generated HackMD corpus behind configurable failure modes.
+
+    Notes are spread round-robin across `teams` (or all owned by the user
+    when there are none). `rate_limit` requests are allowed per
+    `rate_window` seconds, with HackMD's rate-limit headers on every
+    response. Each request starts a burst of `error_burst` 503s with
+    probability `error_rate`. `edit_rate` notes per second get an appended
+    line and a newer `lastChangedAt`.
+    """
+
+    def __init__(
+        self,
+        notes: int = 100,
+        teams: list[str] | tuple[str, ...] = (),
+        content_bytes: int = 2048,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        rate_limit: int | None = None,
+        rate_window: float = 60.0,
+        error_rate: float = 0.0,
+        error_burst: int = 3,
+        edit_rate: float = 0.0,
+        seed: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.teams = list(teams)
+        self.latency = max(0.0, latency)
+        self.latency_jitter = max(0.0, latency_jitter)
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.error_burst = max(1, error_burst)
+        self.edit_rate = edit_rate
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        now = self._now_ms()
+        owners = self.teams or [None]
+        self.notes: dict[str, dict[str, Any]] = {}
+        for i in range(notes):
+            note_id = hashlib.sha1(f"{seed}/{i}".encode()).hexdigest()[:22]
+            self.notes[note_id] = self._generate_note(
+                note_id, i, owners[i % len(owners)], content_bytes, now - (notes - i) * 1000
+            )
+        self._order = list(self.notes)
+        self._by_owner: dict[str | None, list[str]] = {}
+        for note_id, note in self.notes.items():
+            self._by_owner.setdefault(note["teamPath"], []).append(note_id)
+
+        self._window_start = self._clock()
+        self._window_count = 0
+        self._errors_left = 0
+        self._last_edit = self._clock()
+
+        # Reporting
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.edits = 0
+        self.not_modified = 0
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000)
+
+    @staticmethod
+    def _generate_note(
+        note_id: str, index: int, team: str | None, content_bytes: int, changed_at: int
+    ) -> dict[str, Any]:
+        lines = [f"# Note {index}", ""]
+        section = 0
+        while sum(len(line) + 1 for line in lines) < content_bytes:
+            section += 1
+            lines += [f"## Section {section}", "", f"Generated paragraph {section} of note {note_id}.", ""]
+        return {
+            "id": note_id,
+            "title": f"Note {index}",
+            "tags": ["fake", f"group-{index % 10}"],
+            "createdAt": changed_at,
+            "titleUpdatedAt": changed_at,
+            "tagsUpdatedAt": changed_at,
+            "publishType": "view",
+            "publishedAt": None,
+            "permalink": None,
+            "publishLink": f"https://hackmd.io/@fake/{note_id}",
+            "shortId": note_id[:10],
+            "lastChangedAt": changed_at,
+            "lastChangeUser": {"name": "Fake User", "userPath": "fake", "photo": "", "biography": None},
+            "userPath": "fake",
+            "teamPath": team,
+            "content": "\n".join(lines),
+        }
+
+    def _apply_edits(self):
+        if self.edit_rate <= 0 or not self._order:
+            return
+        now = self._clock()
+        due = math.floor((now - self._last_edit) * self.edit_rate)
+        if due <= 0:
+            return
+        self._last_edit += due / self.edit_rate
+        for _ in range(due):
+            note = self.notes[self._random.choice(self._order)]
+            note["content"] += f"\nEdit {self.edits + 1}."
+            note["lastChangedAt"] = max(note["lastChangedAt"] + 1, self._now_ms())
+            self.edits += 1
+
+    def _rate_headers(self) -> dict[str, str]:
+        if not self.rate_limit:
+            return {}
+        reset_at = self._window_start + self.rate_window
+        return {
+            "x-ratelimit-userlimit": str(self.rate_limit),
+            "x-ratelimit-userremaining": str(max(0, self.rate_limit - self._window_count)),
+            "x-ratelimit-userreset": str(int(math.ceil(reset_at))),
+        }
+
+    def _throttle(self) -> FakeResponse | None:
+        if not self.rate_limit:
+            return None
+        now = self._clock()
+        if now - self._window_start >= self.rate_window:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= self.rate_limit:
+            self.throttled += 1
+            retry_after = max(0.0, self._window_start + self.rate_window - now)
+            headers = {**self._rate_headers(), "retry-after": f"{retry_after:g}"}
+            return FakeResponse(429, {"error": "Too Many Requests"}, headers)
+        self._window_count += 1
+        return None
+
+    def _fail(self) -> FakeResponse | None:
+        if self._errors_left <= 0 and self.error_rate and self._random.random() < self.error_rate:
+            self._errors_left = self.error_burst
+        if self._errors_left > 0:
+            self._errors_left -= 1
+            self.errors += 1
+            return FakeResponse(503, {"error": "Service Unavailable"})
+        return None
+
+    def inject_errors(self, count: int):
+        """Answer the next `count` requests with 503s."""
+        with self._lock:
+            self._errors_left = max(self._errors_left, count)
+
+    @staticmethod
+    def _page(records: list[str], params: dict[str, str]) -> list[str]:
+        offset = int(params.get("offset", 0) or 0)
+        limit = params.get("limit")
+        end = offset + int(limit) if limit else None
+        return records[offset:end]
+
+    @staticmethod
+    def _listing_record(note: dict[str, Any]) -> dict[str, Any]:
+        # Listings omit content, like the real API
+        return {k: v for k, v in note.items() if k != "content"}
+
+    def handle(self, method: str, path: str, params: dict[str, str], headers: dict[str, str]) -> FakeResponse:
+        """Answer one request; `headers` keys are expected lower-case."""
+        delay = self.latency + self._random.uniform(0, self.latency_jitter)
+        with self._lock:
+            self.requests += 1
+            self._apply_edits()
+            response = self._throttle() or self._fail()
+            if response is None:
+                response = self._route(method, path, params, headers)
+                response.headers.update(self._rate_headers())
+        response.delay = delay
+        return response
+
+    def _route(self, method: str, path: str, params: dict[str, str], headers: dict[str, str]) -> FakeResponse:
+        if method != "GET" or not path.startswith(API_PREFIX):
+            return FakeResponse(404, {"error": "Not Found"})
+        parts = [part for part in path[len(API_PREFIX):].split("/") if part]
+
+        if parts == ["notes"]:
+            page = self._page(self._by_owner.get(None, []), params)
+            return FakeResponse(200, [self._listing_record(self.notes[i]) for i in page])
+        if len(parts) == 3 and parts[0] == "teams" and parts[2] == "notes":
+            if parts[1] not in self.teams:
+                return FakeResponse(404, {"error": "Team not found"})
+            page = self._page(self._by_owner.get(parts[1], []), params)
+            return FakeResponse(200, [self._listing_record(self.notes[i]) for i in page])
+        if len(parts) == 2 and parts[0] == "notes":
+            note = self.notes.get(parts[1])
+            if note is None:
+                return FakeResponse(404, {"error": "Note not found"})
+            etag = f'"{note["id"]}-{note["lastChangedAt"]}"'
+            if headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return FakeResponse(304, None, {"etag": etag})
+            return FakeResponse(200, dict(note), {"etag": etag})
+        return FakeResponse(404, {"error": "Not Found"})
+
+    @staticmethod
+    def _to_httpx(response: FakeResponse) -> httpx.Response:
+        if response.body is None:
+            return httpx.Response(response.status, headers=response.headers)
+        return httpx.Response(response.status, json=response.body, headers=response.headers)
+
+    def _from_httpx(self, request: httpx.Request) -> FakeResponse:
+        return self.handle(
+            request.method,
+            request.url.path,
+            dict(request.url.params),
+            {k.lower(): v for k, v in request.headers.items()},
+        )
+
+    def transport(self) -> httpx.MockTransport:
+        """Transport for `httpx.Client`; latency blocks the calling thread."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            response = self._from_httpx(request)
+            if response.delay:
+                time.sleep(response.delay)
+            return self._to_httpx(response)
+
+        return httpx.MockTransport(handler)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Transport for `httpx.AsyncClient`; latency is awaited."""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            response = self._from_httpx(request)
+            if response.delay:
+                await asyncio.sleep(response.delay)
+            return self._to_httpx(response)
+
+        return httpx.MockTransport(handler)
+
+    def app(self):
+        """ASGI app serving the fake API, for running it as a local process.
+
+        Responses are gzip-compressed for clients that accept it, like HackMD's.
+        """
+        from starlette.applications import Starlette
+        from starlette.middleware import Middleware
+        from starlette.middleware.gzip import GZipMiddleware
+        from starlette.responses import JSONResponse, Response
+        from starlette.routing import Route
+
+        async def endpoint(request):
+            response = self.handle(
+                request.method,
+                request.url.path,
+                dict(request.query_params),
+                {k.lower(): v for k, v in request.headers.items()},
+            )
+            if response.delay:
+                await asyncio.sleep(response.delay)
+            if response.body is None:
+                return Response(status_code=response.status, headers=response.headers)
+            return JSONResponse(response.body, status_code=response.status, headers=response.headers)
+
+        return Starlette(
+            routes=[Route("/{path:path}", endpoint, methods=["GET"])],
+            middleware=[Middleware(GZipMiddleware, minimum_size=1024)],
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "notes": len(self.notes),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "edits": self.edits,
+                "not_modified": self.not_modified,
+            }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Serve a fake HackMD API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--teams", default="", help="comma-separated team paths")
+    parser.add_argument("--content-bytes", type=int, default=2048)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None, help="requests per window")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-burst", type=int, default=3)
+    parser.add_argument("--edit-rate", type=float, default=0.0, help="note edits per second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    api = FakeHackMDAPI(
+        notes=args.notes,
+        teams=[team.strip() for team in args.teams.split(",") if team.strip()],
+        content_bytes=args.content_bytes,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        error_rate=args.error_rate,
+        error_burst=args.error_burst,
+        edit_rate=args.edit_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(api.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,28 @@
+import asyncio
+import contextvars
+import copy
 import httpx
 import logging
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
 
-from .models import HackMDNoteObject
+from rid_lib.types import HackMDNote
+
+from .body_cache import NoteBodyCache
+from .http_cache import ValidatorCache
+from .http_options import HTTPOptions
+from .metrics import HackMDMetrics, endpoint_label
+from .models import HackMDNoteMetadata, HackMDNoteObject
+from .profiling import span
+from .rate_limiter import RateLimiter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_BASE_URL = "https://api.hackmd.io/v1"
 
 class HackMDClient:
     def __init__(
@@ -17,22 +34,44 @@ class HackMDClient:
         retries: int = 3,
         backoff_base: float = 1.0,
         backoff_max: float = 10.0,
+        max_concurrent_requests: int = 4,
+        rate_limit_per_second: float | None = None,
+        http_cache_path: str | None = None,
+        http_cache_max_bytes: int = 64 * 1024 * 1024,
+        body_cache: NoteBodyCache | None = None,
+        base_url: str | None = None,
+        metrics: HackMDMetrics | None = None,
+        http_options: HTTPOptions | None = None,
     ):
         self.log = log
         self.api_token = api_token
         self.workspace_id = workspace_id
         self.note_ids = note_ids or []
-        self.base_url = "https://api.hackmd.io/v1"
+        # Overridable to point at a local stand-in such as `fake_api`
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
 
         self.retries = max(0, retries)
         self.backoff_base = max(0.1, backoff_base)
         self.backoff_max = max(self.backoff_base, backoff_max)
-
-        # Increase timeouts to reduce read timeouts on large notes
-        self.client = httpx.Client(
-            headers={"Authorization": f"Bearer {api_token}"},
-            timeout=httpx.Timeout(connect=30.0, read=60.0, write=30.0, pool=30.0)
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        # Shared by every request from this client, including concurrent fetches
+        self.rate_limiter = RateLimiter(
+            rate=rate_limit_per_second,
+            burst=self.max_concurrent_requests,
         )
+        # Conditional GETs for single-note fetches; disabled without a path
+        self.validator_cache = (
+            ValidatorCache(http_cache_path, max_bytes=http_cache_max_bytes, log=log)
+            if http_cache_path else None
+        )
+        # Previously emitted note records, consulted before fetching content
+        self.body_cache = body_cache
+        # Request latency, status codes and retries; optional
+        self.metrics = metrics
+        # Protocol, compression, pool limits and timeouts of the HTTP client
+        self.http_options = http_options or HTTPOptions()
+
+        self.client = self._build_http_client()
 
         # Expose headers for testing
         self.headers = {
@@ -40,23 +79,180 @@ class HackMDClient:
             "Content-Type": "application/json"
         }
 
+    def for_workspace(self, workspace_id: str | None) -> "HackMDClient":
+        """Client for another team that shares this client's connection pool,
+        rate limiter and caches."""
+        clone = copy.copy(self)
+        clone.workspace_id = workspace_id
+        return clone
+
+    RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+    RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ReadError, httpx.TimeoutException, httpx.HTTPStatusError)
+
+    def _http_client_kwargs(self) -> Dict[str, Any]:
+        kwargs = self.http_options.client_kwargs(self.log)
+        kwargs["headers"] = {"Authorization": f"Bearer {self.api_token}", **kwargs["headers"]}
+        return kwargs
+
+    def _build_http_client(self) -> httpx.Client:
+        return httpx.Client(**self._http_client_kwargs())
+
+    def _request_kwargs(self, url: str) -> Dict[str, Any]:
+        """Per-request overrides for `url`: its endpoint timeout, if one is configured."""
+        endpoint_timeouts = self.http_options.endpoint_timeouts
+        if not endpoint_timeouts:
+            return {}
+        endpoint = endpoint_label(httpx.URL(url).path)
+        if endpoint not in endpoint_timeouts:
+            return {}
+        return {"timeout": self.http_options.timeout(endpoint)}
+
+    def _retry_delay(self, url: str, attempt: int, error: Exception) -> float:
+        """Return the backoff before retry `attempt`, re-raising once retries are exhausted."""
+        if attempt >= self.retries:
+            self.log.error("GET %s failed after %d retries: %s", url, attempt, error)
+            raise error
+        throttle = self.rate_limiter.throttle_remaining()
+        if throttle > 0:
+            # The rate limiter holds the next request until the advertised reset
+            self.log.warning("GET %s rate limited. retrying in %.2fs", url, throttle)
+            return 0.0
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = delay * (0.5 + random.random())  # jitter
+        self.log.warning("GET %s failed (%s). retrying in %.2fs", url, type(error).__name__, delay)
+        return delay
+
+    def _observe_attempt(self, url: str, started: float, resp: httpx.Response | None):
+        if not self.metrics:
+            return
+        endpoint = endpoint_label(httpx.URL(url).path)
+        self.metrics.http_request_duration.observe(time.perf_counter() - started, endpoint=endpoint)
+        status = resp.status_code if resp is not None else "error"
+        self.metrics.http_responses.inc(endpoint=endpoint, status=status)
+
+    def _observe_retry(self, url: str, error: Exception, delay: float):
+        if not self.metrics:
+            return
+        if isinstance(error, httpx.HTTPStatusError):
+            reason = str(error.response.status_code)
+        else:
+            reason = type(error).__name__
+        self.metrics.http_retries.inc(endpoint=endpoint_label(httpx.URL(url).path), reason=reason)
+        if delay:
+            self.metrics.http_backoff.inc(delay)
+
     def _get(self, url: str, *, params: Dict[str, Any] | None = None, headers: Dict[str, str] | None = None) -> httpx.Response:
         attempt = 0
         while True:
+            self.rate_limiter.acquire()
+            started, resp = time.perf_counter(), None
             try:
-                resp = self.client.get(url, params=params, headers=headers)
-                if resp.status_code in (429, 500, 502, 503, 504):
+                with span("http"):
+                    resp = self.client.get(url, params=params, headers=headers, **self._request_kwargs(url))
+                self.rate_limiter.observe(resp)
+                if resp.status_code in self.RETRYABLE_STATUS:
                     raise httpx.HTTPStatusError("retryable status", request=resp.request, response=resp)
                 return resp
-            except (httpx.ConnectError, httpx.ReadError, httpx.TimeoutException, httpx.HTTPStatusError) as e:
-                if attempt >= self.retries:
-                    self.log.error("GET %s failed after %d retries: %s", url, attempt, e)
-                    raise
-                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
-                delay = delay * (0.5 + random.random())  # jitter
-                self.log.warning("GET %s failed (%s). retrying in %.2fs", url, type(e).__name__, delay)
+            except self.RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(url, attempt, e)
+                self._observe_retry(url, e, delay)
+            finally:
+                self._observe_attempt(url, started, resp)
+            if delay:
                 time.sleep(delay)
-                attempt += 1
+            attempt += 1
+
+    def _get_conditional(self, url: str) -> httpx.Response:
+        """GET with stored validators, serving 304 responses from the validator cache."""
+        if not self.validator_cache:
+            return self._get(url)
+        response = self._get(url, headers=self.validator_cache.conditional_headers(url) or None)
+        resolved = self.validator_cache.resolve(url, response)
+        if resolved is None:
+            resolved = self.validator_cache.resolve(url, self._get(url))
+        return resolved
+
+    def map_concurrent(self, func: Callable[[T], R], items: List[T]) -> List[R]:
+        """Apply `func` to `items` with at most `max_concurrent_requests` in flight.
+
+        Results keep the order of `items`; the first exception raised by `func`
+        is re-raised. Each call still goes through `_get` retries and backoff,
+        and runs in a copy of the caller's context so poll spans and bound log
+        fields carry over to the fetch threads.
+        """
+        workers = min(self.max_concurrent_requests, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hackmd-fetch") as pool:
+            return list(pool.map(lambda item: context.copy().run(func, item), items))
+
+    def get_note_metadata(self, limit: int = 100, note_ids: List[str] | None = None) -> List[HackMDNoteMetadata]:
+        """Fetch lightweight note metadata without enriching list entries with content.
+
+        Uses the same source priority as `get_notes`. The list endpoints omit
+        `content`, so this costs a single request for team and user listings;
+        configured note IDs still require one request each. `note_ids`
+        restricts the configured IDs to a subset (e.g. those due for polling).
+        """
+        # 1) Specific note IDs; one missing note doesn't fail the others
+        if self.note_ids:
+            ids = self.note_ids if note_ids is None else note_ids
+            return self.get_note_metadata_for_ids(ids[:limit])
+
+        endpoint, params = self._listing_request(limit)
+        response = self._get(endpoint, params=params)
+        response.raise_for_status()
+        records = response.json()
+        return [self._parse_metadata(note_data) for note_data in records]
+
+    def get_note_metadata_for_ids(self, note_ids: List[str]) -> List[HackMDNoteMetadata]:
+        """Fetch metadata for specific notes, whatever sources are configured.
+
+        Single-note responses include content, so `get_note` won't refetch it.
+        Notes that fail to fetch (e.g. deleted ones) are skipped with a warning.
+        """
+        def fetch(note_id: str) -> Dict[str, Any] | None:
+            try:
+                return self._fetch_single_note(note_id)
+            except Exception as e:
+                self.log.warning(f"Failed to fetch note {note_id}: {e}")
+                return None
+
+        fetched = self.map_concurrent(fetch, note_ids)
+        return [self._parse_metadata(note_data) for note_data in fetched if note_data]
+
+    def iter_note_metadata_pages(
+        self, page_size: int = 100, offset: int = 0, previous_first_id: str | None = None
+    ) -> Iterator[tuple[List[HackMDNoteMetadata], int | None]]:
+        """Stream team/user note metadata page by page starting at `offset`.
+
+        Yields `(page, next_offset)`; `next_offset` is None once the listing is
+        exhausted, so callers can persist it as a resumable cursor. Pass the
+        first note ID the previous listing returned as `previous_first_id`;
+        if the page at a non-zero `offset` starts with it again, the server
+        ignores offsets and the listing ends, so the cursor starts over.
+        """
+        endpoint, _ = self._listing_request(page_size)
+        first_id = None
+        while True:
+            response = self._get(endpoint, params={"limit": page_size, "offset": offset})
+            response.raise_for_status()
+            records = response.json()
+            page, next_offset, first_id = self._paginate(
+                records, page_size, offset, first_id, previous_first_id
+            )
+            yield page, next_offset
+            if next_offset is None:
+                return
+            offset = next_offset
+
+    def get_note(self, metadata: HackMDNoteMetadata) -> HackMDNoteObject:
+        """Build the full note for a metadata record, fetching content if it is missing."""
+        cached = self._cached_note(metadata)
+        if cached:
+            return cached
+        return self._parse_note(metadata._payload)
 
     def get_notes(self, limit: int = 100) -> List[HackMDNoteObject]:
         """Fetch notes from HackMD by note IDs, team workspace, or user account.
@@ -66,51 +262,93 @@ class HackMDClient:
         2) Else if a workspace/team is configured, fetch team notes.
         3) Else fetch notes for the authenticated user.
         """
-        # 1) Specific note IDs
-        if self.note_ids:
-            notes: List[HackMDNoteObject] = []
-            for nid in self.note_ids[:limit]:
-                note_data = self._fetch_single_note(nid)
-                if note_data:
-                    notes.append(self._parse_note(note_data))
-            return notes
+        return self.map_concurrent(self.get_note, self.get_note_metadata(limit=limit))
 
-        # 2) Team/workspace notes
-        if self.workspace_id:
-            endpoint = f"{self.base_url}/teams/{self.workspace_id}/notes"
-            params = {"limit": limit}
-        else:
-            # 3) User notes
-            endpoint = f"{self.base_url}/notes"
-            params = {"limit": limit}
+    def get_note_content(self, note_id: str) -> str:
+        """Fetch full content of a specific note"""
+        endpoint = f"{self.base_url}/notes/{note_id}"
+        response = self._get_conditional(endpoint)
+        response.raise_for_status()
+        return self._content_from_response(response)
 
-        response = self._get(endpoint, params=params)
+    def _fetch_single_note(self, note_id: str) -> Dict[str, Any] | None:
+        """Fetch a single note's full record by ID (metadata + content)."""
+        endpoint = f"{self.base_url}/notes/{note_id}"
+        response = self._get_conditional(endpoint)
         response.raise_for_status()
+        return response.json()
 
-        notes: List[HackMDNoteObject] = []
-        for note_data in response.json():
-            notes.append(self._parse_note(note_data))
+    def _cached_note(self, metadata: HackMDNoteMetadata) -> HackMDNoteObject | None:
+        """Return the body-cached note if it is as recent as `metadata`."""
+        if not self.body_cache or metadata.last_changed_at is None:
+            return None
+        if metadata._payload.get("content") is not None:
+            return None
+        rid = HackMDNote(metadata.note_id, metadata.workspace_id)
+        contents = self.body_cache.get(str(rid), metadata.last_changed_at)
+        if contents is None:
+            return None
+        try:
+            return HackMDNoteObject.model_validate(contents)
+        except Exception:
+            return None
 
-        return notes
+    def _paginate(
+        self,
+        records: List[Dict[str, Any]],
+        page_size: int,
+        offset: int,
+        first_id: str | None,
+        previous_first_id: str | None = None,
+    ) -> tuple[List[HackMDNoteMetadata], int | None, str | None]:
+        """Parse one listing page and work out the next offset."""
+        if records and first_id is not None and records[0].get("id") == first_id:
+            # Server ignored the offset and restarted the listing; treat as the end
+            return [], None, first_id
+        if (
+            records
+            and first_id is None
+            and offset
+            and previous_first_id is not None
+            and records[0].get("id") == previous_first_id
+        ):
+            # Same first note as the previous listing at a later offset: offsets
+            # are ignored across polls too, so end here and restart from 0
+            return [], None, None
+        if first_id is None and records:
+            first_id = records[0].get("id")
+        page = [self._parse_metadata(note_data) for note_data in records]
+        next_offset = offset + len(records) if len(records) >= page_size else None
+        return page, next_offset, first_id
 
-    def get_note_content(self, note_id: str) -> str:
-        """Fetch full content of a specific note"""
-        endpoint = f"{self.base_url}/notes/{note_id}"
-        response = self._get(endpoint)
-        response.raise_for_status()
+    def _listing_request(self, limit: int) -> tuple[str, Dict[str, Any]]:
+        """Return the list endpoint and params for team or user notes."""
+        # 2) Team/workspace notes
+        if self.workspace_id:
+            return f"{self.base_url}/teams/{self.workspace_id}/notes", {"limit": limit}
+        # 3) User notes
+        return f"{self.base_url}/notes", {"limit": limit}
 
+    @staticmethod
+    def _content_from_response(response: httpx.Response) -> str:
         # Handle both JSON and text responses for testing compatibility
         try:
             return response.json().get("content", "")
         except Exception:
             return response.text
 
-    def _fetch_single_note(self, note_id: str) -> Dict[str, Any] | None:
-        """Fetch a single note's full record by ID (metadata + content)."""
-        endpoint = f"{self.base_url}/notes/{note_id}"
-        response = self._get(endpoint)
-        response.raise_for_status()
-        return response.json()
+    def _resolve_workspace(self, note_data: Dict[str, Any]) -> str | None:
+        """Determine workspace/team path, preferring the configured workspace."""
+        return self.workspace_id or note_data.get("teamPath")
+
+    def _parse_metadata(self, note_data: Dict[str, Any]) -> HackMDNoteMetadata:
+        """Parse a HackMD API record into HackMDNoteMetadata, keeping the raw record."""
+        metadata = HackMDNoteMetadata.model_validate({
+            **note_data,
+            "teamPath": self._resolve_workspace(note_data),
+        })
+        metadata._payload = note_data
+        return metadata
 
     def _parse_note(self, note_data: Dict[str, Any]) -> HackMDNoteObject:
         """Parse HackMD API response into HackMDNoteObject"""
@@ -123,16 +361,141 @@ class HackMDClient:
                 self.log.warning(f"Failed to fetch content for note {note_data.get('id')}: {e}")
                 content = ""
 
+        return self._build_note(note_data, content)
+
+    def _build_note(self, note_data: Dict[str, Any], content: str | None) -> HackMDNoteObject:
         # Determine workspace/team path if present in payload
-        workspace = self.workspace_id
-        if not workspace:
-            workspace = note_data.get("teamPath")
+        workspace = self._resolve_workspace(note_data)
 
-        return HackMDNoteObject.model_validate({
-            **note_data,
-            "id": note_data["id"],
-            "title": note_data.get("title", "Untitled"),
-            "content": content,
-            "userPath": note_data.get("ownerPath"),  # Map ownerPath to userPath
-            "teamPath": workspace
-        })
+        with span("validate"):
+            return HackMDNoteObject.model_validate({
+                **note_data,
+                "id": note_data["id"],
+                "title": note_data.get("title", "Untitled"),
+                "content": content,
+                "userPath": note_data.get("ownerPath"),  # Map ownerPath to userPath
+                "teamPath": workspace
+            })
+
+
+class AsyncHackMDClient(HackMDClient):
+    """asyncio variant of HackMDClient backed by `httpx.AsyncClient`.
+
+    Shares configuration, retry policy and parsing with HackMDClient; the
+    network methods are coroutines and concurrency is bounded by a semaphore.
+    Must be created and closed on the event loop that uses it.
+    """
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(**self._http_client_kwargs())
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _get(self, url: str, *, params: Dict[str, Any] | None = None, headers: Dict[str, str] | None = None) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            started, resp = time.perf_counter(), None
+            try:
+                with span("http"):
+                    resp = await self.client.get(
+                        url, params=params, headers=headers, **self._request_kwargs(url)
+                    )
+                self.rate_limiter.observe(resp)
+                if resp.status_code in self.RETRYABLE_STATUS:
+                    raise httpx.HTTPStatusError("retryable status", request=resp.request, response=resp)
+                return resp
+            except self.RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(url, attempt, e)
+                self._observe_retry(url, e, delay)
+            finally:
+                self._observe_attempt(url, started, resp)
+            if delay:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_conditional(self, url: str) -> httpx.Response:
+        if not self.validator_cache:
+            return await self._get(url)
+        response = await self._get(url, headers=self.validator_cache.conditional_headers(url) or None)
+        resolved = self.validator_cache.resolve(url, response)
+        if resolved is None:
+            resolved = self.validator_cache.resolve(url, await self._get(url))
+        return resolved
+
+    async def map_concurrent(self, func: Callable[[T], Awaitable[R]], items: List[T]) -> List[R]:
+        """Await `func` over `items` with at most `max_concurrent_requests` in flight, keeping order."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def bounded(item: T) -> R:
+            async with semaphore:
+                return await func(item)
+
+        return list(await asyncio.gather(*(bounded(item) for item in items)))
+
+    async def get_note_metadata(self, limit: int = 100, note_ids: List[str] | None = None) -> List[HackMDNoteMetadata]:
+        if self.note_ids:
+            ids = self.note_ids if note_ids is None else note_ids
+            return await self.get_note_metadata_for_ids(ids[:limit])
+
+        endpoint, params = self._listing_request(limit)
+        response = await self._get(endpoint, params=params)
+        response.raise_for_status()
+        records = response.json()
+        return [self._parse_metadata(note_data) for note_data in records]
+
+    async def get_note_metadata_for_ids(self, note_ids: List[str]) -> List[HackMDNoteMetadata]:
+        async def fetch(note_id: str) -> Dict[str, Any] | None:
+            try:
+                return await self._fetch_single_note(note_id)
+            except Exception as e:
+                self.log.warning(f"Failed to fetch note {note_id}: {e}")
+                return None
+
+        fetched = await self.map_concurrent(fetch, note_ids)
+        return [self._parse_metadata(note_data) for note_data in fetched if note_data]
+
+    async def iter_note_metadata_pages(
+        self, page_size: int = 100, offset: int = 0, previous_first_id: str | None = None
+    ) -> AsyncIterator[tuple[List[HackMDNoteMetadata], int | None]]:
+        endpoint, _ = self._listing_request(page_size)
+        first_id = None
+        while True:
+            response = await self._get(endpoint, params={"limit": page_size, "offset": offset})
+            response.raise_for_status()
+            records = response.json()
+            page, next_offset, first_id = self._paginate(
+                records, page_size, offset, first_id, previous_first_id
+            )
+            yield page, next_offset
+            if next_offset is None:
+                return
+            offset = next_offset
+
+    async def get_note(self, metadata: HackMDNoteMetadata) -> HackMDNoteObject:
+        cached = self._cached_note(metadata)
+        if cached:
+            return cached
+        note_data = metadata._payload
+        content = note_data.get("content")
+        if content is None and note_data.get("id"):
+            try:
+                content = await self.get_note_content(note_data["id"]) or ""
+            except Exception as e:
+                self.log.warning(f"Failed to fetch content for note {note_data.get('id')}: {e}")
+                content = ""
+        return self._build_note(note_data, content)
+
+    async def get_notes(self, limit: int = 100) -> List[HackMDNoteObject]:
+        return await self.map_concurrent(self.get_note, await self.get_note_metadata(limit=limit))
+
+    async def get_note_content(self, note_id: str) -> str:
+        response = await self._get_conditional(f"{self.base_url}/notes/{note_id}")
+        response.raise_for_status()
+        return self._content_from_response(response)
+
+    async def _fetch_single_note(self, note_id: str) -> Dict[str, Any] | None:
+        response = await self._get_conditional(f"{self.base_url}/notes/{note_id}")
+        response.raise_for_status()
+        return response.json()
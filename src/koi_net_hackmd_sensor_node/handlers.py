@@ -3,6 +3,7 @@ from typing import Any, TypeAlias
 
 import structlog
 from koi_net.components import (
+    BasicNetworkOutputFilter,
     Cache,
     EventQueue,
     KobjQueue,
@@ -11,11 +12,16 @@ from koi_net.components import (
     NodeIdentity,
     RequestHandler,
 )
-from koi_net.components.interfaces import HandlerType, KnowledgeHandler, STOP_CHAIN
+from koi_net.components.interfaces import STOP_CHAIN, HandlerType, KnowledgeHandler
+from koi_net.protocol.event import EventType
 from koi_net.protocol.knowledge_object import KnowledgeObject
 from rid_lib.types import HackMDNote, KoiNetNode
 
+from .delta import DeltaEvents, HackMDNoteDelta
+from .metrics import HackMDMetrics
 from .models import HackMDNoteObject
+from .note_index import NoteIndex, contents_last_changed_at
+from .sections import HackMDNoteSection
 
 log = structlog.stdlib.get_logger()
 
@@ -51,7 +57,13 @@ def suppress_peer_node_rebroadcast(ctx: HandlerContext, kobj: KnowledgeObject):
 
 
 def hackmd_bundle_handler(ctx: HandlerContext, kobj: KnowledgeObject):
-    """Validate and dedupe HackMD note bundles using `last_changed_at`."""
+    """Validate and dedupe HackMD note bundles using `last_changed_at` and content digest.
+
+    Stale bundles are rejected from the note index before the payload is
+    validated; only bundles newer than the indexed revision are parsed.
+    FORGET events carry the cached bundle being deleted, so they skip the
+    dedupe and drop the note from the index instead.
+    """
     log.debug(
         "hackmd_bundle_handler: entry rid=%r event=%s source=%r",
         kobj.rid,
@@ -59,6 +71,24 @@ def hackmd_bundle_handler(ctx: HandlerContext, kobj: KnowledgeObject):
         kobj.source,
     )
 
+    if kobj.event_type == EventType.FORGET:
+        ctx.note_index.remove(kobj.rid)
+        ctx.metrics.handler_bundles.inc(result="forgotten")
+        return
+
+    prev_entry = ctx.note_index.get(kobj.rid)
+    if prev_entry:
+        current_timestamp = contents_last_changed_at(kobj.contents)
+        prev_timestamp = prev_entry.last_changed_at
+        if current_timestamp and prev_timestamp:
+            if current_timestamp <= prev_timestamp:
+                log.debug(
+                    "Skipping stale/no-op HackMDNote for %s (incoming <= cached)",
+                    kobj.rid,
+                )
+                ctx.metrics.handler_bundles.inc(result="stale")
+                return STOP_CHAIN
+
     try:
         hackmd_data = HackMDNoteObject.model_validate(kobj.contents or {})
     except Exception as e:
@@ -70,25 +100,18 @@ def hackmd_bundle_handler(ctx: HandlerContext, kobj: KnowledgeObject):
             e,
             traceback.format_exc(),
         )
+        ctx.metrics.handler_bundles.inc(result="invalid")
         return STOP_CHAIN
 
-    prev_bundle = ctx.cache.read(kobj.rid)
-    if prev_bundle:
-        try:
-            prev_data = HackMDNoteObject.model_validate(prev_bundle.contents)
-            current_timestamp = hackmd_data.last_changed_at
-            prev_timestamp = prev_data.last_changed_at
-
-            if current_timestamp and prev_timestamp:
-                if current_timestamp <= prev_timestamp:
-                    log.debug(
-                        "Skipping stale/no-op HackMDNote for %s (incoming <= cached)",
-                        kobj.rid,
-                    )
-                    return STOP_CHAIN
-        except Exception:
-            pass
+    if prev_entry:
+        digest = hackmd_data.content_digest()
+        if digest and digest == prev_entry.digest:
+            log.debug("Skipping HackMDNote for %s with unchanged content", kobj.rid)
+            ctx.metrics.handler_bundles.inc(result="unchanged")
+            return STOP_CHAIN
 
+    ctx.note_index.update(kobj.rid, hackmd_data)
+    ctx.metrics.handler_bundles.inc(result="accepted")
     log.debug(
         "Accepting HackMD note: %s (chars=%d)",
         getattr(hackmd_data, "title", None),
@@ -96,6 +119,26 @@ def hackmd_bundle_handler(ctx: HandlerContext, kobj: KnowledgeObject):
     )
 
 
+def hackmd_delta_event_handler(ctx: HandlerContext, kobj: KnowledgeObject):
+    """Send delta subscribers the parked delta instead of the full note.
+
+    Runs after the full bundle was written to the cache and the network
+    targets were set. Nodes subscribed to `HackMDNoteDelta` are dropped from
+    the note event and the delta bundle is queued for them; everyone else
+    still gets the full note.
+    """
+    if kobj.manifest is None or kobj.normalized_event_type == EventType.FORGET:
+        return
+    bundle = ctx.delta_events.pop(kobj.rid, kobj.manifest.sha256_hash)
+    if bundle is None:
+        return
+    kobj.network_targets -= set(
+        ctx.graph.get_neighbors(direction="out", allowed_type=HackMDNoteDelta)
+    )
+    ctx.kobj_queue.push(bundle=bundle)
+    return kobj
+
+
 def logging_handler(ctx: HandlerContext, kobj: KnowledgeObject):
     """Log processed knowledge objects."""
     log.info("Processed %s: %s", type(kobj.rid).__name__, kobj.rid)
@@ -114,15 +157,29 @@ class SuppressPeerNodeRebroadcastHandler(PrependNodeHandler):
 class HackMDBundleHandler(NodeHandler):
     handler_type = HandlerType.Bundle
     rid_types = (HackMDNote,)
+    note_index: NoteIndex
+    metrics: HackMDMetrics
 
     def handle(self, kobj: KnowledgeObject):
         return hackmd_bundle_handler(self, kobj)
 
 
+@dataclass
+class HackMDDeltaEventHandler(NodeHandler):
+    handler_type = HandlerType.Network
+    rid_types = (HackMDNote,)
+    delta_events: DeltaEvents
+    # Constructed, and so registered, first: this handler narrows its targets
+    basic_network_output_filter: BasicNetworkOutputFilter
+
+    def handle(self, kobj: KnowledgeObject):
+        return hackmd_delta_event_handler(self, kobj)
+
+
 @dataclass
 class HackMDLoggingHandler(NodeHandler):
     handler_type = HandlerType.Final
-    rid_types = (HackMDNote,)
+    rid_types = (HackMDNote, HackMDNoteSection, HackMDNoteDelta)
 
     def handle(self, kobj: KnowledgeObject):
         return logging_handler(self, kobj)
@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+
+class ValidatorCache:
+    """On-disk cache of response validators and bodies for conditional GETs.
+
+    Each URL gets one JSON file holding its `ETag`/`Last-Modified` validators
+    and the last full body. Requests carry `If-None-Match`/`If-Modified-Since`;
+    a 304 is answered from the stored body, so unchanged notes cost a header
+    round trip instead of a full download. Entries past `max_bytes` are
+    evicted least recently used first, by file modification time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        log: logging.Logger = logging.getLogger(__name__),
+    ):
+        self.path = Path(path)
+        self.max_bytes = max(0, max_bytes)
+        self.log = log
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list[Path]:
+        try:
+            return list(self.path.glob("*.json"))
+        except OSError:
+            return []
+
+    def _entry_path(self, url: str) -> Path:
+        return self.path / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _read(self, url: str) -> dict[str, Any] | None:
+        try:
+            with open(self._entry_path(url)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.log.warning(f"Failed to read HTTP cache entry for {url}: {e}")
+            return None
+
+    def _write(self, url: str, entry: dict[str, Any]):
+        target = self._entry_path(url)
+        tmp = target.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            size = tmp.stat().st_size
+            with self._lock:
+                with suppress(FileNotFoundError):
+                    self._total_bytes -= target.stat().st_size
+                os.replace(tmp, target)
+                self._total_bytes += size
+                self._evict()
+        except Exception as e:
+            self.log.warning(f"Failed to write HTTP cache entry for {url}: {e}")
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Validator headers for a request to `url` (empty if nothing is cached)."""
+        entry = self._read(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def resolve(self, url: str, response: httpx.Response) -> httpx.Response | None:
+        """Serve a 304 from disk or record a fresh 200.
+
+        Returns the response callers should use, or None when the server sent
+        a 304 for a body we no longer have and the request must be retried
+        without validators.
+        """
+        if response.status_code == 304:
+            entry = self._read(url)
+            if not entry or "body" not in entry:
+                return None
+            body = base64.b64decode(entry["body"])
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += len(body)
+                # Mark as recently used for eviction
+                with suppress(OSError):
+                    os.utime(self._entry_path(url))
+            return httpx.Response(
+                200,
+                content=body,
+                headers={"content-type": entry.get("content_type") or "application/json"},
+                request=response.request,
+            )
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code != 200:
+            return response
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if etag or last_modified:
+            self._write(url, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_type": response.headers.get("content-type"),
+                "body": base64.b64encode(response.content).decode(),
+            })
+        return response
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,57 @@
+import importlib.util
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+
+def http2_available() -> bool:
+    """Whether httpx can speak HTTP/2 here (needs the optional `h2` package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class HTTPOptions:
+    """Connection settings for the HackMD HTTP client.
+
+    Defaults match the client's previous fixed configuration: HTTP/1.1,
+    httpx's default pool limits and 30/60-second timeouts.
+    """
+    # Multiplex requests over one connection; falls back to HTTP/1.1 without `h2`
+    http2: bool = False
+    # Advertise every encoding httpx can decode (gzip, deflate, plus br/zstd when
+    # brotli/zstandard are installed); False requests uncompressed bodies
+    compression: bool = True
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+    connect_timeout: float = 30.0
+    read_timeout: float = 60.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 30.0
+    # Read timeouts per API route, e.g. {"/notes/{id}": 120}; see metrics.endpoint_label
+    endpoint_timeouts: dict[str, float] = field(default_factory=dict)
+
+    def timeout(self, endpoint: str | None = None) -> httpx.Timeout:
+        read = self.endpoint_timeouts.get(endpoint, self.read_timeout) if endpoint else self.read_timeout
+        return httpx.Timeout(
+            connect=self.connect_timeout, read=read, write=self.write_timeout, pool=self.pool_timeout
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client_kwargs(self, log: logging.Logger | Any = None) -> dict[str, Any]:
+        """Keyword arguments for `httpx.Client` / `httpx.AsyncClient`."""
+        http2 = self.http2
+        if http2 and not http2_available():
+            if log:
+                log.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        headers = {} if self.compression else {"Accept-Encoding": "identity"}
+        return {"http2": http2, "limits": self.limits(), "timeout": self.timeout(), "headers": headers}
@@ -1,30 +1,95 @@
-import json
+import asyncio
+import concurrent.futures
 import os
+import signal
 import threading
 import time
+from queue import Queue
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
 
+from koi_net.components import NodeServer
 from koi_net.core import KobjQueue
+from koi_net.infra import depends_on
+from koi_net.protocol.event import EventType
 from rid_lib.ext import Bundle
 from rid_lib.types import HackMDNote
 import structlog
 
+from .backpressure import QueueBackpressure
+from .batching import generate_bundles, push_bundles
+from .body_cache import NoteBodyCache
 from .config import HackMDSensorConfig
-from .hackmd_client import HackMDClient
-from .models import HackMDNoteObject
+from .delta import DeltaEncoder, DeltaEvents, content_hash, delta_bundle
+from .hackmd_client import AsyncHackMDClient, HackMDClient
+from .http_options import HTTPOptions
+from .metrics import HackMDMetrics
+from .models import HackMDNoteMetadata, HackMDNoteObject
 from .mock_loader import HackMDMockLoader
+from .profiling import PollProfiler, record_poll, span
+from .schedule import AdaptiveSchedule
+from .sections import HackMDNoteSection, split_sections
+from .state_store import StateStore, open_state_store
+from .webhook import HackMDWebhook, WebhookDebouncer
 
 log = structlog.stdlib.get_logger()
 
+# Seconds to wait for the server event loop to start or cancel the async poll task
+LOOP_CALL_TIMEOUT = 5
+
+
+@dataclass
+class WorkspaceWorker:
+    """Listing progress for one workspace within a poll."""
+    client: HackMDClient
+    cursor_key: str
+    pages: Iterator | AsyncIterator
+    listed: int = 0
+    # First note ID listed this poll, stored with the cursor
+    first_id: str | None = None
+
 
 class HackMDIngestionService:
     def __init__(
         self,
         config: HackMDSensorConfig, 
-        kobj_queue: KobjQueue
+        kobj_queue: KobjQueue,
+        server: NodeServer | None = None,
+        metrics: HackMDMetrics | None = None,
+        delta_events: DeltaEvents | None = None,
     ):
         self.log = log
         self.config = config
         self.kobj_queue = kobj_queue
+        self.server = server
+        self.metrics = metrics or HackMDMetrics()
+        self.metrics.queue_depth.set_function(self._queue_depth)
+        # Served from the node server as Prometheus text
+        self.metrics_enabled = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_METRICS_ENABLED", "") or "",
+            fallback=getattr(config.hackmd, "metrics_enabled", True),
+        )
+        self.metrics_path = getattr(config.hackmd, "metrics_path", None) or "/metrics"
+        self._metrics_mounted = False
+        # Sampling profiles of the next N polls, armed over HTTP or with SIGUSR2
+        self.profiling_enabled = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_PROFILING_ENABLED", "") or "",
+            fallback=getattr(config.hackmd, "profiling_enabled", False),
+        )
+        self.profiler = PollProfiler(
+            self._resolve_optional_str(
+                env_value=getattr(config.env, "HACKMD_PROFILE_DIR", ""),
+                fallback=getattr(config.hackmd, "profile_dir", None),
+            ) or "./state/profiles"
+        )
+        self.profile_polls = max(1, getattr(config.hackmd, "profile_polls", 1) or 1)
+        # Bearer token for the profile route; without one only SIGUSR2 arms the profiler
+        self.profile_token = self._resolve_optional_str(
+            env_value=getattr(config.env, "HACKMD_PROFILE_TOKEN", ""),
+            fallback=getattr(config.hackmd, "profile_token", None),
+        )
+        self._profiler_mounted = False
         self.poll_interval = self._resolve_int(
             env_value=getattr(config.env, "HACKMD_POLL_INTERVAL_SECONDS", ""),
             fallback=config.hackmd.poll_interval_seconds,
@@ -35,10 +100,22 @@ class HackMDIngestionService:
             fallback=config.hackmd.max_notes_per_poll,
             label="HACKMD_MAX_NOTES_PER_POLL",
         )
+        self.page_size = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_PAGE_SIZE", ""),
+            fallback=getattr(config.hackmd, "page_size", 100),
+            label="HACKMD_PAGE_SIZE",
+        )
         workspace_id = self._resolve_optional_str(
             env_value=getattr(config.env, "HACKMD_WORKSPACE_ID", ""),
             fallback=config.hackmd.workspace_id,
         )
+        # Several teams share one process; each gets its own cursor and state keys
+        workspace_ids = self._resolve_note_ids(
+            env_value=getattr(config.env, "HACKMD_WORKSPACE_IDS", ""),
+            fallback=getattr(config.hackmd, "workspace_ids", None),
+        )
+        self.workspace_ids: list[str | None] = workspace_ids or [workspace_id]
+        workspace_id = self.workspace_ids[0]
         note_ids = self._resolve_note_ids(
             env_value=getattr(config.env, "HACKMD_NOTE_IDS", ""),
             fallback=config.hackmd.note_ids,
@@ -58,8 +135,117 @@ class HackMDIngestionService:
             fallback=getattr(config.hackmd, "backoff_max_seconds", 10.0),
             label="HACKMD_BACKOFF_MAX_SECONDS",
         )
+        max_concurrent_requests = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_MAX_CONCURRENT_REQUESTS", ""),
+            fallback=getattr(config.hackmd, "max_concurrent_requests", 4),
+            label="HACKMD_MAX_CONCURRENT_REQUESTS",
+        )
+
+        rate_limit_per_second = self._resolve_float(
+            env_value=getattr(config.env, "HACKMD_RATE_LIMIT_PER_SECOND", ""),
+            fallback=getattr(config.hackmd, "rate_limit_per_second", None),
+            label="HACKMD_RATE_LIMIT_PER_SECOND",
+        )
+
+        http_cache_path = self._resolve_optional_str(
+            env_value=getattr(config.env, "HACKMD_HTTP_CACHE_PATH", ""),
+            fallback=getattr(config.hackmd, "http_cache_path", None),
+        )
+        http_cache_max_bytes = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_HTTP_CACHE_MAX_BYTES", ""),
+            fallback=getattr(config.hackmd, "http_cache_max_bytes", 64 * 1024 * 1024),
+            label="HACKMD_HTTP_CACHE_MAX_BYTES",
+        )
+
+        body_cache_path = self._resolve_optional_str(
+            env_value=getattr(config.env, "HACKMD_BODY_CACHE_PATH", ""),
+            fallback=getattr(config.hackmd, "body_cache_path", None),
+        )
+        body_cache_max_bytes = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_BODY_CACHE_MAX_BYTES", ""),
+            fallback=getattr(config.hackmd, "body_cache_max_bytes", 256 * 1024 * 1024),
+            label="HACKMD_BODY_CACHE_MAX_BYTES",
+        )
+        self.body_cache = None
+        if body_cache_path:
+            self.body_cache = NoteBodyCache(
+                body_cache_path, max_bytes=body_cache_max_bytes, log=self.log
+            )
+
+        # Delta events diff against the last emitted body, which only the body cache keeps
+        self.delta_encoder: DeltaEncoder | None = None
+        self.delta_events = delta_events or DeltaEvents()
+        delta_mode = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_DELTA_MODE", "") or "",
+            fallback=getattr(config.hackmd, "delta_mode", False),
+        )
+        if delta_mode and not self.body_cache:
+            self.log.warning("HackMD delta mode requires the body cache; emitting full notes")
+        elif delta_mode:
+            self.delta_encoder = DeltaEncoder(
+                snapshot_every=self._resolve_int(
+                    env_value=getattr(config.env, "HACKMD_DELTA_SNAPSHOT_EVERY", ""),
+                    fallback=getattr(config.hackmd, "delta_snapshot_every", 20),
+                    label="HACKMD_DELTA_SNAPSHOT_EVERY",
+                ),
+                min_bytes=self._resolve_int(
+                    env_value=getattr(config.env, "HACKMD_DELTA_MIN_BYTES", ""),
+                    fallback=getattr(config.hackmd, "delta_min_bytes", 16384),
+                    label="HACKMD_DELTA_MIN_BYTES",
+                ),
+            )
+
+        # Opt-in per-section bundles, emitted after the note's own bundle
+        self.section_chunking = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_SECTION_CHUNKING", "") or "",
+            fallback=getattr(config.hackmd, "section_chunking", False),
+        )
+        self.section_max_level = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_SECTION_MAX_LEVEL", ""),
+            fallback=getattr(config.hackmd, "section_max_level", 3),
+            label="HACKMD_SECTION_MAX_LEVEL",
+        )
 
-        self.client = HackMDClient(
+        # Manifests of a batch are hashed on this many threads; 0 hashes inline
+        self.bundle_hash_workers = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_BUNDLE_HASH_WORKERS", ""),
+            fallback=getattr(config.hackmd, "bundle_hash_workers", 0),
+            label="HACKMD_BUNDLE_HASH_WORKERS",
+        )
+
+        # HTTP/2, compression, connection pool and timeouts of the HackMD client
+        http_options = HTTPOptions(
+            http2=self._resolve_bool(
+                env_value=getattr(config.env, "HACKMD_HTTP2", "") or "",
+                fallback=getattr(config.hackmd, "http2", False),
+            ),
+            compression=self._resolve_bool(
+                env_value=getattr(config.env, "HACKMD_HTTP_COMPRESSION", "") or "",
+                fallback=getattr(config.hackmd, "http_compression", True),
+            ),
+            max_connections=self._resolve_int(
+                env_value=getattr(config.env, "HACKMD_HTTP_MAX_CONNECTIONS", ""),
+                fallback=getattr(config.hackmd, "http_max_connections", 100),
+                label="HACKMD_HTTP_MAX_CONNECTIONS",
+            ),
+            max_keepalive_connections=getattr(config.hackmd, "http_max_keepalive_connections", 20),
+            keepalive_expiry=self._resolve_float(
+                env_value=getattr(config.env, "HACKMD_HTTP_KEEPALIVE_EXPIRY_SECONDS", ""),
+                fallback=getattr(config.hackmd, "http_keepalive_expiry_seconds", 5.0),
+                label="HACKMD_HTTP_KEEPALIVE_EXPIRY_SECONDS",
+            ),
+            connect_timeout=getattr(config.hackmd, "http_connect_timeout_seconds", 30.0),
+            read_timeout=self._resolve_float(
+                env_value=getattr(config.env, "HACKMD_HTTP_READ_TIMEOUT_SECONDS", ""),
+                fallback=getattr(config.hackmd, "http_read_timeout_seconds", 60.0),
+                label="HACKMD_HTTP_READ_TIMEOUT_SECONDS",
+            ),
+            write_timeout=getattr(config.hackmd, "http_write_timeout_seconds", 30.0),
+            pool_timeout=getattr(config.hackmd, "http_pool_timeout_seconds", 30.0),
+            endpoint_timeouts=dict(getattr(config.hackmd, "http_endpoint_timeouts", None) or {}),
+        )
+
+        self._client_kwargs = dict(
             api_token=config.env.HACKMD_API_TOKEN,
             log=self.log,
             workspace_id=workspace_id,
@@ -67,7 +253,47 @@ class HackMDIngestionService:
             retries=retries,
             backoff_base=backoff_base,
             backoff_max=backoff_max,
+            max_concurrent_requests=max_concurrent_requests,
+            rate_limit_per_second=rate_limit_per_second,
+            http_cache_path=http_cache_path,
+            http_cache_max_bytes=http_cache_max_bytes,
+            body_cache=self.body_cache,
+            metrics=self.metrics,
+            http_options=http_options,
+            base_url=self._resolve_optional_str(
+                env_value=getattr(config.env, "HACKMD_API_BASE_URL", ""),
+                fallback=getattr(config.hackmd, "api_base_url", None),
+            ),
+        )
+        self.client = HackMDClient(**self._client_kwargs)
+        self.note_ids = note_ids or []
+
+        # Per-note adaptive polling; only applies when specific note IDs are configured
+        self.schedule: AdaptiveSchedule | None = None
+        adaptive_polling = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_ADAPTIVE_POLLING", "") or "",
+            fallback=getattr(config.hackmd, "adaptive_polling", False),
         )
+        if adaptive_polling:
+            self.schedule = AdaptiveSchedule(
+                min_interval=self._resolve_float(
+                    env_value=getattr(config.env, "HACKMD_ADAPTIVE_MIN_INTERVAL_SECONDS", ""),
+                    fallback=getattr(config.hackmd, "adaptive_min_interval_seconds", 15.0),
+                    label="HACKMD_ADAPTIVE_MIN_INTERVAL_SECONDS",
+                ),
+                max_interval=self._resolve_float(
+                    env_value=getattr(config.env, "HACKMD_ADAPTIVE_MAX_INTERVAL_SECONDS", ""),
+                    fallback=getattr(config.hackmd, "adaptive_max_interval_seconds", 3600.0),
+                    label="HACKMD_ADAPTIVE_MAX_INTERVAL_SECONDS",
+                ),
+            )
+
+        # Opt-in asyncio engine scheduled on the node server's event loop
+        self.async_mode = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_ASYNC_MODE", "") or "",
+            fallback=getattr(config.hackmd, "async_mode", False),
+        )
+        self._async_task: asyncio.Task | None = None
 
         # Durable state file
         env_state_path = self._resolve_optional_str(
@@ -75,11 +301,82 @@ class HackMDIngestionService:
             fallback=getattr(config.hackmd, "state_path", "cache/hackmd_state.json"),
         )
         self.state_path = env_state_path or "cache/hackmd_state.json"
+        self.state_backend = self._resolve_optional_str(
+            env_value=getattr(config.env, "HACKMD_STATE_BACKEND", ""),
+            fallback=getattr(config.hackmd, "state_backend", "json"),
+        ) or "json"
+        # Guards mutations of `state` as well as commits
         self.state_lock = threading.Lock()
+        # Held from change selection to checkpoint, so a webhook flush and a
+        # poll never select, emit and commit the same notes concurrently
+        self.ingest_lock = threading.Lock()
         self.state = self._load_state()
+        # Number of accepted notes between state commits during a poll
+        self.checkpoint_batch_size = self._resolve_int(
+            env_value=getattr(config.env, "HACKMD_CHECKPOINT_BATCH_SIZE", ""),
+            fallback=getattr(config.hackmd, "checkpoint_batch_size", 50),
+            label="HACKMD_CHECKPOINT_BATCH_SIZE",
+        )
+        # Fetching pauses while the kobj worker is behind by high_water objects
+        self.backpressure = QueueBackpressure(
+            self._queue_depth,
+            high_water=self._resolve_int(
+                env_value=getattr(config.env, "HACKMD_QUEUE_HIGH_WATER", ""),
+                fallback=getattr(config.hackmd, "queue_high_water", 1000),
+                label="HACKMD_QUEUE_HIGH_WATER",
+            ),
+            low_water=self._resolve_int(
+                env_value=getattr(config.env, "HACKMD_QUEUE_LOW_WATER", ""),
+                fallback=getattr(config.hackmd, "queue_low_water", 250),
+                label="HACKMD_QUEUE_LOW_WATER",
+            ),
+            metrics=self.metrics,
+        )
+        # Timestamp bumps whose title, tags and content were unchanged
+        self.suppressed_updates = 0
+        self._reported_suppressed = 0
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
 
+        # Push ingestion: a signed webhook route on the node server; polling
+        # then only runs as a slow reconciliation sweep
+        self.webhook: HackMDWebhook | None = None
+        webhook_enabled = self._resolve_bool(
+            env_value=getattr(config.env, "HACKMD_WEBHOOK_ENABLED", "") or "",
+            fallback=getattr(config.hackmd, "webhook_enabled", False),
+        )
+        webhook_secret = self._resolve_optional_str(
+            env_value=getattr(config.env, "HACKMD_WEBHOOK_SECRET", ""),
+            fallback=getattr(config.hackmd, "webhook_secret", None),
+        )
+        if webhook_enabled and not webhook_secret:
+            self.log.warning("HackMD webhook requires HACKMD_WEBHOOK_SECRET; webhook disabled")
+        elif webhook_enabled:
+            debouncer = WebhookDebouncer(
+                self.ingest_webhook_notes,
+                delay=self._resolve_float(
+                    env_value=getattr(config.env, "HACKMD_WEBHOOK_DEBOUNCE_SECONDS", ""),
+                    fallback=getattr(config.hackmd, "webhook_debounce_seconds", 2.0),
+                    label="HACKMD_WEBHOOK_DEBOUNCE_SECONDS",
+                ),
+                max_wait=self._resolve_float(
+                    env_value=getattr(config.env, "HACKMD_WEBHOOK_MAX_WAIT_SECONDS", ""),
+                    fallback=getattr(config.hackmd, "webhook_max_wait_seconds", 30.0),
+                    label="HACKMD_WEBHOOK_MAX_WAIT_SECONDS",
+                ),
+            )
+            self.webhook = HackMDWebhook(
+                webhook_secret,
+                debouncer,
+                path=getattr(config.hackmd, "webhook_path", None) or "/hackmd/webhook",
+            )
+            self.poll_interval = self._resolve_int(
+                env_value=getattr(config.env, "HACKMD_RECONCILE_INTERVAL_SECONDS", ""),
+                fallback=getattr(config.hackmd, "reconcile_interval_seconds", 3600),
+                label="HACKMD_RECONCILE_INTERVAL_SECONDS",
+            )
+        self._webhook_mounted = False
+
         # Mock data configuration
         self.use_mock_data = self._resolve_bool(
             env_value=getattr(config.env, "USE_MOCK_DATA", "") or "",
@@ -105,6 +402,27 @@ class HackMDIngestionService:
                 mock_data_path=self.mock_data_path,
                 kobj_queue=self.kobj_queue,
                 log=self.log,
+                hash_workers=self.bundle_hash_workers,
+                forget_deleted=self._resolve_bool(
+                    env_value=getattr(config.env, "MOCK_FORGET_DELETED", "") or "",
+                    fallback=getattr(config.hackmd, "mock_forget_deleted", False),
+                ),
+                fast=self._resolve_bool(
+                    env_value=getattr(config.env, "MOCK_FAST_LOAD", "") or "",
+                    fallback=getattr(config.hackmd, "mock_fast_load", False),
+                ),
+                workers=self._resolve_int(
+                    env_value=getattr(config.env, "MOCK_LOAD_WORKERS", ""),
+                    fallback=getattr(config.hackmd, "mock_load_workers", 8),
+                    label="MOCK_LOAD_WORKERS",
+                ),
+                batch_size=self._resolve_int(
+                    env_value=getattr(config.env, "MOCK_LOAD_BATCH_SIZE", ""),
+                    fallback=getattr(config.hackmd, "mock_load_batch_size", 1000),
+                    label="MOCK_LOAD_BATCH_SIZE",
+                ),
+                # Batches wait out queue backpressure so a large corpus can't flood the pipeline
+                throttle=lambda: self.backpressure.wait(self._stop_event),
             )
 
     @staticmethod
@@ -162,31 +480,134 @@ class HackMDIngestionService:
             log.warning("Invalid %s=%r, using fallback=%s", label, env_value, fallback)
             return fallback
 
-    def _load_state(self) -> dict:
-        try:
-            with open(self.state_path, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-        except Exception as e:
-            self.log.warning(f"Failed to load state file {self.state_path}: {e}")
-            return {}
+    def _load_state(self) -> StateStore:
+        return open_state_store(self.state_backend, self.state_path, log=self.log)
 
     def _save_state(self):
+        started = time.perf_counter()
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
-            with self.state_lock:
-                with open(self.state_path, "w") as f:
-                    json.dump(self.state, f, indent=2, default=str)
+            with span("state_write"), self.state_lock:
+                self.state.commit()
         except Exception as e:
             self.log.warning(f"Failed to write state file {self.state_path}: {e}")
+            return
+        self.metrics.state_save_duration.observe(time.perf_counter() - started)
+        with suppress(OSError):
+            self.metrics.state_size.set(os.path.getsize(getattr(self.state, "path", self.state_path)))
+
+    async def _save_state_async(self):
+        """Persist state off the event loop so large writes don't stall the server."""
+        await asyncio.to_thread(self._save_state)
 
-    def _state_key(self, note: HackMDNoteObject) -> str:
+    def _state_key(self, note: HackMDNoteObject | HackMDNoteMetadata) -> str:
         # Use workspace/note_id if available for uniqueness; else note_id
         return f"{note.workspace_id}/{note.note_id}" if note.workspace_id else note.note_id
 
+    def _digest_key(self, key: str) -> str:
+        return f"__digest__/{key}"
+
+    def _queue_depth(self) -> int | None:
+        q = getattr(self.kobj_queue, "q", None)
+        return q.qsize() if isinstance(q, Queue) else None
+
+    def _server_loop(self) -> asyncio.AbstractEventLoop | None:
+        """Return the running event loop of the node's uvicorn server, if any."""
+        uvicorn_server = getattr(self.server, "server", None)
+        for listener in getattr(uvicorn_server, "servers", None) or []:
+            loop = listener.get_loop()
+            if loop.is_running():
+                return loop
+        return None
+
+    def _start_metrics(self):
+        if not self.metrics_enabled or self._metrics_mounted:
+            return
+        app = getattr(self.server, "app", None)
+        if app is None:
+            return
+        self.metrics.mount(app, self.metrics_path)
+        self._metrics_mounted = True
+        self.log.info(f"HackMD metrics served on {self.metrics_path}")
+
+    def _start_profiler(self):
+        if not self.profiling_enabled:
+            return
+        app = getattr(self.server, "app", None)
+        if app is not None and not self._profiler_mounted:
+            if not self.profile_token:
+                self.log.warning("HackMD profile route requires HACKMD_PROFILE_TOKEN; route disabled")
+            else:
+                self.profiler.mount(app, self.profile_token)
+                self._profiler_mounted = True
+                self.log.info("HackMD profiler armed with POST /hackmd/profile?polls=N")
+        if hasattr(signal, "SIGUSR2"):
+            try:
+                # Arming takes the profiler lock, so it runs off the interrupted thread
+                signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(
+                    target=self.profiler.request, args=(self.profile_polls,), daemon=True
+                ).start())
+            except ValueError:
+                self.log.debug("Not on the main thread; SIGUSR2 profiling trigger unavailable")
+
+    def _start_webhook(self):
+        if not self.webhook:
+            return
+        app = getattr(self.server, "app", None)
+        if app is None:
+            self.log.warning("HackMD webhook enabled but the node has no server; relying on polling")
+            return
+        if not self._webhook_mounted:
+            self.webhook.mount(app)
+            self._webhook_mounted = True
+            self.log.info(f"HackMD webhook listening on {self.webhook.path}")
+        self.webhook.debouncer.start()
+
+    def ingest_webhook_notes(self, refs: list[tuple[str, str | None]]) -> int:
+        """Fetch and emit the notes named by debounced webhook events.
+
+        Goes through the same timestamp and content-digest dedupe as polling,
+        so an event for an already emitted revision queues nothing. Events
+        naming a team outside `workspace_ids` are dropped; events without a
+        team are fetched through the first configured workspace.
+        """
+        by_workspace: dict[str | None, list[str]] = {}
+        out_of_scope: list[str] = []
+        for note_id, team_path in refs:
+            if team_path and team_path not in self.workspace_ids:
+                out_of_scope.append(f"{team_path}/{note_id}")
+                continue
+            workspace_id = team_path or self.workspace_ids[0]
+            by_workspace.setdefault(workspace_id, []).append(note_id)
+        if out_of_scope:
+            self.log.warning(
+                f"Webhook: ignoring {len(out_of_scope)} notes outside the configured workspaces: "
+                f"{', '.join(out_of_scope[:10])}"
+            )
+
+        processed = listed = 0
+        for workspace_id, note_ids in by_workspace.items():
+            client = self.client
+            if workspace_id != client.workspace_id:
+                client = client.for_workspace(workspace_id)
+            metadata = client.get_note_metadata_for_ids(note_ids)
+            listed += len(metadata)
+            processed += self._process_metadata(metadata, client)
+
+        self.log.info(f"Webhook: processed {processed} of {listed} HackMD notes")
+        return processed
+
+    @depends_on("server")
     def start(self):
+        self._start_metrics()
+        self._start_profiler()
+        self._start_webhook()
+
+        if self.async_mode:
+            loop = self._server_loop()
+            if loop:
+                return self._start_async(loop)
+            self.log.warning("HackMD async mode requested but no server event loop is running; using thread")
+
         if self._thread and self._thread.is_alive():
             self.log.debug("HackMD ingestion service already running")
             return
@@ -202,11 +623,13 @@ class HackMDIngestionService:
                 start = time.time()
                 try:
                     self.poll_once()
+                    self._observe_poll("ok", time.time() - start)
                 except Exception as e:
+                    self._observe_poll("error", time.time() - start)
                     self.log.error(f"Ingestion poll failed: {e}")
                     time.sleep(5)
                 elapsed = time.time() - start
-                remaining = max(0.0, poll_interval - elapsed)
+                remaining = self._next_poll_delay(elapsed)
                 if remaining:
                     self._stop_event.wait(remaining)
             self.log.info("HackMD ingestion stopped")
@@ -214,7 +637,66 @@ class HackMDIngestionService:
         self._thread = threading.Thread(target=_run, name="hackmd-ingestion", daemon=True)
         self._thread.start()
 
+    def _start_async(self, loop: asyncio.AbstractEventLoop):
+        if self._async_task and not self._async_task.done():
+            self.log.debug("HackMD ingestion service already running")
+            return
+
+        self.log.info(f"HackMD async ingestion starting; interval={self.poll_interval}s")
+        future = asyncio.run_coroutine_threadsafe(self._spawn_async_task(), loop)
+        try:
+            future.result(timeout=LOOP_CALL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.log.error("HackMD async ingestion did not start; server event loop is unresponsive")
+
+    async def _spawn_async_task(self):
+        self._async_task = asyncio.create_task(self.run_async(), name="hackmd-ingestion")
+
+    async def _cancel_async_task(self):
+        task, self._async_task = self._async_task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def run_async(self):
+        """Poll loop for async mode; runs until cancelled."""
+        self.log.info("HackMD async ingestion started")
+        client = AsyncHackMDClient(**self._client_kwargs)
+        try:
+            while True:
+                start = time.monotonic()
+                try:
+                    await self.poll_once_async(client)
+                    self._observe_poll("ok", time.monotonic() - start)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._observe_poll("error", time.monotonic() - start)
+                    self.log.error(f"Ingestion poll failed: {e}")
+                    await asyncio.sleep(5)
+                elapsed = time.monotonic() - start
+                await asyncio.sleep(self._next_poll_delay(elapsed))
+        finally:
+            await client.aclose()
+            self.log.info("HackMD async ingestion stopped")
+
     def stop(self):
+        if self.webhook:
+            self.webhook.debouncer.stop()
+
+        if self._async_task:
+            # Cancellation lands at the task's next await, so this returns promptly
+            loop = self._server_loop()
+            if loop:
+                future = asyncio.run_coroutine_threadsafe(self._cancel_async_task(), loop)
+                try:
+                    future.result(timeout=LOOP_CALL_TIMEOUT)
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    self.log.warning("Timed out cancelling HackMD async ingestion")
+            self._async_task = None
+
         if not self._thread:
             return
 
@@ -222,68 +704,556 @@ class HackMDIngestionService:
         self._thread.join(timeout=5)
         self._thread = None
 
-    def poll_once(self):
-        # Check if mock mode is enabled
-        if self.use_mock_data:
-            return self._poll_mock_data()
+    def _observe_poll(self, result: str, duration: float):
+        self.metrics.polls.inc(result=result)
+        self.metrics.poll_duration.observe(duration)
 
-        self.log.info("Polling HackMD for notes...")
-        notes = self.client.get_notes(limit=self.max_notes_per_poll)
+    def _next_poll_delay(self, elapsed: float) -> float:
+        """Seconds to wait before the next poll, waking early for due notes."""
+        remaining = max(0.0, self.poll_interval - elapsed)
+        if self.schedule and self.note_ids and not self.use_mock_data:
+            remaining = min(remaining, self.schedule.seconds_until_next_due(self.note_ids))
+        return remaining
 
-        processed = 0
-        for note in notes:
-            # Handle both dict and HackMDNoteObject
-            if isinstance(note, dict):
-                note_data = note
-                note_obj = HackMDNoteObject.model_validate(note_data)
+    def _metadata_request(self) -> dict | None:
+        """Keyword arguments for `get_note_metadata`, or None if no note is due."""
+        kwargs = {"limit": self.max_notes_per_poll}
+        if self.schedule and self.note_ids:
+            due = self.schedule.due(self.note_ids)
+            if not due:
+                return None
+            # The client only fetches `limit` IDs; the rest stay due for the next poll
+            kwargs["note_ids"] = due[:self.max_notes_per_poll]
+        return kwargs
+
+    def _observe_schedule(self, request: dict, metadata: list[HackMDNoteMetadata] | None):
+        """Reschedule the requested note IDs; those that came back empty back off.
+
+        `metadata` is None when the whole request failed.
+        """
+        if not (self.schedule and self.note_ids):
+            return
+        returned = {meta.note_id: meta for meta in metadata or []}
+        for note_id in request.get("note_ids", []):
+            meta = returned.get(note_id)
+            if meta is None:
+                # Deleted, failed, or returned under another ID; don't retry every loop
+                self.schedule.miss(note_id)
             else:
-                note_obj = note
-                note_data = note.model_dump(mode="json")
-            
-            key = self._state_key(note_obj)
-            prev_timestamp = self.state.get(key)
-            
-            # Convert timestamps to comparable format
-            current_timestamp = note_obj.last_changed_at
+                self.schedule.observe(note_id, meta.last_changed_at)
+
+    def _select_changed(
+        self, metadata: list[HackMDNoteMetadata]
+    ) -> list[tuple[HackMDNoteMetadata, str, int | None]]:
+        """Return (metadata, state key, timestamp) for notes newer than stored state."""
+        changed: list[tuple[HackMDNoteMetadata, str, int | None]] = []
+        for meta in metadata:
+            key = self._state_key(meta)
+            with self.state_lock:
+                prev_timestamp = self.state.get(key)
+
+            current_timestamp = meta.last_changed_at
             if current_timestamp is None:
-                current_timestamp = note_obj.created_at
-            
-            # Decide whether to process
-            should = False
-            if prev_timestamp is None:
-                should = True
-            elif current_timestamp and current_timestamp > prev_timestamp:
-                should = True
-
-            if not should:
+                current_timestamp = meta.created_at
+
+            # Decide whether to process before paying for a content fetch
+            if self._is_newer(current_timestamp, prev_timestamp):
+                changed.append((meta, key, current_timestamp))
+
+        self.metrics.notes.inc(len(metadata), outcome="listed")
+        self.metrics.notes.inc(len(changed), outcome="changed")
+        self.metrics.notes.inc(len(metadata) - len(changed), outcome="skipped")
+        return changed
+
+    @staticmethod
+    def _is_newer(current_timestamp: int | None, prev_timestamp: int | None) -> bool:
+        if prev_timestamp is None:
+            return True
+        return bool(current_timestamp) and current_timestamp > prev_timestamp
+
+    def _checkpoint_batches(self, changed: list) -> list[list]:
+        size = max(1, self.checkpoint_batch_size)
+        return [changed[i:i + size] for i in range(0, len(changed), size)]
+
+    def _emit_changed(
+        self,
+        changed: list[tuple[HackMDNoteMetadata, str, int | None]],
+        notes: list[HackMDNoteObject | None],
+    ) -> int:
+        """Queue bundles for fetched notes, advancing state only for accepted pushes.
+
+        Notes whose content digest matches the last emitted one only advance
+        their timestamp; HackMD bumps `lastChangedAt` for permission changes
+        and re-saves that leave the note itself untouched.
+        """
+        pending: list[tuple[str, int | None, str | None]] = []
+        items: list[tuple[HackMDNote, dict]] = []
+        for (_, key, current_timestamp), note_obj in zip(changed, notes, strict=True):
+            if note_obj is None:
+                self.metrics.notes.inc(outcome="failed")
+                continue
+
+            with self.state_lock:
+                prev_timestamp = self.state.get(key)
+                prev_digest = self.state.get(self._digest_key(key))
+            if not self._is_newer(current_timestamp, prev_timestamp):
+                # Emitted since selection; the async poll fetches without `ingest_lock`
+                continue
+
+            digest = note_obj.content_digest()
+            if digest and digest == prev_digest:
+                self.suppressed_updates += 1
+                self.metrics.notes.inc(outcome="suppressed")
+                self.log.debug(f"Suppressing no-op update of {key}")
+                if current_timestamp:
+                    with self.state_lock:
+                        self.state[key] = current_timestamp
                 continue
 
             note_rid = HackMDNote(note_obj.note_id, note_obj.workspace_id)
-            self._process_note(note_rid, note_data)
+            items.append((note_rid, note_obj.model_dump(mode="json")))
+            pending.append((key, current_timestamp, digest))
+
+        processed = 0
+        accepted = self._process_notes(items)
+        for (key, current_timestamp, digest), ok in zip(pending, accepted, strict=True):
+            if not ok:
+                # Leave state behind so the note is retried next poll
+                self.metrics.notes.inc(outcome="failed")
+                continue
             processed += 1
             # Update state with timestamp
-            if current_timestamp:
-                self.state[key] = current_timestamp
+            with self.state_lock:
+                if current_timestamp:
+                    self.state[key] = current_timestamp
+                if digest:
+                    self.state[self._digest_key(key)] = digest
+        self.metrics.notes.inc(processed, outcome="emitted")
+        return processed
 
+    def _report_poll(self, processed: int, listed: int, client: HackMDClient | None = None):
         if processed:
-            self.log.info(f"Processed {processed} HackMD notes")
-            self._save_state()
+            self.log.info(f"Processed {processed} of {listed} HackMD notes")
         else:
             self.log.info("No HackMD note changes detected")
 
-    def _process_note(self, note_rid: HackMDNote, note_data):
-        try:
-            # Handle both dict and HackMDNoteObject
-            if hasattr(note_data, 'model_dump'):
-                contents = note_data.model_dump(mode="json")
+        suppressed = self.suppressed_updates - self._reported_suppressed
+        self._reported_suppressed = self.suppressed_updates
+        if suppressed:
+            self.log.info(
+                f"Suppressed {suppressed} no-op HackMD updates "
+                f"({self.suppressed_updates} since start)"
+            )
+
+        limiter = getattr(client or self.client, "rate_limiter", None)
+        stats = limiter.stats() if limiter else {}
+        if stats.get("utilization") is not None:
+            message = (
+                f"HackMD quota {stats['remaining']}/{stats['limit']} remaining "
+                f"({stats['utilization']:.0%} used, throttled={stats['throttled']}, "
+                f"waited={stats['wait_seconds']:.1f}s)"
+            )
+            if stats["utilization"] >= 0.9:
+                self.log.warning(message)
             else:
-                contents = note_data
-            
-            bundle = Bundle.generate(rid=note_rid, contents=contents)
-            self.kobj_queue.push(bundle=bundle)
-            self.log.debug(f"Queued bundle for {note_rid}")
+                self.log.info(message)
+
+        pressure = self.backpressure.stats()
+        if pressure["pauses"]:
+            self.log.info(
+                f"HackMD backpressure: paused {pressure['pauses']} times for "
+                f"{pressure['wait_seconds']:.1f}s total (queue high-water "
+                f"{pressure['high_water']}, max depth {pressure['max_depth']})"
+            )
+
+        if self.delta_encoder:
+            delta_stats = self.delta_encoder.stats()
+            self.log.info(
+                f"HackMD delta bundles: {delta_stats['deltas']} deltas, "
+                f"{delta_stats['snapshots']} snapshots, {delta_stats['bytes_saved']} bytes saved"
+            )
+
+        validator_cache = getattr(client or self.client, "validator_cache", None)
+        if validator_cache:
+            cache_stats = validator_cache.stats()
+            self.log.info(
+                f"HackMD conditional GETs: {cache_stats['hits']} not modified, "
+                f"{cache_stats['misses']} downloaded, {cache_stats['bytes_saved']} bytes saved"
+            )
+
+    def _workspace_clients(self, client: HackMDClient) -> list[HackMDClient]:
+        """One client per configured workspace, all sharing `client`'s pool and limiter."""
+        if len(self.workspace_ids) <= 1:
+            return [client]
+        return [client.for_workspace(workspace_id) for workspace_id in self.workspace_ids]
+
+    def _start_workers(self, client: HackMDClient) -> list[WorkspaceWorker]:
+        workers = []
+        for workspace_client in self._workspace_clients(client):
+            cursor_key = self._cursor_key(workspace_client)
+            offset = self.state.get(cursor_key, 0)
+            self.log.info(
+                f"Polling HackMD workspace {workspace_client.workspace_id or '@me'} from offset {offset}..."
+            )
+            pages = workspace_client.iter_note_metadata_pages(
+                page_size=min(self.page_size, self.max_notes_per_poll),
+                offset=offset,
+                previous_first_id=self.state.get(self._first_id_key(cursor_key)),
+            )
+            workers.append(WorkspaceWorker(workspace_client, cursor_key, pages))
+        return workers
+
+    def _cursor_key(self, client: HackMDClient) -> str:
+        # Stored alongside note state so the cursor commits with the notes it covers
+        return f"__cursor__/{client.workspace_id or '@me'}"
+
+    def _first_id_key(self, cursor_key: str) -> str:
+        return f"{cursor_key}/first_id"
+
+    def _process_metadata(
+        self, metadata: list[HackMDNoteMetadata], client: HackMDClient | None = None
+    ) -> int:
+        client = client or self.client
+
+        def fetch(meta: HackMDNoteMetadata) -> HackMDNoteObject | None:
+            return self._fetch_note(meta, client)
+
+        processed = 0
+        # Polls and webhook flushes run on different threads
+        with self.ingest_lock:
+            with span("select"):
+                changed = self._select_changed(metadata)
+            for batch in self._checkpoint_batches(changed):
+                with span("backpressure"):
+                    self.backpressure.wait(self._stop_event)
+                # Content for the batch is fetched concurrently, in listing order
+                with span("fetch"):
+                    notes = client.map_concurrent(fetch, [meta for meta, _, _ in batch])
+                with span("emit"):
+                    emitted = self._emit_changed(batch, notes)
+                # Checkpoint every batch, including suppressed-only ones, so a
+                # crash only re-fetches the uncommitted tail
+                self._save_state()
+                processed += emitted
+        return processed
+
+    def _advance_cursor(self, worker: WorkspaceWorker, next_offset: int | None) -> bool:
+        """Store the next listing offset; returns whether this poll should continue.
+
+        The first note ID listed this poll is stored with it, so the next poll
+        can tell a server that ignores `offset` from one that honours it.
+        """
+        with self.state_lock:
+            self.state[worker.cursor_key] = next_offset or 0
+            if worker.first_id is not None:
+                self.state[self._first_id_key(worker.cursor_key)] = worker.first_id
+        return next_offset is not None and worker.listed < self.max_notes_per_poll
+
+    @contextmanager
+    def _poll_scope(self):
+        """Time the stages of one poll and log them as a single summary event."""
+        with self.profiler.poll(), record_poll() as spans:
+            failed = True
+            try:
+                yield spans
+                failed = False
+            finally:
+                self.log.info(
+                    "HackMD poll timings",
+                    total_ms=round(spans.elapsed() * 1000, 3),
+                    failed=failed,
+                    stages=spans.summary(),
+                )
+
+    def poll_once(self):
+        with self._poll_scope():
+            self._poll_once()
+
+    def _poll_once(self):
+        # Check if mock mode is enabled
+        if self.use_mock_data:
+            return self._poll_mock_data()
+
+        if self.note_ids:
+            request = self._metadata_request()
+            if request is None:
+                self.log.debug("No HackMD notes due for polling")
+                return
+
+            self.log.info("Polling HackMD for notes...")
+            try:
+                with span("list"):
+                    metadata = self.client.get_note_metadata(**request)
+            except Exception:
+                self._observe_schedule(request, None)
+                raise
+            self._observe_schedule(request, metadata)
+            processed = self._process_metadata(metadata)
+            self._report_poll(processed, len(metadata))
+            return
+
+        # Team/user listings are streamed page by page from each workspace's
+        # stored cursor, listing at most max_notes_per_poll notes per workspace.
+        # Workspaces take turns one page at a time so a large team can't starve
+        # the others.
+        processed = listed = 0
+        workers = self._start_workers(self.client)
+        while workers:
+            for worker in list(workers):
+                try:
+                    with span("list"):
+                        page, next_offset = next(worker.pages)
+                    if worker.first_id is None and page:
+                        worker.first_id = page[0].note_id
+                    worker.listed += len(page)
+                    processed += self._process_metadata(page, worker.client)
+                except StopIteration:
+                    workers.remove(worker)
+                    continue
+                except Exception as e:
+                    if len(self.workspace_ids) <= 1:
+                        raise
+                    self.log.error(f"Polling workspace {worker.client.workspace_id} failed: {e}")
+                    workers.remove(worker)
+                    continue
+                listed += len(page)
+                more = self._advance_cursor(worker, next_offset)
+                self._save_state()
+                if not more:
+                    workers.remove(worker)
+
+        self._report_poll(processed, listed)
+
+    async def poll_once_async(self, client: AsyncHackMDClient):
+        """Async counterpart of `poll_once` using an `AsyncHackMDClient`."""
+        with self._poll_scope():
+            await self._poll_once_async(client)
+
+    async def _poll_once_async(self, client: AsyncHackMDClient):
+        if self.use_mock_data:
+            return await asyncio.to_thread(self._poll_mock_data)
+
+        async def process(metadata: list[HackMDNoteMetadata], client: AsyncHackMDClient) -> int:
+            async def fetch(meta: HackMDNoteMetadata) -> HackMDNoteObject | None:
+                try:
+                    return await client.get_note(meta)
+                except Exception as e:
+                    self.log.error(f"Failed to fetch note {meta.note_id}: {e}")
+                    return None
+
+            def select() -> list:
+                with self.ingest_lock:
+                    return self._select_changed(metadata)
+
+            def emit(batch: list, notes: list[HackMDNoteObject | None]) -> int:
+                with self.ingest_lock:
+                    emitted = self._emit_changed(batch, notes)
+                    self._save_state()
+                    return emitted
+
+            # State reads, hashing, queueing and commits block, so they run off
+            # the server loop; fetches run outside `ingest_lock`, and
+            # `_emit_changed` skips notes a webhook flush emitted meanwhile
+            with span("select"):
+                changed = await asyncio.to_thread(select)
+            processed = 0
+            for batch in self._checkpoint_batches(changed):
+                with span("backpressure"):
+                    await self.backpressure.wait_async()
+                with span("fetch"):
+                    notes = await client.map_concurrent(fetch, [meta for meta, _, _ in batch])
+                with span("emit"):
+                    processed += await asyncio.to_thread(emit, batch, notes)
+            return processed
+
+        if self.note_ids:
+            request = self._metadata_request()
+            if request is None:
+                self.log.debug("No HackMD notes due for polling")
+                return
+
+            self.log.info("Polling HackMD for notes...")
+            try:
+                with span("list"):
+                    metadata = await client.get_note_metadata(**request)
+            except Exception:
+                self._observe_schedule(request, None)
+                raise
+            self._observe_schedule(request, metadata)
+            processed = await process(metadata, client)
+            self._report_poll(processed, len(metadata), client)
+            return
+
+        processed = listed = 0
+        workers = self._start_workers(client)
+        while workers:
+            for worker in list(workers):
+                try:
+                    with span("list"):
+                        page, next_offset = await anext(worker.pages)
+                    if worker.first_id is None and page:
+                        worker.first_id = page[0].note_id
+                    worker.listed += len(page)
+                    processed += await process(page, worker.client)
+                except StopAsyncIteration:
+                    workers.remove(worker)
+                    continue
+                except Exception as e:
+                    if len(self.workspace_ids) <= 1:
+                        raise
+                    self.log.error(f"Polling workspace {worker.client.workspace_id} failed: {e}")
+                    workers.remove(worker)
+                    continue
+                listed += len(page)
+                more = self._advance_cursor(worker, next_offset)
+                await self._save_state_async()
+                if not more:
+                    workers.remove(worker)
+
+        self._report_poll(processed, listed, client)
+
+    def _fetch_note(
+        self, meta: HackMDNoteMetadata, client: HackMDClient | None = None
+    ) -> HackMDNoteObject | None:
+        try:
+            return (client or self.client).get_note(meta)
         except Exception as e:
-            self.log.error(f"Failed to process note {note_rid}: {e}")
+            self.log.error(f"Failed to fetch note {meta.note_id}: {e}")
+            return None
+
+    def _encode_delta(self, note_rid: HackMDNote, contents: dict) -> tuple[dict, dict] | None:
+        """Cached previous contents and the patch from them, or None to send the note whole."""
+        if not self.delta_encoder:
+            return None
+        previous = self.body_cache.get(str(note_rid))
+        delta = self.delta_encoder.encode(str(note_rid), contents, previous)
+        return (previous, delta) if delta is not None else None
+
+    def _process_note(self, note_rid: HackMDNote, note_data) -> bool:
+        """Queue a bundle for the note; returns whether the queue accepted it."""
+        return self._process_notes([(note_rid, note_data)])[0]
+
+    def _process_notes(
+        self, items: list[tuple[HackMDNote, dict | HackMDNoteObject]]
+    ) -> list[bool]:
+        """Queue bundles for a batch of notes, hashing them together.
+
+        Returns whether the queue accepted each note, in order. Sections and
+        the body cache are only updated for accepted notes. Note bundles always
+        carry the full note; in delta mode a `HackMDNoteDelta` bundle is handed
+        to `delta_events` for delta subscribers.
+        """
+        if not items:
+            return []
+
+        started = time.perf_counter()
+        # (full contents, (previous contents, delta)) per item; None if encoding failed
+        encoded: list[tuple[dict, tuple[dict, dict] | None] | None] = []
+        for note_rid, note_data in items:
+            try:
+                # Handle both dict and HackMDNoteObject
+                if hasattr(note_data, 'model_dump'):
+                    contents = note_data.model_dump(mode="json")
+                else:
+                    contents = note_data
+                encoded.append((contents, self._encode_delta(note_rid, contents)))
+            except Exception as e:
+                self.log.error(f"Failed to process note {note_rid}: {e}")
+                encoded.append(None)
+
+        to_generate = [
+            (note_rid, entry[0]) for (note_rid, _), entry in zip(items, encoded, strict=True) if entry
+        ]
+        with span("hash"):
+            bundles = iter(generate_bundles(to_generate, self.bundle_hash_workers))
+        generated = [next(bundles) if entry else None for entry in encoded]
+        # Parked before the push; the kobj worker may reach the network phase right away
+        for bundle, entry in zip(generated, encoded, strict=True):
+            if bundle is None or entry[1] is None:
+                continue
+            previous, delta = entry[1]
+            base = Bundle.generate(rid=bundle.rid, contents=previous)
+            self.delta_events.put(
+                bundle.rid,
+                bundle.manifest.sha256_hash,
+                delta_bundle(bundle.rid, base, bundle, delta),
+            )
+        with span("push"):
+            pushed = iter(push_bundles(self.kobj_queue, [b for b in generated if b is not None]))
+        accepted = [next(pushed) if bundle is not None else False for bundle in generated]
+
+        for (note_rid, _), entry, bundle, ok in zip(items, encoded, generated, accepted, strict=True):
+            if not ok:
+                if bundle is not None:
+                    self.delta_events.pop(bundle.rid, bundle.manifest.sha256_hash)
+                continue
+            contents = entry[0]
+            if self.section_chunking:
+                try:
+                    self._emit_sections(note_rid, contents)
+                except Exception as e:
+                    self.log.warning(f"Failed to emit sections for {note_rid}: {e}")
+
+            if self.body_cache:
+                # Always the full body, so later deltas have a base to diff against
+                try:
+                    self.body_cache.put(str(note_rid), contents)
+                except Exception as e:
+                    self.log.warning(f"Failed to cache body for {note_rid}: {e}")
+
+        queued = sum(accepted)
+        self.log.debug(
+            f"Queued {queued} of {len(items)} HackMD bundles "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return accepted
+
+    def _emit_sections(self, note_rid: HackMDNote, contents: dict) -> int:
+        """Queue bundles for sections whose hash changed and forget removed ones.
+
+        Section hashes live in the ingestion state, so they commit together with
+        the note's timestamp at the next checkpoint.
+        """
+        key = f"__sections__/{note_rid.reference}"
+        with self.state_lock:
+            previous = dict(self.state.get(key) or {})
+
+        hashes: dict[str, str] = {}
+        emitted = 0
+        for section in split_sections(contents.get("content") or "", self.section_max_level):
+            digest = content_hash(section.content)
+            hashes[section.section_id] = digest
+            if previous.get(section.section_id) == digest:
+                continue
+            section_rid = HackMDNoteSection(
+                note_rid.note_id, section.section_id, note_rid.workspace_id
+            )
+            bundle = Bundle.generate(rid=section_rid, contents={
+                "parent_rid": str(note_rid),
+                "note_id": note_rid.note_id,
+                "section_id": section.section_id,
+                "heading": section.heading,
+                "level": section.level,
+                "index": section.index,
+                "title": contents.get("title"),
+                "content": section.content,
+                "content_hash": digest,
+                "last_changed_at": contents.get("last_changed_at"),
+            })
+            self.kobj_queue.push(bundle=bundle)
+            emitted += 1
+
+        removed = previous.keys() - hashes.keys()
+        for section_id in removed:
+            section_rid = HackMDNoteSection(note_rid.note_id, section_id, note_rid.workspace_id)
+            self.kobj_queue.push(rid=section_rid, event_type=EventType.FORGET)
+
+        with self.state_lock:
+            self.state[key] = hashes
+        self.log.debug(
+            f"Queued {emitted} of {len(hashes)} sections for {note_rid} ({len(removed)} removed)"
+        )
+        return emitted
 
     def _poll_mock_data(self):
         """Poll mock data from local files instead of HackMD API."""
@@ -292,7 +1262,8 @@ class HackMDIngestionService:
             return
 
         self.log.info("Polling mock HackMD data...")
-        count = self.mock_loader.load_all()
+        with span("mock_load"):
+            count = self.mock_loader.load_all()
 
         if count:
             self.log.info(f"Processed {count} mock HackMD notes")
@@ -0,0 +1,263 @@
+"""
+Prometheus-style metrics for ingestion, the HackMD client and the bundle handler.
+
+Counters, gauges and histograms are kept in process and rendered in the
+Prometheus text exposition format by `HackMDMetrics.render()`; the
+ingestion service serves them from the node's FastAPI server.
+"""
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; HackMD requests and polls span milliseconds to minutes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines for every labelled series of this metric."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    """Monotonic total, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(Metric):
+    """Current value; either set directly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: dict[LabelKey, float] = {}
+        self._function: Callable[[], float | None] | None = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def set_function(self, function: Callable[[], float | None]):
+        self._function = function
+
+    def value(self, **labels) -> float | None:
+        if self._function and not labels:
+            return self._function()
+        with self._lock:
+            return self._values.get(_label_key(labels))
+
+    def samples(self) -> list[str]:
+        if self._function:
+            try:
+                value = self._function()
+            except Exception:
+                value = None
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in values]
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts plus sum and count per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series[2] if series else 0
+
+    def total(self, **labels) -> float:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series[1] if series else 0.0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += bucket_count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._register(Gauge(name, help))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse a HackMD API path to its route, so note IDs don't become label values."""
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    if "v1" in parts:
+        parts = parts[parts.index("v1") + 1:]
+    if len(parts) == 3 and parts[0] == "teams" and parts[2] == "notes":
+        return "/teams/{team}/notes"
+    if len(parts) == 2 and parts[0] == "notes":
+        return "/notes/{id}"
+    return "/" + "/".join(parts)
+
+
+class HackMDMetrics(MetricsRegistry):
+    """The sensor node's metrics, shared by ingestion, the HackMD client and handlers."""
+
+    def __init__(self):
+        super().__init__()
+        self.polls = self.counter(
+            "hackmd_polls_total", "HackMD polls by result (ok or error)."
+        )
+        self.poll_duration = self.histogram(
+            "hackmd_poll_duration_seconds", "Wall time of a HackMD poll."
+        )
+        self.http_request_duration = self.histogram(
+            "hackmd_http_request_duration_seconds",
+            "HackMD API request latency per endpoint, including failed attempts.",
+        )
+        self.http_responses = self.counter(
+            "hackmd_http_responses_total",
+            "HackMD API responses per endpoint and status code; status=\"error\" for transport errors.",
+        )
+        self.http_retries = self.counter(
+            "hackmd_http_retries_total", "Retried HackMD API requests per endpoint and reason."
+        )
+        self.http_backoff = self.counter(
+            "hackmd_http_backoff_seconds_total", "Total time slept in retry backoff."
+        )
+        self.notes = self.counter(
+            "hackmd_notes_total",
+            "Notes seen by ingestion: listed, changed, skipped (unchanged timestamp), "
+            "suppressed (unchanged content), emitted, failed (fetch or queue rejected).",
+        )
+        self.state_save_duration = self.histogram(
+            "hackmd_state_save_duration_seconds", "Time to commit ingestion state."
+        )
+        self.state_size = self.gauge(
+            "hackmd_state_size_bytes", "Size of the ingestion state file after the last commit."
+        )
+        self.queue_depth = self.gauge(
+            "hackmd_kobj_queue_depth", "Knowledge objects waiting in the kobj queue."
+        )
+        self.backpressure_pauses = self.counter(
+            "hackmd_backpressure_pauses_total",
+            "Times ingestion paused for the kobj queue to drain to its low-water mark.",
+        )
+        self.backpressure_wait = self.counter(
+            "hackmd_backpressure_wait_seconds_total",
+            "Total time ingestion spent paused for the kobj queue.",
+        )
+        self.handler_bundles = self.counter(
+            "hackmd_handler_bundles_total",
+            "HackMD bundles seen by the bundle handler: accepted, stale, unchanged, "
+            "invalid or forgotten.",
+        )
+
+    def mount(self, app, path: str = "/metrics"):
+        """Serve the metrics from a FastAPI app."""
+        from starlette.responses import Response
+
+        def endpoint():
+            return Response(self.render(), media_type=CONTENT_TYPE)
+
+        app.add_api_route(path, endpoint, methods=["GET"], include_in_schema=False)
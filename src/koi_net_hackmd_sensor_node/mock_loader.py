@@ -2,68 +2,281 @@
 """
 Mock data loader for HackMD Sensor Node.
 
-Loads JSON files and processes them through the existing _process_note method.
+Loads JSON files (one bundle per file) and NDJSON/JSONL bundle dumps
+(one bundle per line) and queues them as HackMD note bundles.
 """
 
+import hashlib
 import json
-import os
 import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable
 
 import structlog
-from rid_lib.ext import Bundle
+from koi_net.protocol.event import EventType
+from rid_lib.core import RID
+from rid_lib.ext.utils import b64_decode
 from rid_lib.types import HackMDNote
 
+from .batching import generate_bundles, push_bundles
+
 
 log = structlog.stdlib.get_logger()
 
+STREAM_SUFFIXES = (".ndjson", ".jsonl")
+
+
+@dataclass
+class MockFileEntry:
+    """What was loaded from a mock file, used to skip it on later scans."""
+    mtime_ns: int
+    size: int
+    content_hash: str
+    rid: HackMDNote | None = None
+
+
+@dataclass
+class MockItem:
+    """A note parsed from mock data, with the index entry to record once queued."""
+    rid: HackMDNote
+    contents: dict[str, Any]
+    path: Path | None = None
+    entry: MockFileEntry | None = None
+
 
 class HackMDMockLoader:
-    """Loads mock HackMD note data by processing JSON files."""
-    
+    """Loads mock HackMD note data by processing JSON files.
+
+    Files are read, parsed and queued in batches of `batch_size`, so memory
+    stays bounded however large the corpus is. With `fast` set, note RIDs
+    come from the filenames (base64-encoded RIDs, as in the node cache) and
+    files are read on `workers` threads.
+    """
+
     def __init__(
         self,
         mock_data_path: str,
         kobj_queue,
         log=None,
+        hash_workers: int = 0,
+        forget_deleted: bool = False,
+        fast: bool = False,
+        workers: int = 8,
+        batch_size: int = 1000,
+        throttle: Callable[[], Any] | None = None,
     ):
         self.mock_data_path = Path(mock_data_path)
         self.kobj_queue = kobj_queue
+        self.hash_workers = hash_workers
+        # Push FORGET events for notes whose mock file was removed
+        self.forget_deleted = forget_deleted
+        self.fast = fast
+        self.workers = max(1, workers) if fast else 1
+        self.batch_size = max(1, batch_size)
+        # Called before each batch is queued, e.g. to wait out queue backpressure
+        self.throttle = throttle
+        # Files seen by previous scans; unchanged files are skipped without reading
+        self.index: dict[Path, MockFileEntry] = {}
         self.log = log or structlog.stdlib.get_logger()
-    
+
     def _extract_note_id_from_orn(self, orn: str) -> str:
         match = re.match(r"orn:hackmd\.note:([a-f0-9]+)", orn)
         if match:
             return match.group(1)
         raise ValueError(f"Invalid HackMD ORN: {orn}")
-    
+
+    @staticmethod
+    def _rid_from_filename(filepath: Path) -> HackMDNote | None:
+        """Decode a cache-style `<base64 RID>.json` filename, if it is one."""
+        try:
+            rid = RID.from_string(b64_decode(filepath.stem))
+        except Exception:
+            return None
+        return rid if isinstance(rid, HackMDNote) else None
+
+    def _parse_bundle(self, data: dict, rid: HackMDNote | None = None) -> tuple[HackMDNote, dict]:
+        contents = data.get("contents", {})
+        if rid is None:
+            manifest_rid = data.get("manifest", {}).get("rid", "")
+            note_id = self._extract_note_id_from_orn(manifest_rid)
+            workspace_id = contents.get("team_path") or contents.get("workspace_id")
+            rid = HackMDNote(note_id, workspace_id)
+        return rid, contents
+
     def load_all(self):
-        """Load all mock JSON files and process them."""
+        """Load new or modified mock files and process them.
+
+        Files whose mtime and size match the previous scan are skipped without
+        being opened; files touched without a content change are skipped after
+        hashing. Returns the number of notes queued.
+        """
         if not self.mock_data_path.exists():
             self.log.warning(f"Mock data path does not exist: {self.mock_data_path}")
             return 0
-        
+
+        seen: set[Path] = set()
+        counts = {"unchanged": 0}
+        loaded = 0
+        for batch in self.iter_batches(seen, counts):
+            loaded += self._queue_batch(batch)
+
+        forgotten = self._drop_deleted(seen)
+        self.log.info(
+            f"Loaded {loaded} mock HackMD notes "
+            f"({counts['unchanged']} unchanged, {forgotten} removed)"
+        )
+        return loaded
+
+    def iter_batches(
+        self, seen: set[Path] | None = None, counts: dict[str, int] | None = None
+    ) -> Iterator[list[MockItem]]:
+        """Lazily yield batches of changed notes from the mock data path."""
+        seen = set() if seen is None else seen
+        counts = {"unchanged": 0} if counts is None else counts
+
+        if self.mock_data_path.is_file():
+            streams, files = [self.mock_data_path], []
+        else:
+            streams = sorted(
+                path for suffix in STREAM_SUFFIXES for path in self.mock_data_path.glob(f"*{suffix}")
+            )
+            files = self.mock_data_path.glob("*.json")
+
+        for stream in streams:
+            seen.add(stream)
+            yield from self._iter_stream(stream, counts)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hackmd-mock") as pool:
+            pending: list[tuple[Path, Any]] = []
+            for filepath in files:
+                seen.add(filepath)
+                try:
+                    stat = filepath.stat()
+                except OSError as e:
+                    self.log.error(f"Failed to load {filepath.name}: {e}")
+                    continue
+                entry = self.index.get(filepath)
+                if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                pending.append((filepath, stat))
+                if len(pending) >= self.batch_size:
+                    yield self._read_files(pending, pool, counts)
+                    pending = []
+            if pending:
+                yield self._read_files(pending, pool, counts)
+
+    def _read_files(self, pending: list[tuple[Path, Any]], pool, counts) -> list[MockItem]:
+        mapper = pool.map if self.workers > 1 else map
+        items = []
+        for result in mapper(self._read_file, pending):
+            if result is None:
+                counts["unchanged"] += 1
+            elif result is not False:
+                items.append(result)
+        return items
+
+    def _read_file(self, pending: tuple[Path, Any]) -> MockItem | None | bool:
+        """Parse one mock file; None if its content is unchanged, False on error."""
+        filepath, stat = pending
+        try:
+            raw = filepath.read_bytes()
+            content_hash = hashlib.sha256(raw).hexdigest()
+            entry = self.index.get(filepath)
+            if entry and entry.content_hash == content_hash:
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                return None
+
+            rid = self._rid_from_filename(filepath) if self.fast else None
+            rid, contents = self._parse_bundle(json.loads(raw), rid)
+            entry = MockFileEntry(stat.st_mtime_ns, stat.st_size, content_hash, rid)
+            return MockItem(rid, contents, filepath, entry)
+        except Exception as e:
+            self.log.error(f"Failed to load {filepath.name}: {e}")
+            return False
+
+    def _iter_stream(self, stream: Path, counts) -> Iterator[list[MockItem]]:
+        """Yield batches from an NDJSON/JSONL dump, one bundle per line.
+
+        The dump is indexed as a whole: an unchanged dump is skipped, a changed
+        one is replayed in full.
+        """
+        stat = stream.stat()
+        entry = self.index.get(stream)
+        if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            counts["unchanged"] += 1
+            return
+        content_hash = self._hash_file(stream)
+        if entry and entry.content_hash == content_hash:
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            counts["unchanged"] += 1
+            return
+
+        batch: list[MockItem] = []
+        with open(stream, "r") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    rid, contents = self._parse_bundle(json.loads(line))
+                except Exception as e:
+                    self.log.error(f"Failed to load {stream.name}:{line_no}: {e}")
+                    continue
+                batch.append(MockItem(rid, contents))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        # Marked as loaded with the last batch, so a dump cut short is replayed
+        entry = MockFileEntry(stat.st_mtime_ns, stat.st_size, content_hash)
+        if batch:
+            batch[-1].path, batch[-1].entry = stream, entry
+            yield batch
+        else:
+            self.index[stream] = entry
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _queue_batch(self, batch: Iterable[MockItem]) -> int:
+        """Generate and queue bundles for a batch; returns how many were accepted."""
+        batch = list(batch)
+        if not batch:
+            return 0
+        if self.throttle:
+            self.throttle()
+
+        # Bundles are hashed and queued as one batch rather than per file
+        bundles = generate_bundles([(item.rid, item.contents) for item in batch], self.hash_workers)
+        generated = [
+            (bundle, item) for bundle, item in zip(bundles, batch, strict=True) if bundle is not None
+        ]
+        accepted = push_bundles(self.kobj_queue, [bundle for bundle, _ in generated])
         loaded = 0
-        for filepath in self.mock_data_path.glob("*.json"):
-            try:
-                with open(filepath, "r") as f:
-                    data = json.load(f)
-                
-                contents = data.get("contents", {})
-                manifest_rid = data.get("manifest", {}).get("rid", "")
-                
-                note_id = self._extract_note_id_from_orn(manifest_rid)
-                workspace_id = contents.get("team_path") or contents.get("workspace_id")
-                
-                note_rid = HackMDNote(note_id, workspace_id)
-                bundle = Bundle.generate(rid=note_rid, contents=contents)
-                
-                self.kobj_queue.push(bundle=bundle)
-                self.log.debug(f"Queued mock HackMD note: {note_rid}")
-                loaded += 1
-                
-            except Exception as e:
-                self.log.error(f"Failed to load {filepath.name}: {e}")
-        
-        self.log.info(f"Loaded {loaded} mock HackMD notes")
+        for (_, item), ok in zip(generated, accepted, strict=True):
+            if not ok:
+                # Rejected files stay out of the index so the next scan retries them
+                continue
+            loaded += 1
+            if item.path is not None:
+                self.index[item.path] = item.entry
         return loaded
+
+    def _drop_deleted(self, seen: set[Path]) -> int:
+        """Remove index entries for deleted files, forgetting their notes if enabled."""
+        removed = [path for path in self.index if path not in seen]
+        for path in removed:
+            entry = self.index.pop(path)
+            if self.forget_deleted and entry.rid is not None:
+                try:
+                    self.kobj_queue.push(rid=entry.rid, event_type=EventType.FORGET)
+                except Exception as e:
+                    self.log.error(f"Failed to forget mock note {entry.rid}: {e}")
+        return len(removed)
@@ -1,5 +1,7 @@
+import hashlib
+import json
 from typing import Optional, Union
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict, PrivateAttr
 from datetime import datetime
 
 
@@ -34,6 +36,24 @@ class HackMDUser(BaseModel):
     biography: Optional[str] = None
 
 
+class HackMDNoteDeltaObject(BaseModel):
+    """Contents of a `HackMDNoteDelta` bundle emitted in delta mode.
+
+    `ops` turn the content of the note bundle with manifest hash
+    `base_sha256` into that of the bundle with hash `sha256`; `note` holds
+    the new bundle's other fields, with `content` left null.
+    """
+    model_config = ConfigDict(extra="ignore")
+
+    note_rid: str
+    base_sha256: str
+    sha256: str
+    content_hash: str
+    base_hash: str
+    ops: list[list] = Field(default_factory=list)
+    note: dict
+
+
 class HackMDNoteObject(BaseModel):
     model_config = ConfigDict(populate_by_name=True, extra="ignore")
     
@@ -72,3 +92,57 @@ class HackMDNoteObject(BaseModel):
     def workspace_id(self) -> Optional[str]:
         """Alias for team_path for backward compatibility."""
         return self.team_path
+
+    def content_digest(self) -> Optional[str]:
+        """Hash of the normalized title, tags and content, or None without content.
+
+        Line endings and trailing whitespace are normalized away, so
+        re-saves and timestamp-only bumps produce the same digest.
+        """
+        if self.content is None:
+            return None
+        content = "\n".join(
+            line.rstrip() for line in self.content.replace("\r\n", "\n").split("\n")
+        ).rstrip("\n")
+        normalized = {
+            "title": self.title.strip(),
+            "tags": sorted(tag.strip() for tag in self.tags or []),
+            "content": content,
+        }
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+class HackMDNoteSectionObject(BaseModel):
+    """Contents of a section bundle emitted in section chunking mode."""
+    model_config = ConfigDict(extra="ignore")
+
+    parent_rid: str
+    note_id: str
+    section_id: str
+    heading: Optional[str] = None
+    level: int = 0
+    index: int = 0
+    title: Optional[str] = None
+    content: str
+    content_hash: str
+    last_changed_at: Optional[int] = None
+
+
+class HackMDNoteMetadata(BaseModel):
+    """Lightweight note record used for change detection before content is fetched."""
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    note_id: str = Field(alias="id")
+    team_path: Optional[str] = Field(default=None, alias="teamPath")
+    created_at: Optional[int] = Field(default=None, alias="createdAt")
+    last_changed_at: Optional[int] = Field(default=None, alias="lastChangedAt")
+    title_updated_at: Optional[int] = Field(default=None, alias="titleUpdatedAt")
+    tags_updated_at: Optional[int] = Field(default=None, alias="tagsUpdatedAt")
+
+    # Raw API record the metadata was derived from, reused when the full note is built
+    _payload: dict = PrivateAttr(default_factory=dict)
+
+    @property
+    def workspace_id(self) -> Optional[str]:
+        """Alias for team_path, mirroring HackMDNoteObject."""
+        return self.team_path
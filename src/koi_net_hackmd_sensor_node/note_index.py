@@ -0,0 +1,83 @@
+import threading
+from typing import Any, NamedTuple
+
+import structlog
+from koi_net.components import Cache
+from rid_lib.core import RID
+from rid_lib.types import HackMDNote
+
+from .models import HackMDNoteObject
+
+log = structlog.stdlib.get_logger()
+
+
+class NoteIndexEntry(NamedTuple):
+    last_changed_at: int | None
+    digest: str | None
+
+
+def contents_last_changed_at(contents: dict[str, Any] | None) -> int | None:
+    """Read `last_changed_at` from raw bundle contents without validating them.
+
+    Bundles queued by the ingestion service use field names, while raw API
+    payloads (mock data, fixtures) use HackMD's camelCase aliases.
+    """
+    if not contents:
+        return None
+    value = contents.get("last_changed_at", contents.get("lastChangedAt"))
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class NoteIndex:
+    """In-memory index of the last accepted revision of each cached note.
+
+    Maps a note RID to its `last_changed_at` and content digest so the
+    bundle handler can reject stale and no-op updates with a dict lookup
+    instead of reading and re-validating the cached bundle. The index is
+    warmed from the node cache on first use and updated as bundles are
+    accepted.
+    """
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._entries: dict[RID, NoteIndexEntry] = {}
+        self._warmed = False
+
+    def start(self):
+        self.warm()
+
+    def warm(self):
+        """Load entries for every HackMD note bundle already in the cache."""
+        with self._lock:
+            if self._warmed:
+                return
+            for rid in self.cache.list_rids(rid_types=[HackMDNote]):
+                bundle = self.cache.read(rid)
+                if not bundle:
+                    continue
+                try:
+                    note = HackMDNoteObject.model_validate(bundle.contents)
+                except Exception:
+                    continue
+                self._entries[rid] = NoteIndexEntry(
+                    note.last_changed_at, note.content_digest()
+                )
+            self._warmed = True
+        log.debug("Warmed HackMD note index with %d notes", len(self._entries))
+
+    def get(self, rid: RID) -> NoteIndexEntry | None:
+        if not self._warmed:
+            self.warm()
+        return self._entries.get(rid)
+
+    def update(self, rid: RID, note: HackMDNoteObject):
+        with self._lock:
+            self._entries[rid] = NoteIndexEntry(note.last_changed_at, note.content_digest())
+
+    def remove(self, rid: RID):
+        with self._lock:
+            self._entries.pop(rid, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,207 @@
+"""
+Per-stage timing spans for poll cycles and an on-demand sampling profiler.
+
+`record_poll()` opens a recorder for one poll; code anywhere below it
+(including fetch threads started through `HackMDClient.map_concurrent`)
+times its stage with `span(name)`. Spans nest by call structure, so
+`span("http")` inside `span("fetch")` is recorded as `fetch.http`. Outside
+a poll, `span` is a no-op.
+
+`PollProfiler` samples the stacks of all threads while the next N polls
+run and writes them in the folded-stack format read by flamegraph tools.
+"""
+
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+import structlog
+from fastapi import HTTPException, Request
+
+log = structlog.stdlib.get_logger()
+
+_poll_ids = itertools.count(1)
+# (recorder, current span path) for the poll this context belongs to
+_current: ContextVar[tuple["PollSpans", tuple[str, ...]] | None] = ContextVar(
+    "hackmd_poll_spans", default=None
+)
+
+
+class PollSpans:
+    """Total time and count per span path within one poll.
+
+    Spans opened concurrently (e.g. one `fetch.http` per fetch thread) are
+    summed, so a nested stage can add up to more than its parent's wall time.
+    """
+
+    def __init__(self, poll_id: int, clock: Callable[[], float] = time.perf_counter):
+        self.poll_id = poll_id
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seconds: dict[str, float] = {}
+        self._counts: dict[str, int] = {}
+        self.started = clock()
+
+    def add(self, path: str, seconds: float):
+        with self._lock:
+            self._seconds[path] = self._seconds.get(path, 0.0) + seconds
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """`{path: {"ms": total milliseconds, "count": spans}}`, in first-seen order."""
+        with self._lock:
+            return {
+                path: {"ms": round(seconds * 1000, 3), "count": self._counts[path]}
+                for path, seconds in self._seconds.items()
+            }
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage `name` of the current poll, if any."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    recorder, parent = current
+    path = (*parent, name)
+    token = _current.set((recorder, path))
+    started = recorder._clock()
+    try:
+        yield
+    finally:
+        recorder.add(".".join(path), recorder._clock() - started)
+        _current.reset(token)
+
+
+@contextmanager
+def record_poll(clock: Callable[[], float] = time.perf_counter) -> Iterator[PollSpans]:
+    """Collect spans for one poll and bind its `poll_id` into the structlog context."""
+    recorder = PollSpans(next(_poll_ids), clock)
+    token = _current.set((recorder, ()))
+    bound = structlog.contextvars.bind_contextvars(poll_id=recorder.poll_id)
+    try:
+        yield recorder
+    finally:
+        structlog.contextvars.reset_contextvars(**bound)
+        _current.reset(token)
+
+
+class PollProfiler:
+    """Samples every thread's stack while the next `request()`-ed polls run.
+
+    Samples from all armed polls are merged into one
+    `hackmd-poll-<timestamp>.folded` file in `output_dir` once the last of
+    them finishes. At most `max_polls` polls are armed at a time.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        interval: float = 0.005,
+        max_depth: int = 64,
+        max_polls: int = 10,
+    ):
+        self.output_dir = output_dir
+        self.interval = max(0.001, interval)
+        self.max_depth = max_depth
+        self.max_polls = max(1, max_polls)
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._stacks: Counter[str] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._sampling = threading.Event()
+        self.last_output: str | None = None
+
+    @property
+    def armed(self) -> int:
+        return self._remaining
+
+    def request(self, polls: int = 1) -> int:
+        """Profile the next `polls` polls (up to `max_polls`); returns how many are now pending."""
+        polls = min(self.max_polls, max(1, polls))
+        with self._lock:
+            self._remaining = max(self._remaining, polls)
+            log.info(f"HackMD profiler armed for {self._remaining} polls")
+            return self._remaining
+
+    @contextmanager
+    def poll(self) -> Iterator[None]:
+        """Sample stacks for the enclosed poll if profiling was requested."""
+        if not self._remaining:
+            yield
+            return
+        self._start_sampler()
+        try:
+            yield
+        finally:
+            self._stop_sampler()
+            with self._lock:
+                self._remaining = max(0, self._remaining - 1)
+                done = not self._remaining
+            if done:
+                self._write()
+
+    def _start_sampler(self):
+        self._sampling.set()
+        self._sampler = threading.Thread(target=self._sample, name="hackmd-profiler", daemon=True)
+        self._sampler.start()
+
+    def _stop_sampler(self):
+        self._sampling.clear()
+        if self._sampler:
+            self._sampler.join(timeout=5)
+            self._sampler = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while self._sampling.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def _write(self):
+        stacks, self._stacks = self._stacks, Counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"hackmd-poll-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.last_output = path
+        log.info(f"Wrote HackMD poll profile with {sum(stacks.values())} samples to {path}")
+
+    def mount(self, app, token: str, path: str = "/hackmd/profile"):
+        """Add `POST <path>?polls=N`, arming the profiler, to a FastAPI app.
+
+        Requests must carry `Authorization: Bearer <token>`.
+        """
+        expected = f"Bearer {token}"
+
+        def endpoint(request: Request, polls: int = 1):
+            authorization = request.headers.get("authorization") or ""
+            if not token or not hmac.compare_digest(authorization.encode(), expected.encode()):
+                raise HTTPException(status_code=401, detail="Invalid profiler token")
+            return {
+                "armed": self.request(polls),
+                "output_dir": self.output_dir,
+                "last_output": self.last_output,
+            }
+
+        app.add_api_route(path, endpoint, methods=["POST"], status_code=202)
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping
+
+
+class RateLimiter:
+    """Token bucket shared by every request issued from one HackMD client.
+
+    Starts from an optional static rate (`rate` requests/second, bursts of
+    `burst`). Once responses carry rate-limit headers the limiter mirrors the
+    server's remaining quota and reset time: requests are spread evenly across
+    the window once less than `pace_below` of the quota is left, and a 429 or
+    an exhausted quota holds every caller until exactly the advertised reset.
+    """
+
+    LIMIT_HEADERS = ("x-ratelimit-userlimit", "x-ratelimit-limit")
+    REMAINING_HEADERS = ("x-ratelimit-userremaining", "x-ratelimit-remaining")
+    RESET_HEADERS = ("x-ratelimit-userreset", "x-ratelimit-reset")
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        pace_below: float = 0.1,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = max(1, burst)
+        self.pace_below = pace_below
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+
+        # Learned from response headers
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+
+        # Reporting
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Claim the next request slot and return how long to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._blocked_until, self._next_slot)
+
+            if self.rate:
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    start = max(start, now + -self._tokens / self.rate)
+
+            if self.remaining is not None and self.reset_at is not None:
+                if start < self.reset_at and self.remaining <= 0:
+                    # Quota exhausted: hold until the window resets
+                    start = self.reset_at
+                if start >= self.reset_at:
+                    # Window rolled over; assume a full quota until headers say otherwise
+                    self.remaining = self.limit
+                    self.reset_at = None
+                elif self.limit and self.remaining <= self.limit * self.pace_below:
+                    # Spread what's left of the quota evenly across the window
+                    self._next_slot = start + (self.reset_at - start) / self.remaining
+
+            if self.remaining is not None:
+                self.remaining -= 1
+
+            delay = start - now
+            self.requests += 1
+            self.wait_seconds += delay
+            return delay
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, response: Any) -> float | None:
+        """Learn quota state from a response; return the throttle wait for a 429, if known."""
+        headers = getattr(response, "headers", None) or {}
+        limit = self._header_int(headers, self.LIMIT_HEADERS)
+        remaining = self._header_int(headers, self.REMAINING_HEADERS)
+        reset = self._header_int(headers, self.RESET_HEADERS)
+
+        with self._lock:
+            now = self._clock()
+            if limit is not None:
+                self.limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+            if reset is not None:
+                self.reset_at = self._reset_to_epoch(reset, now)
+
+            if getattr(response, "status_code", None) != 429:
+                return None
+
+            self.throttled += 1
+            until = self._parse_retry_after(headers.get("retry-after"), now)
+            if until is None and self.reset_at and self.reset_at > now:
+                until = self.reset_at
+            if until is None:
+                return None
+            self._blocked_until = max(self._blocked_until, until)
+            return self._blocked_until - now
+
+    def throttle_remaining(self) -> float:
+        """Seconds until a server-imposed throttle lifts (0 if not throttled)."""
+        with self._lock:
+            return max(0.0, self._blocked_until - self._clock())
+
+    def stats(self) -> dict[str, Any]:
+        """Quota usage snapshot for reporting."""
+        with self._lock:
+            now = self._clock()
+            utilization = None
+            if self.limit and self.remaining is not None:
+                utilization = 1 - max(0, self.remaining) / self.limit
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "utilization": utilization,
+                "reset_in": max(0.0, self.reset_at - now) if self.reset_at else None,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "wait_seconds": self.wait_seconds,
+            }
+
+    @staticmethod
+    def _header_int(headers: Mapping[str, str], names: tuple[str, ...]) -> int | None:
+        for name in names:
+            value = headers.get(name)
+            if value is None:
+                continue
+            try:
+                return int(float(value))
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def _reset_to_epoch(value: int, now: float) -> float:
+        # Reset headers are either epoch seconds/milliseconds or seconds from now
+        if value > 1e12:
+            return value / 1000
+        if value > 1e9:
+            return float(value)
+        return now + value
+
+    @staticmethod
+    def _parse_retry_after(value: str | None, now: float) -> float | None:
+        if not value:
+            return None
+        try:
+            return now + max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,113 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class NoteSchedule:
+    interval: float
+    next_due: float = 0.0
+    last_changed_at: int | None = None
+    # Exponentially weighted mean of seconds between observed changes
+    mean_change_gap: float | None = None
+
+
+class AdaptiveSchedule:
+    """Per-note polling intervals driven by observed change frequency.
+
+    Each time a note is polled its `last_changed_at` is compared with the
+    previous observation. A change pulls the interval down to half the
+    note's mean gap between changes; an unchanged poll doubles it. Intervals
+    stay within [`min_interval`, `max_interval`], so live notes are checked
+    every few seconds while dormant ones back off to the maximum. Notes that
+    could not be fetched are recorded with `miss` and back off the same way,
+    so a deleted note doesn't keep the poll loop awake.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        smoothing: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.smoothing = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._notes: dict[str, NoteSchedule] = {}
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def due(self, keys: list[str]) -> list[str]:
+        """Keys whose next poll time has passed; unseen keys are always due."""
+        now = self._clock()
+        with self._lock:
+            return [
+                key for key in keys
+                if key not in self._notes or self._notes[key].next_due <= now
+            ]
+
+    def observe(self, key: str, last_changed_at: int | None):
+        """Record a poll of `key` and schedule its next one."""
+        now = self._clock()
+        with self._lock:
+            entry = self._notes.get(key)
+            if entry is None:
+                # First sighting: start hot and let it back off if idle
+                self._notes[key] = NoteSchedule(
+                    interval=self.min_interval,
+                    next_due=now + self.min_interval,
+                    last_changed_at=last_changed_at,
+                )
+                return
+
+            changed = (
+                last_changed_at is not None
+                and entry.last_changed_at is not None
+                and last_changed_at > entry.last_changed_at
+            )
+            if changed:
+                gap = (last_changed_at - entry.last_changed_at) / 1000
+                if entry.mean_change_gap is None:
+                    entry.mean_change_gap = gap
+                else:
+                    entry.mean_change_gap = (
+                        self.smoothing * gap + (1 - self.smoothing) * entry.mean_change_gap
+                    )
+                entry.interval = self._clamp(entry.mean_change_gap / 2)
+            else:
+                entry.interval = self._clamp(entry.interval * 2)
+
+            if last_changed_at is not None:
+                entry.last_changed_at = last_changed_at
+            entry.next_due = now + entry.interval
+
+    def miss(self, key: str):
+        """Record a poll of `key` that returned no note (deleted, 404, failed fetch)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._notes.get(key)
+            if entry is None:
+                entry = self._notes[key] = NoteSchedule(interval=self.min_interval)
+            else:
+                entry.interval = self._clamp(entry.interval * 2)
+            entry.next_due = now + entry.interval
+
+    def seconds_until_next_due(self, keys: list[str]) -> float:
+        """Seconds until the earliest of `keys` is due (0 if one is due now)."""
+        now = self._clock()
+        with self._lock:
+            if any(key not in self._notes for key in keys):
+                return 0.0
+            if not keys:
+                return self.max_interval
+            return max(0.0, min(self._notes[key].next_due for key in keys) - now)
+
+    def interval(self, key: str) -> float | None:
+        with self._lock:
+            entry = self._notes.get(key)
+            return entry.interval if entry else None
@@ -0,0 +1,103 @@
+import re
+from dataclasses import dataclass
+
+from rid_lib.core import ORN
+
+HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.*?)[ \t#]*$")
+FENCE_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})")
+PREAMBLE_ID = "_preamble"
+
+
+class HackMDNoteSection(ORN):
+    """A heading-delimited section of a HackMD note.
+
+    The reference is the parent note's reference followed by `#` and the
+    section's heading path, e.g. `team/abc123#setup/install`.
+    """
+    namespace = "hackmd.note.section"
+
+    def __init__(self, note_id: str, section_id: str, workspace_id: str | None = None):
+        self.note_id = note_id
+        self.section_id = section_id
+        self.workspace_id = workspace_id
+
+    @property
+    def reference(self) -> str:
+        note = f"{self.workspace_id}/{self.note_id}" if self.workspace_id else self.note_id
+        return f"{note}#{self.section_id}"
+
+    @classmethod
+    def from_reference(cls, reference: str) -> "HackMDNoteSection":
+        note, section_id = reference.split("#", 1)
+        if "/" in note:
+            workspace_id, note_id = note.split("/", 1)
+            return cls(note_id=note_id, section_id=section_id, workspace_id=workspace_id)
+        return cls(note_id=note, section_id=section_id)
+
+
+@dataclass
+class NoteSection:
+    section_id: str
+    heading: str | None
+    level: int
+    index: int
+    content: str
+
+
+def _slug(heading: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", heading.lower()).strip("-") or "section"
+
+
+def split_sections(content: str, max_level: int = 3) -> list[NoteSection]:
+    """Split Markdown into sections at ATX headings up to `max_level`.
+
+    Section IDs are the slugged heading path (`setup/install`), so they stay
+    stable when other sections are edited; repeated paths get a numeric
+    suffix. Text before the first heading becomes the `_preamble` section.
+    Headings inside fenced code blocks are ignored.
+    """
+    sections: list[NoteSection] = []
+    stack: list[tuple[int, str]] = []
+    seen: dict[str, int] = {}
+    current: dict = {"section_id": PREAMBLE_ID, "heading": None, "level": 0, "lines": []}
+    fence: str | None = None
+
+    def flush():
+        text = "".join(current["lines"])
+        if current["heading"] is None and not text.strip():
+            return
+        sections.append(NoteSection(
+            section_id=current["section_id"],
+            heading=current["heading"],
+            level=current["level"],
+            index=len(sections),
+            content=text,
+        ))
+
+    for line in content.splitlines(keepends=True):
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None:
+            heading_match = HEADING_RE.match(line.rstrip("\r\n"))
+            if heading_match and len(heading_match.group(1)) <= max_level:
+                level = len(heading_match.group(1))
+                heading = heading_match.group(2).strip()
+                while stack and stack[-1][0] >= level:
+                    stack.pop()
+                stack.append((level, _slug(heading)))
+                path = "/".join(slug for _, slug in stack)
+                seen[path] = seen.get(path, 0) + 1
+                if seen[path] > 1:
+                    path = f"{path}-{seen[path]}"
+                flush()
+                current = {"section_id": path, "heading": heading, "level": level, "lines": []}
+
+        current["lines"].append(line)
+
+    flush()
+    return sections
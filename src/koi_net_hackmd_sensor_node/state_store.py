@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import abstractmethod
+from collections.abc import Iterator, MutableMapping
+from typing import Any
+
+
+class StateStore(MutableMapping):
+    """Mapping of ingestion state keys to last processed timestamps.
+
+    Mutations are visible immediately; `commit()` makes them durable.
+    `MutableMapping` is an ABC, so backends must implement `commit` too.
+    """
+
+    @abstractmethod
+    def commit(self):
+        """Persist every mutation made since the last commit."""
+
+    def close(self):
+        pass
+
+
+class JSONStateStore(StateStore):
+    """Whole-file JSON state, rewritten atomically on each commit (the default backend)."""
+
+    def __init__(self, path: str, log: logging.Logger = logging.getLogger(__name__)):
+        self.path = path
+        self.log = log
+        self._lock = threading.RLock()
+        self._data: dict[str, Any] = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.log.warning(f"Failed to load state file {self.path}: {e}")
+            return {}
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            return self._data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = value
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def commit(self):
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with self._lock, open(tmp, "w") as f:
+            json.dump(self._data, f, indent=2, default=str)
+            # The rename is only crash-safe once the new contents are on disk
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite state in WAL mode with per-key upserts and lazy reads.
+
+    Writes go into an open transaction and are persisted by `commit()`, so a
+    commit costs only the rows changed since the last one. On first start an
+    existing JSON state file at `migrate_from` is imported and renamed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        migrate_from: str | None = None,
+        log: logging.Logger = logging.getLogger(__name__),
+    ):
+        self.path = path
+        self.log = log
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._db.commit()
+        if migrate_from:
+            self._migrate(migrate_from)
+
+    def _migrate(self, json_path: str):
+        if json_path == self.path or not os.path.exists(json_path) or len(self):
+            return
+        legacy = JSONStateStore(json_path, log=self.log)
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                ((key, json.dumps(legacy[key], default=str)) for key in legacy),
+            )
+            self._db.commit()
+        os.replace(json_path, f"{json_path}.migrated")
+        self.log.info(f"Migrated {len(legacy)} state entries from {json_path} to {self.path}")
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value, default=str)),
+            )
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM state WHERE key = ?", (key,))
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM state")]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM state").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM state")
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+def open_state_store(
+    backend: str,
+    state_path: str,
+    log: logging.Logger = logging.getLogger(__name__),
+) -> StateStore:
+    """Open the configured state backend ("json" or "sqlite") for `state_path`."""
+    if backend == "sqlite":
+        sqlite_path = os.path.splitext(state_path)[0] + ".sqlite3"
+        return SQLiteStateStore(sqlite_path, migrate_from=state_path, log=log)
+    if backend != "json":
+        log.warning(f"Unknown state backend {backend!r}, using json")
+    return JSONStateStore(state_path, log=log)
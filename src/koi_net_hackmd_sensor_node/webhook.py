@@ -0,0 +1,175 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from typing import Any, Callable
+
+import structlog
+from fastapi import HTTPException, Request
+
+log = structlog.stdlib.get_logger()
+
+SIGNATURE_HEADER = "X-HackMD-Signature"
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Signature header value for `body`: `sha256=<hex HMAC-SHA256>`."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Check a signature header against the HMAC-SHA256 of `body`.
+
+    Accepts the hex digest with or without the `sha256=` prefix and compares
+    in constant time.
+    """
+    if not secret or not signature:
+        return False
+    expected = sign_payload(secret, body)
+    signature = signature.strip()
+    if not signature.startswith("sha256="):
+        signature = f"sha256={signature}"
+    return hmac.compare_digest(expected, signature)
+
+
+def note_refs(payload: Any) -> list[tuple[str, str | None]]:
+    """Extract (note_id, team path) pairs from a webhook payload.
+
+    Accepts a single event (`{"note": {...}}`, `{"noteId": ...}` or a bare
+    note record), a `{"notes": [...]}` batch, or a list of events.
+    """
+    if isinstance(payload, list):
+        return [ref for item in payload for ref in note_refs(item)]
+    if not isinstance(payload, dict):
+        return []
+    if isinstance(payload.get("notes"), list):
+        return note_refs(payload["notes"])
+
+    note = payload.get("note") if isinstance(payload.get("note"), dict) else payload
+    note_id = note.get("id") or note.get("noteId") or payload.get("noteId")
+    if not note_id or not isinstance(note_id, str):
+        return []
+    team_path = note.get("teamPath") or payload.get("teamPath") or None
+    return [(note_id, team_path)]
+
+
+class WebhookDebouncer:
+    """Coalesces bursts of webhook events per note.
+
+    Each `submit` (re)starts a note's quiet period of `delay` seconds; once a
+    note has been quiet that long it is handed to `flush` together with any
+    other notes that became due. A typing session that fires dozens of
+    events therefore costs one fetch. A note that never goes quiet is still
+    flushed `max_wait` seconds after its first pending event.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[tuple[str, str | None]]], Any],
+        delay: float = 2.0,
+        max_wait: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.flush = flush
+        self.delay = max(0.0, delay)
+        self.max_wait = max(self.delay, max_wait)
+        self._clock = clock
+        self._cond = threading.Condition()
+        # (note_id, team path) -> time the note becomes due
+        self._pending: dict[tuple[str, str | None], float] = {}
+        # (note_id, team path) -> deadline set by its first pending event
+        self._deadlines: dict[tuple[str, str | None], float] = {}
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+        # Reporting
+        self.received = 0
+        self.flushed = 0
+
+    def submit(self, refs: list[tuple[str, str | None]]):
+        with self._cond:
+            now = self._clock()
+            for ref in refs:
+                deadline = self._deadlines.setdefault(ref, now + self.max_wait)
+                self._pending[ref] = min(now + self.delay, deadline)
+            self.received += len(refs)
+            self._cond.notify()
+
+    def due(self) -> list[tuple[str, str | None]]:
+        """Pop the notes whose quiet period has elapsed."""
+        with self._cond:
+            now = self._clock()
+            ready = [ref for ref, due in self._pending.items() if due <= now]
+            for ref in ready:
+                del self._pending[ref]
+                del self._deadlines[ref]
+            self.flushed += len(ready)
+            return ready
+
+    def _next_due_in(self) -> float | None:
+        if not self._pending:
+            return None
+        return max(0.0, min(self._pending.values()) - self._clock())
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="hackmd-webhook", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._next_due_in()
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+            ready = self.due()
+            if not ready:
+                continue
+            try:
+                self.flush(ready)
+            except Exception as e:
+                log.error(f"Failed to process webhook notes {ready}: {e}")
+
+
+class HackMDWebhook:
+    """Signed webhook route that feeds note change events into ingestion."""
+
+    def __init__(self, secret: str, debouncer: WebhookDebouncer, path: str = "/hackmd/webhook"):
+        self.secret = secret
+        self.debouncer = debouncer
+        self.path = path
+        self.rejected = 0
+
+    def mount(self, app):
+        """Add the webhook route to a FastAPI app."""
+        app.add_api_route(self.path, self.endpoint, methods=["POST"], status_code=202)
+
+    async def endpoint(self, request: Request):
+        body = await request.body()
+        if not verify_signature(self.secret, body, request.headers.get(SIGNATURE_HEADER)):
+            self.rejected += 1
+            raise HTTPException(status_code=401, detail="Invalid signature")
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON payload") from None
+
+        refs = note_refs(payload)
+        self.debouncer.submit(refs)
+        return {"accepted": len(refs)}
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+from koi_net_hackmd_sensor_node.backpressure import QueueBackpressure
+
+
+class DrainingQueue:
+    """Depth source that drains by `rate` objects per check."""
+
+    def __init__(self, depth, rate):
+        self.value = depth
+        self.rate = rate
+
+    def __call__(self):
+        current = self.value
+        self.value = max(0, self.value - self.rate)
+        return current
+
+
+def test_below_high_water_does_not_wait():
+    pressure = QueueBackpressure(lambda: 99, high_water=100, low_water=10, check_interval=0)
+    assert pressure.wait() == 0
+    assert pressure.stats()["pauses"] == 0
+    assert pressure.stats()["max_depth"] == 99
+
+
+def test_waits_until_drained_to_low_water():
+    depth = DrainingQueue(150, rate=20)
+    pressure = QueueBackpressure(depth, high_water=100, low_water=40, check_interval=0)
+    pressure.wait()
+    # Pausing stops at the low-water mark, not just below high water
+    assert depth.value <= 40
+    stats = pressure.stats()
+    assert stats["pauses"] == 1
+    assert stats["max_depth"] == 150
+
+
+def test_async_wait_and_disabled_modes():
+    depth = DrainingQueue(150, rate=50)
+    pressure = QueueBackpressure(depth, high_water=100, low_water=0, check_interval=0)
+    asyncio.run(pressure.wait_async())
+    assert depth.value == 0 and pressure.pauses == 1
+
+    assert QueueBackpressure(lambda: 10_000, high_water=0).wait() == 0
+    assert QueueBackpressure(lambda: None, high_water=1).wait() == 0
+
+
+def test_stop_event_interrupts_wait():
+    stop = threading.Event()
+    stop.set()
+    pressure = QueueBackpressure(lambda: 500, high_water=100, check_interval=10)
+    pressure.wait(stop)
+    assert pressure.pauses == 1
@@ -0,0 +1,40 @@
+import threading
+from unittest.mock import Mock
+
+from koi_net.components import KobjQueue
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote
+
+from koi_net_hackmd_sensor_node.batching import generate_bundles, push_bundles
+
+
+def make_items(count):
+    return [
+        (HackMDNote(f"note-{i}", None), {"note_id": f"note-{i}", "content": "x" * i})
+        for i in range(count)
+    ]
+
+
+def test_generate_bundles_matches_serial_generation_in_order():
+    items = make_items(8)
+    bundles = generate_bundles(items, hash_workers=4)
+    expected = [Bundle.generate(rid=rid, contents=contents) for rid, contents in items]
+    assert [b.manifest.sha256_hash for b in bundles] == [b.manifest.sha256_hash for b in expected]
+    assert [b.rid for b in bundles] == [rid for rid, _ in items]
+
+
+def test_push_bundles_queues_bundles_in_order():
+    kobj_queue = KobjQueue(log=Mock(), shutdown_signal=threading.Event())
+    bundles = generate_bundles(make_items(3))
+
+    assert push_bundles(kobj_queue, bundles) == [True, True, True]
+    assert kobj_queue.q.unfinished_tasks == 3
+    assert [kobj_queue.q.get_nowait().rid for _ in range(3)] == [b.rid for b in bundles]
+
+
+def test_push_bundles_reports_rejections():
+    kobj_queue = Mock()
+    kobj_queue.push.side_effect = [None, RuntimeError("queue closed"), None]
+    bundles = generate_bundles(make_items(3))
+
+    assert push_bundles(kobj_queue, bundles) == [True, False, True]
@@ -0,0 +1,48 @@
+from koi_net_hackmd_sensor_node.body_cache import NoteBodyCache
+
+
+def make_note(note_id, last_changed_at, content):
+    return {"note_id": note_id, "title": note_id, "last_changed_at": last_changed_at, "content": content}
+
+
+def test_get_matches_last_changed_at(tmp_path):
+    cache = NoteBodyCache(str(tmp_path))
+    note = make_note("a", 1, "hello")
+    cache.put("rid-a", note)
+
+    assert cache.get("rid-a") == note
+    assert cache.get("rid-a", last_changed_at=1) == note
+    assert cache.get("rid-a", last_changed_at=2) is None
+    assert cache.get("rid-b") is None
+
+
+def test_identical_contents_share_one_blob(tmp_path):
+    cache = NoteBodyCache(str(tmp_path))
+    note = make_note("a", 1, "same")
+    digest_1 = cache.put("rid-1", note)
+    digest_2 = cache.put("rid-2", note)
+    assert digest_1 == digest_2
+    assert len(list((tmp_path / "blobs").rglob(digest_1))) == 1
+
+
+def test_evicts_least_recently_used_past_budget(tmp_path):
+    # Each record serializes to ~170 bytes, so the budget holds two of them
+    cache = NoteBodyCache(str(tmp_path), max_bytes=400)
+    cache.put("rid-a", make_note("a", 1, "a" * 100))
+    cache.put("rid-b", make_note("b", 1, "b" * 100))
+    cache.get("rid-a")
+    cache.put("rid-c", make_note("c", 1, "c" * 100))
+
+    assert cache.get("rid-b") is None
+    assert cache.get("rid-a") is not None
+    assert cache.get("rid-c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 400
+
+
+def test_index_survives_reopen(tmp_path):
+    cache = NoteBodyCache(str(tmp_path))
+    cache.put("rid-a", make_note("a", 1, "hello"))
+    cache.close()
+    reopened = NoteBodyCache(str(tmp_path))
+    assert reopened.get("rid-a", last_changed_at=1)["content"] == "hello"
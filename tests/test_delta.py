@@ -0,0 +1,83 @@
+import pytest
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote
+
+from koi_net_hackmd_sensor_node.delta import (
+    DeltaEncoder,
+    HackMDNoteDelta,
+    apply_delta,
+    apply_note_delta,
+    content_hash,
+    delta_bundle,
+    diff_lines,
+)
+
+
+def make_body(lines=200):
+    return "".join(f"line {i}: some note text\n" for i in range(lines))
+
+
+def test_diff_lines_round_trips():
+    old = make_body(50)
+    new = old.replace("line 10:", "line ten:").replace("line 40: some note text\n", "") + "tail"
+    assert apply_delta(old, diff_lines(old, new)) == new
+    assert apply_delta("", diff_lines("", new)) == new
+    assert apply_delta(old, diff_lines(old, "")) == ""
+
+
+def test_encoder_sends_delta_then_periodic_snapshot():
+    encoder = DeltaEncoder(snapshot_every=3, min_bytes=0)
+    v1 = {"note_id": "n", "content": make_body()}
+    v2 = {"note_id": "n", "content": v1["content"] + "added\n"}
+    v3 = {"note_id": "n", "content": v2["content"] + "added again\n"}
+
+    assert encoder.encode("rid", v1, None) is None
+
+    second = encoder.encode("rid", v2, v1)
+    assert second["base_hash"] == content_hash(v1["content"])
+    rebuilt = apply_delta(v1["content"], second["ops"])
+    assert content_hash(rebuilt) == second["content_hash"]
+
+    assert encoder.encode("rid", v3, v2)
+    # Third revision since the snapshot: full body again
+    assert encoder.encode("rid", v2, v3) is None
+    assert encoder.stats()["snapshots"] == 2
+
+
+def test_encoder_sends_full_body_when_patch_is_not_smaller():
+    encoder = DeltaEncoder(min_bytes=0)
+    encoder.encode("rid", {"content": "a\n"}, None)
+    assert encoder.encode("rid", {"content": "b\n"}, {"content": "a\n"}) is None
+
+
+def test_encoder_skips_small_notes():
+    encoder = DeltaEncoder(min_bytes=1 << 20)
+    body = make_body()
+    encoder.encode("rid", {"content": body}, None)
+    assert encoder.encode("rid", {"content": body + "x\n"}, {"content": body}) is None
+
+
+def test_delta_rid_shares_the_note_reference():
+    rid = HackMDNoteDelta("abc", "team")
+    assert rid.reference == "team/abc"
+    assert HackMDNoteDelta.from_reference(rid.reference) == rid
+    assert rid.note_rid == HackMDNote("abc", "team")
+
+
+def test_note_delta_rebuilds_target_bundle_only_from_its_base():
+    rid = HackMDNote("abc", "team")
+    base = Bundle.generate(rid=rid, contents={"title": "T", "content": make_body()})
+    target = Bundle.generate(rid=rid, contents={"title": "T2", "content": make_body() + "x\n"})
+    encoder = DeltaEncoder(min_bytes=0)
+    encoder.encode(str(rid), base.contents, None)
+    delta = encoder.encode(str(rid), target.contents, base.contents)
+
+    bundle = delta_bundle(rid, base, target, delta)
+    assert bundle.rid == HackMDNoteDelta("abc", "team")
+    assert bundle.contents["note"]["content"] is None
+    rebuilt = apply_note_delta(base, bundle.contents)
+    assert rebuilt.contents == target.contents
+    assert rebuilt.manifest.sha256_hash == target.manifest.sha256_hash
+
+    with pytest.raises(ValueError):
+        apply_note_delta(target, bundle.contents)
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+from koi_net_hackmd_sensor_node.fake_api import FakeHackMDAPI
+from koi_net_hackmd_sensor_node.hackmd_client import AsyncHackMDClient, HackMDClient
+
+
+class FakeClock:
+    def __init__(self, now=1_760_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(api, **kwargs):
+    client = HackMDClient(api_token="token", base_url="http://fake.local/v1", **kwargs)
+    client.client = httpx.Client(transport=api.transport())
+    return client
+
+
+def test_client_pages_through_team_listing_at_custom_base_url():
+    api = FakeHackMDAPI(notes=25, teams=["team-a", "team-b"])
+    client = make_client(api, workspace_id="team-a")
+
+    pages = list(client.iter_note_metadata_pages(page_size=5))
+    notes = [meta for page, _ in pages for meta in page]
+    assert len(notes) == 13
+    assert {meta.team_path for meta in notes} == {"team-a"}
+
+    note = client.get_note(notes[0])
+    assert note.content.startswith("# Note 0")
+
+
+def test_client_retries_through_5xx_bursts_and_429s():
+    api = FakeHackMDAPI(notes=3)
+    api.inject_errors(2)
+    client = make_client(api, retries=3, backoff_base=0.1, backoff_max=0.1)
+    client.backoff_base = 0.001
+    assert len(client.get_note_metadata()) == 3
+    assert api.stats()["errors"] == 2
+
+    clock = FakeClock()
+    api = FakeHackMDAPI(notes=3, rate_limit=1, rate_window=0.05, clock=clock)
+    client = make_client(api)
+    client.get_note_metadata()
+    response = client.client.get("http://fake.local/v1/notes")
+    assert response.status_code == 429
+    assert float(response.headers["retry-after"]) == 0.05
+    assert response.headers["x-ratelimit-userremaining"] == "0"
+
+
+def test_edits_bump_last_changed_and_etags_revalidate():
+    clock = FakeClock()
+    api = FakeHackMDAPI(notes=1, edit_rate=2.0, clock=clock)
+    http = httpx.Client(transport=api.transport())
+    note_id = next(iter(api.notes))
+    url = f"https://api.hackmd.io/v1/notes/{note_id}"
+
+    first = http.get(url)
+    assert http.get(url, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    clock.now += 1
+    edited = http.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert edited.status_code == 200
+    assert edited.json()["lastChangedAt"] > first.json()["lastChangedAt"]
+    assert api.stats()["edits"] == 2
+
+
+def test_async_transport_applies_latency():
+    api = FakeHackMDAPI(notes=4, latency=0.05)
+
+    async def run():
+        client = AsyncHackMDClient(api_token="token", max_concurrent_requests=4)
+        client.client = httpx.AsyncClient(transport=api.async_transport())
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        notes = await client.map_concurrent(client._fetch_single_note, list(api.notes))
+        elapsed = loop.time() - start
+        await client.aclose()
+        return notes, elapsed
+
+    notes, elapsed = asyncio.run(run())
+    assert len(notes) == 4
+    # Requests overlap, so four 50ms responses take well under 200ms
+    assert 0.05 <= elapsed < 0.15
@@ -1,9 +1,13 @@
+import os
+import threading
+import time
 import types
 
 import httpx
 import pytest
 
 from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.http_cache import ValidatorCache
 
 
 class DummyResponse:
@@ -72,3 +76,115 @@ def test_get_retries_on_timeout(monkeypatch, client, hackmd_payload):
     resp = client._get("https://api.hackmd.io/v1/notes")
     assert resp.json() == [hackmd_payload]
     assert calls["count"] == 2
+
+
+def test_get_note_metadata_skips_content_fetch(monkeypatch, hackmd_payload):
+    client = HackMDClient(api_token="token-123", workspace_id="team-1")
+    listing = {k: v for k, v in hackmd_payload.items() if k != "content"}
+    monkeypatch.setattr(client, "_get", lambda url, params=None, headers=None: DummyResponse(json_data=[listing]))
+
+    def fail_content(note_id):
+        raise AssertionError("content should not be fetched for metadata")
+
+    monkeypatch.setattr(client, "get_note_content", fail_content)
+
+    metadata = client.get_note_metadata(limit=5)
+    assert len(metadata) == 1
+    assert metadata[0].note_id == hackmd_payload["id"]
+    assert metadata[0].team_path == "team-1"
+    assert metadata[0].last_changed_at == hackmd_payload["lastChangedAt"]
+
+    monkeypatch.setattr(client, "get_note_content", lambda note_id: hackmd_payload["content"])
+    note = client.get_note(metadata[0])
+    assert note.content == hackmd_payload["content"]
+    assert note.team_path == "team-1"
+
+
+def test_map_concurrent_preserves_order_and_bounds_in_flight():
+    client = HackMDClient(api_token="token-123", max_concurrent_requests=3)
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    def fetch(item):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.01 * (5 - item % 5))
+        with lock:
+            state["in_flight"] -= 1
+        return item * 2
+
+    items = list(range(10))
+    assert client.map_concurrent(fetch, items) == [i * 2 for i in items]
+    assert 1 < state["peak"] <= 3
+
+
+def test_get_waits_for_retry_after_on_429(monkeypatch, hackmd_payload):
+    client = HackMDClient(api_token="token-123", retries=2, backoff_base=5, backoff_max=5)
+    sleeps = []
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "3"}, request=httpx.Request("GET", "https://api.hackmd.io/v1/notes")),
+        DummyResponse(json_data=[hackmd_payload]),
+    ]
+
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    monkeypatch.setattr(client, "client", types.SimpleNamespace(get=lambda url, params=None, headers=None: responses.pop(0)))
+    resp = client._get("https://api.hackmd.io/v1/notes")
+    assert resp.json() == [hackmd_payload]
+    # Slept once, for the server's Retry-After rather than the 5s backoff
+    assert len(sleeps) == 1
+    assert 2.5 < sleeps[0] <= 3
+    assert client.rate_limiter.stats()["throttled"] == 1
+
+
+def test_conditional_get_serves_304_from_validator_cache(tmp_path, hackmd_payload):
+    client = HackMDClient(api_token="token-123", note_ids=["note-1"], http_cache_path=str(tmp_path / "http"))
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=hackmd_payload, headers={"ETag": '"v1"'})
+
+    client.client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    first = client.get_notes(limit=5)
+    second = client.get_notes(limit=5)
+    assert seen == [None, '"v1"']
+    assert first[0].content == second[0].content == hackmd_payload["content"]
+    stats = client.validator_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes_saved"] > 0
+
+
+def test_iter_note_metadata_pages_stops_when_offset_is_ignored(hackmd_payload):
+    client = HackMDClient(api_token="token-123", workspace_id="team-1")
+    listing = [{**hackmd_payload, "id": f"n{i}"} for i in range(2)]
+    client.client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=listing)))
+
+    pages = list(client.iter_note_metadata_pages(page_size=2))
+    assert [[meta.note_id for meta in page] for page, _ in pages] == [["n0", "n1"], []]
+    assert [next_offset for _, next_offset in pages] == [2, None]
+
+
+def test_validator_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ValidatorCache(str(tmp_path / "http"), max_bytes=3000)
+
+    def ok(url, body):
+        request = httpx.Request("GET", url)
+        return httpx.Response(200, content=body, headers={"ETag": '"v"'}, request=request)
+
+    for i in range(3):
+        cache.resolve(f"https://x/notes/{i}", ok(f"https://x/notes/{i}", b"x" * 600))
+        os.utime(cache._entry_path(f"https://x/notes/{i}"), (i, i))
+
+    # A 304 for note 0 marks it recently used, so note 1 is evicted next
+    cache.resolve("https://x/notes/0", httpx.Response(304, request=httpx.Request("GET", "https://x/notes/0")))
+    cache.resolve("https://x/notes/3", ok("https://x/notes/3", b"x" * 600))
+
+    assert cache.stats()["bytes"] <= 3000
+    assert cache.conditional_headers("https://x/notes/0")
+    assert not cache.conditional_headers("https://x/notes/1")
+    assert cache.conditional_headers("https://x/notes/3")
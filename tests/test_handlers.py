@@ -8,15 +8,22 @@ from koi_net.protocol.knowledge_object import KnowledgeObject
 from koi_net.protocol.event import EventType
 from rid_lib.types import HackMDNote
 from koi_net_hackmd_sensor_node.handlers import hackmd_bundle_handler
+from koi_net_hackmd_sensor_node.metrics import HackMDMetrics
+from koi_net_hackmd_sensor_node.note_index import NoteIndex
 
 
 class DummyCache:
     def __init__(self, entries=None):
         self._entries = entries or {}
+        self.reads = 0
 
     def read(self, rid):
+        self.reads += 1
         return self._entries.get(rid)
 
+    def list_rids(self, rid_types=None):
+        return [rid for rid in self._entries if not rid_types or type(rid) in rid_types]
+
     def write(self, bundle):
         self._entries[bundle.rid] = bundle
 
@@ -24,7 +31,7 @@ class DummyCache:
 @pytest.fixture
 def handler_context():
     cache = DummyCache()
-    return types.SimpleNamespace(cache=cache)
+    return types.SimpleNamespace(cache=cache, note_index=NoteIndex(cache), metrics=HackMDMetrics())
 
 
 def make_bundle(note_data):
@@ -52,3 +59,35 @@ def test_handler_rejects_invalid_payload(handler_context):
     kobj = KnowledgeObject(rid=rid, contents={"invalid": "data"}, event_type=EventType.NEW)
     result = hackmd_bundle_handler(handler_context, kobj)
     assert result is STOP_CHAIN
+
+
+def test_handler_dedupes_timestamp_bump_with_same_content(handler_context, hackmd_payload):
+    handler_context.cache.write(make_bundle(hackmd_payload))
+    bumped = {
+        **hackmd_payload,
+        "lastChangedAt": hackmd_payload["lastChangedAt"] + 1000,
+        "content": hackmd_payload["content"].replace("\n", "\r\n") + "\n",
+    }
+    kobj = KnowledgeObject.from_bundle(make_bundle(bumped), event_type=EventType.UPDATE)
+    assert hackmd_bundle_handler(handler_context, kobj) is STOP_CHAIN
+
+    edited = {**bumped, "content": bumped["content"] + "More text."}
+    kobj = KnowledgeObject.from_bundle(make_bundle(edited), event_type=EventType.UPDATE)
+    assert hackmd_bundle_handler(handler_context, kobj) is None
+
+
+def test_handler_uses_warmed_index_instead_of_cache(handler_context, hackmd_payload):
+    handler_context.cache.write(make_bundle(hackmd_payload))
+    handler_context.note_index.warm()
+    reads = handler_context.cache.reads
+
+    newer = {**hackmd_payload, "lastChangedAt": hackmd_payload["lastChangedAt"] + 1000, "content": "New"}
+    kobj = KnowledgeObject.from_bundle(make_bundle(newer), event_type=EventType.UPDATE)
+    assert hackmd_bundle_handler(handler_context, kobj) is None
+    assert handler_context.metrics.handler_bundles.value(result="accepted") == 1
+
+    # Replaying the older revision is rejected from the updated index
+    kobj = KnowledgeObject.from_bundle(make_bundle(hackmd_payload), event_type=EventType.UPDATE)
+    assert hackmd_bundle_handler(handler_context, kobj) is STOP_CHAIN
+    assert handler_context.cache.reads == reads
+    assert handler_context.metrics.handler_bundles.value(result="stale") == 1
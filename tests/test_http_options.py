@@ -0,0 +1,63 @@
+import types
+from unittest.mock import Mock
+
+import httpx
+
+from koi_net_hackmd_sensor_node import http_options
+from koi_net_hackmd_sensor_node.hackmd_client import AsyncHackMDClient, HackMDClient
+from koi_net_hackmd_sensor_node.http_options import HTTPOptions
+from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from tests.test_ingestion import make_config
+
+
+def test_defaults_keep_previous_client_settings():
+    client = HackMDClient(api_token="token")
+    assert client.client.timeout == httpx.Timeout(connect=30.0, read=60.0, write=30.0, pool=30.0)
+    assert "gzip" in client.client.headers["accept-encoding"]
+    assert client.client.headers["authorization"] == "Bearer token"
+    assert client._request_kwargs("https://api.hackmd.io/v1/notes/abc") == {}
+
+
+def test_options_configure_compression_pool_and_endpoint_timeouts():
+    options = HTTPOptions(
+        compression=False,
+        max_connections=8,
+        keepalive_expiry=30.0,
+        read_timeout=10.0,
+        endpoint_timeouts={"/notes/{id}": 120.0},
+    )
+    client = AsyncHackMDClient(api_token="token", http_options=options)
+    assert client.client.headers["accept-encoding"] == "identity"
+    assert client.client.timeout.read == 10.0
+    assert options.limits().max_connections == 8
+
+    note_timeout = client._request_kwargs("https://api.hackmd.io/v1/notes/abc")["timeout"]
+    assert note_timeout.read == 120.0 and note_timeout.connect == 30.0
+    assert client._request_kwargs("https://api.hackmd.io/v1/teams/lab/notes") == {}
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(http_options, "http2_available", lambda: False)
+    log = Mock()
+    kwargs = HTTPOptions(http2=True).client_kwargs(log)
+    assert kwargs["http2"] is False
+    log.warning.assert_called_once()
+
+
+def test_ingestion_resolves_transport_settings(tmp_path):
+    config = make_config(tmp_path)
+    config.env = types.SimpleNamespace(
+        HACKMD_API_TOKEN="token",
+        HACKMD_HTTP_COMPRESSION="false",
+        HACKMD_HTTP_READ_TIMEOUT_SECONDS="7.5",
+    )
+    config.hackmd.http_max_connections = 12
+    config.hackmd.http_endpoint_timeouts = {"/teams/{team}/notes": 90}
+    service = HackMDIngestionService(config, Mock())
+
+    options = service.client.http_options
+    assert options.compression is False
+    assert options.read_timeout == 7.5
+    assert options.max_connections == 12
+    assert options.endpoint_timeouts == {"/teams/{team}/notes": 90}
+    assert service.client.client.headers["accept-encoding"] == "identity"
@@ -1,13 +1,33 @@
+import asyncio
 import json
+import threading
+import time
 import types
+from unittest.mock import Mock
 
-from rid_lib.types import HackMDNote
+import httpx
+from koi_net.components import BasicNetworkOutputFilter, Cache, KobjQueue
+from koi_net.components.knowledge_handlers.basic_manifest_handler import (
+    BasicManifestHandler,
+)
+from koi_net.components.knowledge_handlers.basic_rid_handler import BasicRidHandler
+from koi_net.components.pipeline import KnowledgePipeline
+from koi_net.protocol.knowledge_object import KnowledgeObject
+from rid_lib.ext import Bundle
+from rid_lib.types import HackMDNote, KoiNetNode
 
+from koi_net_hackmd_sensor_node.delta import HackMDNoteDelta, apply_note_delta
+from koi_net_hackmd_sensor_node.handlers import HackMDBundleHandler, HackMDDeltaEventHandler
+from koi_net_hackmd_sensor_node import ingestion
+from koi_net_hackmd_sensor_node.hackmd_client import AsyncHackMDClient, HackMDClient
 from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from koi_net_hackmd_sensor_node.metrics import HackMDMetrics
+from koi_net_hackmd_sensor_node.note_index import NoteIndex
 
 
 def make_config(tmp_path):
     return types.SimpleNamespace(
+        env=types.SimpleNamespace(HACKMD_API_TOKEN="token"),
         hackmd=types.SimpleNamespace(
             api_token="token",
             workspace_id=None,
@@ -19,17 +39,43 @@ def make_config(tmp_path):
     )
 
 
-def test_poll_once_processes_new_note(tmp_path, fake_node_interface, hackmd_note):
+def make_client(hackmd_payload, fetched, note_ids=None):
+    """Real client over a mock HackMD API listing `note_ids`; content fetches are recorded."""
+    note_ids = note_ids or [hackmd_payload["id"]]
+    listing = [
+        {**{k: v for k, v in hackmd_payload.items() if k != "content"}, "id": note_id}
+        for note_id in note_ids
+    ]
+
+    def handler(request):
+        if request.url.path == "/v1/notes":
+            offset = int(request.url.params.get("offset", 0))
+            limit = int(request.url.params.get("limit", 100))
+            return httpx.Response(200, json=listing[offset:offset + limit])
+        note_id = request.url.path.rsplit("/", 1)[-1]
+        fetched.append(note_id)
+        return httpx.Response(200, json={**hackmd_payload, "id": note_id})
+
+    client = HackMDClient(api_token="token")
+    client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_poll_once_processes_new_note(tmp_path, hackmd_payload, hackmd_note):
     config = make_config(tmp_path)
-    service = HackMDIngestionService(fake_node_interface, config)
-    service.client = types.SimpleNamespace(get_notes=lambda limit: [hackmd_note])
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched)
 
     service.poll_once()
 
-    fake_node_interface.processor.handle.assert_called_once()
-    args, kwargs = fake_node_interface.processor.handle.call_args
+    assert fetched == [hackmd_note.note_id]
+    kobj_queue.push.assert_called_once()
+    args, kwargs = kobj_queue.push.call_args
     bundle = kwargs["bundle"]
     assert isinstance(bundle.rid, HackMDNote)
+    assert bundle.contents["content"] == hackmd_note.content
     key = f"{hackmd_note.workspace_id}/{hackmd_note.note_id}" if hackmd_note.workspace_id else hackmd_note.note_id
     assert service.state[key] == hackmd_note.last_changed_at
     state_file = tmp_path / "state" / "hackmd_state.json"
@@ -37,12 +83,504 @@ def test_poll_once_processes_new_note(tmp_path, fake_node_interface, hackmd_note
     assert stored
 
 
-def test_poll_once_skips_when_no_change(tmp_path, fake_node_interface, hackmd_note):
+def test_poll_once_skips_when_no_change(tmp_path, hackmd_payload, hackmd_note):
     config = make_config(tmp_path)
-    service = HackMDIngestionService(fake_node_interface, config)
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
     key = service._state_key(hackmd_note)
     service.state[key] = hackmd_note.last_changed_at
-    service.client = types.SimpleNamespace(get_notes=lambda limit: [hackmd_note])
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched)
+
+    service.poll_once()
+    assert fetched == []
+    kobj_queue.push.assert_not_called()
+
+
+def test_poll_once_async_fetches_changed_notes(tmp_path, hackmd_payload, hackmd_note):
+    config = make_config(tmp_path)
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    listing = {k: v for k, v in hackmd_payload.items() if k != "content"}
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.path == "/v1/notes":
+            return httpx.Response(200, json=[listing])
+        return httpx.Response(200, json=hackmd_payload)
+
+    async def run():
+        client = AsyncHackMDClient(api_token="token")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await service.poll_once_async(client)
+        await service.poll_once_async(client)
+        await client.aclose()
+
+    asyncio.run(run())
+
+    # Second poll sees unchanged metadata and skips the content fetch
+    assert requested == ["/v1/notes", f"/v1/notes/{hackmd_note.note_id}", "/v1/notes"]
+    kobj_queue.push.assert_called_once()
+    assert service.state[service._state_key(hackmd_note)] == hackmd_note.last_changed_at
+
+
+def test_async_mode_runs_on_server_loop_and_stops(tmp_path):
+    config = make_config(tmp_path)
+    config.hackmd.async_mode = True
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    listener = types.SimpleNamespace(get_loop=lambda: loop)
+    server = types.SimpleNamespace(server=types.SimpleNamespace(servers=[listener]))
+
+    service = HackMDIngestionService(config, Mock(), server=server)
+    polled = threading.Event()
+
+    async def fake_poll(client):
+        polled.set()
+
+    service.poll_once_async = fake_poll
+    try:
+        service.start()
+        assert polled.wait(2)
+        assert service._thread is None
+        task = service._async_task
+        service.stop()
+        assert task.cancelled()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(2)
+
+
+def test_stop_gives_up_on_unresponsive_server_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "LOOP_CALL_TIMEOUT", 0.1)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    listener = types.SimpleNamespace(get_loop=lambda: loop)
+    server = types.SimpleNamespace(server=types.SimpleNamespace(servers=[listener]))
+    service = HackMDIngestionService(make_config(tmp_path), Mock(), server=server)
+    service._async_task = Mock()
+    release = threading.Event()
+    # Something else is hogging the server loop
+    loop.call_soon_threadsafe(release.wait, 5)
+    try:
+        started = time.monotonic()
+        service.stop()
+        assert time.monotonic() - started < 2
+        assert service._async_task is None
+    finally:
+        release.set()
+        # Let the abandoned cancel run before the loop goes away
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), loop).result(2)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(2)
+        loop.close()
+
+
+def test_body_cache_skips_content_fetch(tmp_path, hackmd_payload, hackmd_note):
+    config = make_config(tmp_path)
+    # Opt-in, like the HTTP cache
+    assert HackMDIngestionService(config, Mock()).body_cache is None
+    config.hackmd.body_cache_path = str(tmp_path / "bodies")
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched)
+    service.client.body_cache = service.body_cache
+
+    service.poll_once()
+    # Lost state forces re-processing, but content comes from the body cache
+    service.state.clear()
+    service.poll_once()
+    assert fetched == [hackmd_note.note_id]
+    assert kobj_queue.push.call_count == 2
+    assert kobj_queue.push.call_args.kwargs["bundle"].contents["content"] == hackmd_note.content
+
+
+def test_rejected_push_does_not_advance_state(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    kobj_queue = Mock()
+    kobj_queue.push.side_effect = [None, RuntimeError("queue closed")]
+    service = HackMDIngestionService(config, kobj_queue)
+    service.client = make_client(hackmd_payload, [], ["note-a", "note-b"])
+
+    service.poll_once()
+
+    assert "note-a" in service.state
+    assert "note-b" not in service.state
 
+
+def test_crash_mid_poll_keeps_checkpointed_notes(tmp_path, hackmd_payload):
+    class Crash(BaseException):
+        pass
+
+    config = make_config(tmp_path)
+    config.hackmd.checkpoint_batch_size = 2
+    kobj_queue = Mock()
+    kobj_queue.push.side_effect = [None, None, None, Crash()]
+    service = HackMDIngestionService(config, kobj_queue)
+    service.client = make_client(hackmd_payload, [], ["n1", "n2", "n3", "n4"])
+
+    try:
+        service.poll_once()
+    except Crash:
+        pass
+
+    # Only the first batch was committed; a restart redoes just the tail
+    stored = json.loads((tmp_path / "state" / "hackmd_state.json").read_text())
+    assert set(stored) == {"n1", "n2", "__digest__/n1", "__digest__/n2"}
+
+    restarted = HackMDIngestionService(config, Mock())
+    restarted.client = make_client(hackmd_payload, [], ["n1", "n2", "n3", "n4"])
+    restarted.poll_once()
+    pushed = [call.kwargs["bundle"].contents["note_id"] for call in restarted.kobj_queue.push.call_args_list]
+    assert pushed == ["n3", "n4"]
+
+
+def test_adaptive_polling_fetches_only_due_note_ids(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.note_ids = ["n1", "n2"]
+    config.hackmd.adaptive_polling = True
+    config.hackmd.adaptive_min_interval_seconds = 60
+    service = HackMDIngestionService(config, Mock())
+    requested = []
+
+    def fetch_single(note_id):
+        requested.append(note_id)
+        return {**hackmd_payload, "id": note_id}
+
+    service.client._fetch_single_note = fetch_single
+
+    service.poll_once()
+    assert requested == ["n1", "n2"]
+    # Nothing is due again until the minimum interval passes
     service.poll_once()
-    fake_node_interface.processor.handle.assert_not_called()
+    assert requested == ["n1", "n2"]
+    assert 0 < service._next_poll_delay(0) <= 60
+
+
+def test_adaptive_polling_backs_off_note_ids_that_fail_to_fetch(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.note_ids = ["n1", "gone"]
+    config.hackmd.adaptive_polling = True
+    config.hackmd.adaptive_min_interval_seconds = 60
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    requested = []
+
+    def fetch_single(note_id):
+        requested.append(note_id)
+        if note_id == "gone":
+            raise httpx.HTTPStatusError(
+                "404", request=httpx.Request("GET", "https://x"), response=httpx.Response(404)
+            )
+        return {**hackmd_payload, "id": note_id}
+
+    service.client._fetch_single_note = fetch_single
+
+    # The missing note neither fails the poll nor keeps the loop from sleeping
+    service.poll_once()
+    assert kobj_queue.push.call_count == 1
+    assert 0 < service._next_poll_delay(0) <= 60
+    service.poll_once()
+    assert requested == ["n1", "gone"]
+
+
+def test_adaptive_polling_does_not_back_off_due_ids_beyond_the_poll_limit(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.note_ids = ["n1", "n2", "n3"]
+    config.hackmd.max_notes_per_poll = 2
+    config.hackmd.adaptive_polling = True
+    config.hackmd.adaptive_min_interval_seconds = 60
+    service = HackMDIngestionService(config, Mock())
+    requested = []
+
+    def fetch_single(note_id):
+        requested.append(note_id)
+        return {**hackmd_payload, "id": note_id}
+
+    service.client._fetch_single_note = fetch_single
+
+    service.poll_once()
+    assert requested == ["n1", "n2"]
+    # n3 was never fetched, so it is still due rather than backed off
+    assert service.schedule.due(config.hackmd.note_ids) == ["n3"]
+    service.poll_once()
+    assert requested == ["n1", "n2", "n3"]
+
+
+def test_listing_is_paged_and_resumes_from_cursor(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.max_notes_per_poll = 4
+    config.hackmd.page_size = 2
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched, ["n1", "n2", "n3", "n4", "n5"])
+
+    service.poll_once()
+    assert fetched == ["n1", "n2", "n3", "n4"]
+    assert service.state["__cursor__/@me"] == 4
+
+    service.poll_once()
+    assert fetched == ["n1", "n2", "n3", "n4", "n5"]
+    # Listing exhausted: the next poll starts over from the beginning
+    assert service.state["__cursor__/@me"] == 0
+    stored = json.loads((tmp_path / "state" / "hackmd_state.json").read_text())
+    assert stored["__cursor__/@me"] == 0
+
+
+def test_cursor_resets_when_api_ignores_offset(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.max_notes_per_poll = 2
+    config.hackmd.page_size = 2
+    service = HackMDIngestionService(config, Mock())
+    listing = [{**hackmd_payload, "id": f"n{i}"} for i in range(3)]
+    offsets = []
+
+    def handler(request):
+        if request.url.path != "/v1/notes":
+            return httpx.Response(200, json={**hackmd_payload, "id": request.url.path.rsplit("/", 1)[-1]})
+        # Always the first page, whatever the offset
+        offsets.append(int(request.url.params["offset"]))
+        return httpx.Response(200, json=listing[:int(request.url.params["limit"])])
+
+    service.client = HackMDClient(api_token="token")
+    service.client.client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    cursors = []
+    for _ in range(4):
+        service.poll_once()
+        cursors.append(service.state["__cursor__/@me"])
+    # The second poll sees n0 again at offset 2 and starts over instead of advancing to 4
+    assert cursors == [2, 0, 2, 0]
+    assert offsets == [0, 2, 0, 2]
+    assert service.state["__cursor__/@me/first_id"] == "n0"
+
+
+def test_multiple_workspaces_share_client_and_take_turns(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.workspace_ids = ["team-a", "team-b"]
+    config.hackmd.page_size = 1
+    config.hackmd.max_concurrent_requests = 1
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    listings = {
+        "team-a": [{**hackmd_payload, "id": f"a{i}"} for i in range(3)],
+        "team-b": [{**hackmd_payload, "id": "b0"}],
+    }
+    listed = []
+
+    def handler(request):
+        team = request.url.path.split("/")[3]
+        offset = int(request.url.params["offset"])
+        listed.append((team, offset))
+        return httpx.Response(200, json=listings[team][offset:offset + 1])
+
+    service.client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    clients = service._workspace_clients(service.client)
+    assert [c.workspace_id for c in clients] == ["team-a", "team-b"]
+    assert clients[0].client is clients[1].client
+    assert clients[0].rate_limiter is clients[1].rate_limiter
+
+    service.poll_once()
+
+    # Round robin: one page per workspace per turn until each listing ends
+    assert listed == [("team-a", 0), ("team-b", 0), ("team-a", 1), ("team-b", 1), ("team-a", 2), ("team-a", 3)]
+    pushed = [call.kwargs["bundle"].contents["note_id"] for call in kobj_queue.push.call_args_list]
+    assert pushed == ["a0", "b0", "a1", "a2"]
+    assert {"team-a/a0", "team-b/b0", "__cursor__/team-a", "__cursor__/team-b"} <= set(service.state)
+
+
+class FakeGraph:
+    """Network graph whose outgoing neighbors are given per subscribed RID type."""
+
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+
+    def get_neighbors(self, direction=None, status=None, allowed_type=None):
+        return [node for node, types_ in self.subscribers.items() if allowed_type in types_]
+
+
+def make_pipeline(tmp_path, name, identity, graph=None):
+    log = Mock()
+    config = types.SimpleNamespace(koi_net=types.SimpleNamespace(cache_directory_path=name))
+    cache = Cache(config, tmp_path)
+    pipeline = KnowledgePipeline(
+        log=log, cache=cache, request_handler=Mock(), event_queue=Mock(), graph=graph or Mock()
+    )
+    BasicRidHandler(log=log, pipeline=pipeline, identity=identity)
+    BasicManifestHandler(log=log, pipeline=pipeline, cache=cache)
+    return pipeline
+
+
+def add_handler(cls, pipeline, **fields):
+    node_fields = {
+        "identity": Mock(), "cache": pipeline.cache, "config": Mock(),
+        "event_queue": pipeline.event_queue, "kobj_queue": Mock(),
+        "request_handler": Mock(), "resolver": Mock(), "graph": pipeline.graph,
+    }
+    return cls(log=pipeline.log, pipeline=pipeline, **{**node_fields, **fields})
+
+
+def assert_cache_consistent(cache):
+    for rid in cache.list_rids():
+        bundle = cache.read(rid)
+        assert Bundle.generate(rid=rid, contents=bundle.contents).manifest.sha256_hash == (
+            bundle.manifest.sha256_hash
+        )
+
+
+def test_delta_mode_sends_deltas_only_to_delta_subscribers(tmp_path, hackmd_note):
+    config = make_config(tmp_path)
+    config.hackmd.body_cache_path = str(tmp_path / "bodies")
+    config.hackmd.delta_mode = True
+    config.hackmd.delta_min_bytes = 0
+    kobj_queue = KobjQueue(log=Mock(), shutdown_signal=threading.Event())
+    service = HackMDIngestionService(config, kobj_queue)
+
+    sensor_rid = KoiNetNode("sensor", "s")
+    full_rid, delta_rid = KoiNetNode("full", "f"), KoiNetNode("delta", "d")
+    graph = FakeGraph({full_rid: [HackMDNote], delta_rid: [HackMDNote, HackMDNoteDelta]})
+    identity = Mock(rid=sensor_rid)
+    identity.profile.provides.event = [HackMDNote, HackMDNoteDelta]
+    sensor = make_pipeline(tmp_path, "sensor", identity, graph)
+    output_filter = BasicNetworkOutputFilter(
+        log=sensor.log, pipeline=sensor, identity=identity, graph=graph
+    )
+    add_handler(
+        HackMDBundleHandler, sensor,
+        note_index=NoteIndex(sensor.cache), metrics=HackMDMetrics(),
+    )
+    add_handler(
+        HackMDDeltaEventHandler, sensor, kobj_queue=kobj_queue,
+        delta_events=service.delta_events, basic_network_output_filter=output_filter,
+    )
+    receivers = {
+        full_rid: make_pipeline(tmp_path, "full", Mock()),
+        delta_rid: make_pipeline(tmp_path, "delta", Mock()),
+    }
+
+    def run(note_contents):
+        assert service._process_note(rid, note_contents)
+        while not kobj_queue.q.empty():
+            sensor.process(kobj_queue.q.get())
+        received = {node: [] for node in receivers}
+        for call in sensor.event_queue.push.call_args_list:
+            event, target = call.args
+            received[target].append(type(event.rid))
+            receivers[target].process(KnowledgeObject.from_event(event, source=sensor_rid))
+        sensor.event_queue.push.reset_mock()
+        return received
+
+    rid = HackMDNote(hackmd_note.note_id, hackmd_note.workspace_id)
+    contents = hackmd_note.model_dump(mode="json")
+    assert run(contents) == {full_rid: [HackMDNote], delta_rid: [HackMDNote]}
+    edited = {**contents, "content": contents["content"] + "\nOne more line.\n",
+              "last_changed_at": contents["last_changed_at"] + 1000}
+    assert run(edited) == {full_rid: [HackMDNote], delta_rid: [HackMDNoteDelta]}
+
+    # Every cached bundle on every node matches its manifest
+    for pipeline in [sensor, *receivers.values()]:
+        assert_cache_consistent(pipeline.cache)
+    latest = sensor.cache.read(rid)
+    assert latest.contents["content"] == edited["content"]
+    assert receivers[full_rid].cache.read(rid).contents == latest.contents
+    # The delta subscriber keeps the previous note and rebuilds the latest from the delta
+    delta_cache = receivers[delta_rid].cache
+    assert delta_cache.read(rid).contents["content"] == contents["content"]
+    rebuilt = apply_note_delta(delta_cache.read(rid), delta_cache.read(HackMDNoteDelta(
+        hackmd_note.note_id, hackmd_note.workspace_id
+    )).contents)
+    assert rebuilt.manifest.sha256_hash == latest.manifest.sha256_hash
+    assert len(service.delta_events) == 0
+
+
+def test_section_chunking_emits_only_changed_sections(tmp_path, hackmd_note):
+    config = make_config(tmp_path)
+    config.hackmd.section_chunking = True
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    rid = HackMDNote(hackmd_note.note_id, hackmd_note.workspace_id)
+    contents = {
+        **hackmd_note.model_dump(mode="json"),
+        "content": "# One\nfirst\n# Two\nsecond\n# Three\nthird\n",
+    }
+
+    service._process_note(rid, contents)
+    assert kobj_queue.push.call_count == 4
+    kobj_queue.push.reset_mock()
+
+    edited = {**contents, "content": "# One\nfirst\n# Two\nsecond, edited\n"}
+    service._process_note(rid, edited)
+    pushed = [c.kwargs for c in kobj_queue.push.call_args_list]
+    assert pushed[0]["bundle"].rid == rid
+    assert [p["bundle"].rid.section_id for p in pushed[1:] if "bundle" in p] == ["two"]
+    forgotten = [p["rid"] for p in pushed if "rid" in p]
+    assert [r.section_id for r in forgotten] == ["three"]
+    assert pushed[1]["bundle"].contents["parent_rid"] == str(rid)
+
+
+def test_timestamp_bump_with_same_content_is_suppressed(tmp_path, hackmd_payload, hackmd_note):
+    config = make_config(tmp_path)
+    kobj_queue = Mock()
+    service = HackMDIngestionService(config, kobj_queue)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched)
+    service.poll_once()
+
+    bumped = {**hackmd_payload, "lastChangedAt": hackmd_payload["lastChangedAt"] + 1000}
+    service.client = make_client(bumped, fetched)
+    service.poll_once()
+
+    assert len(fetched) == 2
+    kobj_queue.push.assert_called_once()
+    assert service.suppressed_updates == 1
+    assert service.state[service._state_key(hackmd_note)] == bumped["lastChangedAt"]
+
+
+def test_suppressed_only_batch_is_checkpointed(tmp_path, hackmd_payload, hackmd_note):
+    config = make_config(tmp_path)
+    config.hackmd.note_ids = [hackmd_note.note_id]
+    service = HackMDIngestionService(config, Mock())
+    payload = dict(hackmd_payload)
+    service.client._fetch_single_note = lambda note_id: payload
+    service.poll_once()
+
+    payload["lastChangedAt"] += 1000
+    service.poll_once()
+    assert service.suppressed_updates == 1
+
+    # A restart doesn't re-fetch the note whose bump was suppressed
+    restarted = HackMDIngestionService(config, Mock())
+    assert restarted.state[restarted._state_key(hackmd_note)] == payload["lastChangedAt"]
+
+
+def test_poll_waits_for_kobj_queue_to_drain(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.queue_high_water = 3
+    config.hackmd.queue_low_water = 1
+    kobj_queue = KobjQueue(log=Mock(), shutdown_signal=threading.Event())
+    for i in range(3):
+        kobj_queue.q.put(i)
+    service = HackMDIngestionService(config, kobj_queue)
+    service.backpressure.check_interval = 0.01
+    service.client = make_client(hackmd_payload, [])
+
+    def drain():
+        for _ in range(2):
+            kobj_queue.q.get()
+
+    timer = threading.Timer(0.1, drain)
+    timer.start()
+    service.poll_once()
+    timer.join()
+
+    # The note was only queued once the worker caught up
+    assert kobj_queue.q.qsize() == 2
+    assert service.backpressure.stats()["pauses"] == 1
+    assert service.backpressure.stats()["wait_seconds"] >= 0.05
+    assert service.metrics.backpressure_pauses.value() == 1
+    assert service.metrics.backpressure_wait.value() >= 0.05
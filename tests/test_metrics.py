@@ -0,0 +1,92 @@
+import types
+from unittest.mock import Mock
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from koi_net_hackmd_sensor_node.fake_api import FakeHackMDAPI
+from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from koi_net_hackmd_sensor_node.metrics import (
+    HackMDMetrics,
+    MetricsRegistry,
+    endpoint_label,
+)
+from tests.test_ingestion import make_client, make_config
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.")
+    counter.inc(endpoint="/notes", status=200)
+    counter.inc(2, endpoint="/notes", status=200)
+    counter.inc(endpoint='say "hi"', status=503)
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    gauge = registry.gauge("depth", "Depth.")
+    gauge.set_function(lambda: 7)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="/notes",status="200"} 3' in text
+    assert 'requests_total{endpoint="say \\"hi\\"",status="503"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text
+    assert "latency_seconds_count 3" in text
+    assert "depth 7" in text
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/v1/notes/abc123") == "/notes/{id}"
+    assert endpoint_label("/v1/teams/lab/notes") == "/teams/{team}/notes"
+    assert endpoint_label("/v1/notes") == "/notes"
+
+
+def test_client_records_latency_statuses_and_retries(monkeypatch):
+    monkeypatch.setattr("koi_net_hackmd_sensor_node.hackmd_client.time.sleep", lambda seconds: None)
+    api = FakeHackMDAPI(notes=1)
+    metrics = HackMDMetrics()
+    client = HackMDClient(api_token="token", metrics=metrics)
+    client.client = httpx.Client(transport=api.transport())
+    api.inject_errors(2)
+
+    assert len(client.get_note_metadata()) == 1
+
+    assert metrics.http_responses.value(endpoint="/notes", status=503) == 2
+    assert metrics.http_responses.value(endpoint="/notes", status=200) == 1
+    assert metrics.http_retries.value(endpoint="/notes", reason="503") == 2
+    assert metrics.http_backoff.value() > 0
+    assert metrics.http_request_duration.count(endpoint="/notes") == 3
+
+
+def test_poll_metrics_are_served_from_node_server(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    server = types.SimpleNamespace(app=FastAPI())
+    service = HackMDIngestionService(config, Mock(), server=server)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched, ["a", "b"])
+    service.client.metrics = service.metrics
+    service._start_metrics()
+
+    service.poll_once()
+    service.poll_once()
+
+    notes = service.metrics.notes
+    assert notes.value(outcome="listed") == 4
+    assert notes.value(outcome="changed") == 2
+    assert notes.value(outcome="skipped") == 2
+    assert notes.value(outcome="emitted") == 2
+    assert service.metrics.state_save_duration.count() >= 1
+    assert service.metrics.state_size.value() > 0
+
+    response = TestClient(server.app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'hackmd_notes_total{outcome="emitted"} 2' in response.text
+    assert 'hackmd_http_responses_total{endpoint="/notes",status="200"} 2' in response.text
+    assert "hackmd_state_size_bytes" in response.text
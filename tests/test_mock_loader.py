@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import types
+from unittest.mock import Mock
+
+from koi_net.components import Cache, KobjQueue
+from koi_net.components.knowledge_handlers.basic_manifest_handler import (
+    BasicManifestHandler,
+)
+from koi_net.components.knowledge_handlers.basic_rid_handler import BasicRidHandler
+from koi_net.components.pipeline import KnowledgePipeline
+from koi_net.protocol.event import EventType
+from rid_lib.ext.utils import b64_encode
+from rid_lib.types import HackMDNote
+
+from koi_net_hackmd_sensor_node.handlers import HackMDBundleHandler
+from koi_net_hackmd_sensor_node.metrics import HackMDMetrics
+from koi_net_hackmd_sensor_node.mock_loader import HackMDMockLoader
+from koi_net_hackmd_sensor_node.note_index import NoteIndex
+
+
+def write_mock(path, note_id, title):
+    path.write_text(json.dumps({
+        "manifest": {"rid": f"orn:hackmd.note:{note_id}"},
+        "contents": {
+            "note_id": note_id, "title": title, "content": "body",
+            "publish_type": "view", "last_changed_at": 1,
+        },
+    }))
+
+
+def pushed_note_ids(kobj_queue):
+    return sorted(
+        call.kwargs["bundle"].contents["note_id"]
+        for call in kobj_queue.push.call_args_list
+        if "bundle" in call.kwargs
+    )
+
+
+def test_rescan_pushes_only_new_or_modified_files(tmp_path):
+    write_mock(tmp_path / "a.json", "aa", "A")
+    write_mock(tmp_path / "b.json", "bb", "B")
+    kobj_queue = Mock()
+    loader = HackMDMockLoader(str(tmp_path), kobj_queue)
+
+    assert loader.load_all() == 2
+    assert loader.load_all() == 0
+
+    # Touched without a content change: rehashed, not re-pushed
+    stat = (tmp_path / "a.json").stat()
+    os.utime(tmp_path / "a.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    write_mock(tmp_path / "b.json", "bb", "B edited")
+    write_mock(tmp_path / "c.json", "cc", "C")
+
+    kobj_queue.reset_mock()
+    assert loader.load_all() == 2
+    assert pushed_note_ids(kobj_queue) == ["bb", "cc"]
+
+
+def test_deleted_files_are_forgotten_when_enabled(tmp_path):
+    write_mock(tmp_path / "a.json", "aa", "A")
+    kobj_queue = Mock()
+    loader = HackMDMockLoader(str(tmp_path), kobj_queue, forget_deleted=True)
+    loader.load_all()
+
+    (tmp_path / "a.json").unlink()
+    kobj_queue.reset_mock()
+    assert loader.load_all() == 0
+
+    kobj_queue.push.assert_called_once()
+    kwargs = kobj_queue.push.call_args.kwargs
+    assert kwargs["rid"].note_id == "aa"
+    assert kwargs["event_type"] == EventType.FORGET
+    assert loader.index == {}
+
+
+def test_deleted_mock_file_is_removed_from_node_cache(tmp_path):
+    mock_dir = tmp_path / "mock"
+    mock_dir.mkdir()
+    write_mock(mock_dir / "a.json", "aa", "A")
+
+    log = Mock()
+    config = types.SimpleNamespace(
+        koi_net=types.SimpleNamespace(cache_directory_path="cache")
+    )
+    cache = Cache(config, tmp_path)
+    note_index = NoteIndex(cache)
+    pipeline = KnowledgePipeline(
+        log=log, cache=cache, request_handler=Mock(), event_queue=Mock(), graph=Mock()
+    )
+    BasicRidHandler(log=log, pipeline=pipeline, identity=Mock())
+    BasicManifestHandler(log=log, pipeline=pipeline, cache=cache)
+    HackMDBundleHandler(
+        log=log, pipeline=pipeline, identity=Mock(), cache=cache, config=config,
+        event_queue=Mock(), kobj_queue=Mock(), request_handler=Mock(),
+        resolver=Mock(), graph=Mock(), note_index=note_index, metrics=HackMDMetrics(),
+    )
+    kobj_queue = KobjQueue(log=log, shutdown_signal=threading.Event())
+    loader = HackMDMockLoader(str(mock_dir), kobj_queue, forget_deleted=True)
+
+    def run_pipeline():
+        while not kobj_queue.q.empty():
+            pipeline.process(kobj_queue.q.get())
+
+    loader.load_all()
+    run_pipeline()
+    rid = HackMDNote("aa")
+    assert cache.exists(rid)
+    assert note_index.get(rid) is not None
+
+    (mock_dir / "a.json").unlink()
+    loader.load_all()
+    run_pipeline()
+    assert not cache.exists(rid)
+    assert note_index.get(rid) is None
+
+
+def test_fast_mode_takes_rids_from_filenames(tmp_path):
+    rid = HackMDNote("abc123", "team")
+    (tmp_path / f"{b64_encode(str(rid))}.json").write_text(json.dumps({
+        # Manifest RID is ignored in fast mode
+        "manifest": {"rid": "not-a-hackmd-rid"},
+        "contents": {"note_id": "abc123", "title": "A"},
+    }))
+    kobj_queue = Mock()
+    loader = HackMDMockLoader(str(tmp_path), kobj_queue, fast=True, workers=4)
+
+    assert loader.load_all() == 1
+    assert kobj_queue.push.call_args.kwargs["bundle"].rid == rid
+
+
+def test_ndjson_dump_is_streamed_in_batches(tmp_path):
+    dump = tmp_path / "dump.ndjson"
+    with open(dump, "w") as f:
+        for i in range(5):
+            f.write(json.dumps({
+                "manifest": {"rid": f"orn:hackmd.note:{i:04x}"},
+                "contents": {"note_id": f"{i:04x}", "title": str(i)},
+            }) + "\n")
+    kobj_queue = Mock()
+    throttle = Mock()
+    loader = HackMDMockLoader(str(dump), kobj_queue, batch_size=2, throttle=throttle)
+
+    assert [len(batch) for batch in loader.iter_batches()] == [2, 2, 1]
+    assert loader.load_all() == 5
+    assert throttle.call_count == 3
+    # An unchanged dump is skipped on the next scan
+    assert loader.load_all() == 0
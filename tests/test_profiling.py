@@ -0,0 +1,110 @@
+import signal
+import time
+import types
+from unittest.mock import Mock
+
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from koi_net_hackmd_sensor_node.profiling import PollProfiler, record_poll, span
+from tests.test_ingestion import make_client, make_config
+
+
+def test_spans_nest_and_follow_fetch_threads():
+    client = HackMDClient(api_token="token", max_concurrent_requests=4)
+
+    def fetch(item):
+        with span("http"):
+            time.sleep(0.01)
+        return item
+
+    with span("ignored"):
+        pass
+    with record_poll() as spans:
+        with span("fetch"):
+            assert client.map_concurrent(fetch, [1, 2, 3, 4]) == [1, 2, 3, 4]
+
+    summary = spans.summary()
+    assert set(summary) == {"fetch", "fetch.http"}
+    assert summary["fetch.http"]["count"] == 4
+    assert summary["fetch.http"]["ms"] >= 40
+
+
+def test_poll_logs_one_stage_summary(tmp_path, hackmd_payload):
+    service = HackMDIngestionService(make_config(tmp_path), Mock())
+    service.client = make_client(hackmd_payload, [], ["a", "b"])
+
+    with structlog.testing.capture_logs() as logs:
+        service.poll_once()
+
+    summaries = [entry for entry in logs if entry["event"] == "HackMD poll timings"]
+    assert len(summaries) == 1
+    stages = summaries[0]["stages"]
+    for stage in ("list", "list.http", "select", "fetch", "emit", "emit.hash", "emit.push", "state_write"):
+        assert stage in stages, stage
+    assert stages["emit.push"]["count"] == 1
+    assert summaries[0]["failed"] is False
+
+
+def test_profiler_writes_one_file_for_requested_polls(tmp_path):
+    profiler = PollProfiler(str(tmp_path), interval=0.001)
+    with profiler.poll():
+        time.sleep(0.01)
+    assert not list(tmp_path.iterdir())
+
+    assert profiler.request(2) == 2
+    with profiler.poll():
+        time.sleep(0.03)
+    assert profiler.armed == 1 and not list(tmp_path.iterdir())
+    with profiler.poll():
+        time.sleep(0.03)
+
+    files = list(tmp_path.glob("hackmd-poll-*.folded"))
+    assert len(files) == 1 and profiler.last_output == str(files[0])
+    lines = files[0].read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("test_profiler_writes_one_file_for_requested_polls" in line for line in lines)
+    assert profiler.armed == 0
+
+
+def test_profile_route_requires_token_and_clamps_polls(tmp_path):
+    config = make_config(tmp_path)
+    config.hackmd.profiling_enabled = True
+    config.hackmd.profile_dir = str(tmp_path / "profiles")
+    config.hackmd.profile_token = "s3cret"
+    server = types.SimpleNamespace(app=FastAPI())
+    service = HackMDIngestionService(config, Mock(), server=server)
+    previous = signal.getsignal(signal.SIGUSR2)
+    try:
+        service._start_profiler()
+        client = TestClient(server.app)
+        unauthorized = client.post("/hackmd/profile", params={"polls": 3})
+        wrong = client.post("/hackmd/profile", headers={"Authorization": "Bearer nope"})
+        assert service.profiler.armed == 0
+        response = client.post(
+            "/hackmd/profile", params={"polls": 10_000}, headers={"Authorization": "Bearer s3cret"}
+        )
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+    assert unauthorized.status_code == wrong.status_code == 401
+    assert response.status_code == 202
+    assert response.json()["armed"] == service.profiler.max_polls == 10
+    assert service.profiler.armed == 10
+
+
+def test_profile_route_is_not_mounted_without_token(tmp_path):
+    config = make_config(tmp_path)
+    config.hackmd.profiling_enabled = True
+    server = types.SimpleNamespace(app=FastAPI())
+    service = HackMDIngestionService(config, Mock(), server=server)
+    previous = signal.getsignal(signal.SIGUSR2)
+    try:
+        service._start_profiler()
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+    assert TestClient(server.app).post("/hackmd/profile").status_code == 404
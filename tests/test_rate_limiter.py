@@ -0,0 +1,63 @@
+import types
+
+from koi_net_hackmd_sensor_node.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1_760_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def response(status=200, **headers):
+    return types.SimpleNamespace(status_code=status, headers=headers)
+
+
+def test_static_rate_paces_after_burst():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0.5
+    assert limiter.reserve() == 1.0
+
+
+def test_exhausted_quota_waits_until_reset():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    limiter.observe(response(**{
+        "x-ratelimit-userlimit": "100",
+        "x-ratelimit-userremaining": "0",
+        "x-ratelimit-userreset": str(int(clock.now + 30)),
+    }))
+    assert limiter.reserve() == 30
+    # After the reset the full quota is assumed again
+    clock.now += 30
+    assert limiter.reserve() == 0
+    assert limiter.stats()["remaining"] == 98
+
+
+def test_low_quota_is_spread_across_window():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    limiter.observe(response(**{
+        "x-ratelimit-limit": "100",
+        "x-ratelimit-remaining": "5",
+        "x-ratelimit-reset": "50",
+    }))
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 10
+    assert limiter.stats()["utilization"] == 0.97
+
+
+def test_retry_after_blocks_all_callers():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    assert limiter.observe(response(429, **{"retry-after": "7"})) == 7
+    assert limiter.throttle_remaining() == 7
+    assert limiter.reserve() == 7
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["wait_seconds"] == 7
@@ -0,0 +1,51 @@
+from koi_net_hackmd_sensor_node.schedule import AdaptiveSchedule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unchanged_notes_back_off_exponentially_to_max():
+    clock = FakeClock()
+    schedule = AdaptiveSchedule(min_interval=10, max_interval=60, clock=clock)
+    schedule.observe("cold", 1000)
+    intervals = []
+    for _ in range(4):
+        clock.now += schedule.interval("cold")
+        assert schedule.due(["cold"]) == ["cold"]
+        schedule.observe("cold", 1000)
+        intervals.append(schedule.interval("cold"))
+    assert intervals == [20, 40, 60, 60]
+
+
+def test_frequently_changed_notes_stay_hot():
+    clock = FakeClock()
+    schedule = AdaptiveSchedule(min_interval=5, max_interval=3600, clock=clock)
+    schedule.observe("hot", 0)
+    schedule.observe("cold", 0)
+    for i in range(1, 4):
+        clock.now += 30
+        schedule.observe("hot", i * 30_000)
+        schedule.observe("cold", 0)
+    assert schedule.interval("hot") == 15
+    assert schedule.interval("cold") == 40
+
+    clock.now += 15
+    assert schedule.due(["hot", "cold", "new"]) == ["hot", "new"]
+    assert schedule.seconds_until_next_due(["hot", "cold"]) == 0
+
+
+def test_missing_notes_back_off_instead_of_staying_due():
+    clock = FakeClock()
+    schedule = AdaptiveSchedule(min_interval=10, max_interval=30, clock=clock)
+    schedule.miss("gone")
+    assert schedule.due(["gone"]) == []
+    assert schedule.seconds_until_next_due(["gone"]) == 10
+    for expected in (20, 30, 30):
+        clock.now += schedule.interval("gone")
+        schedule.miss("gone")
+        assert schedule.interval("gone") == expected
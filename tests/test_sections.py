@@ -0,0 +1,47 @@
+from rid_lib import RID
+
+from koi_net_hackmd_sensor_node.sections import HackMDNoteSection, split_sections
+
+NOTE = """Intro text.
+
+# Setup
+Install things.
+## Install
+pip install it
+```bash
+# not a heading
+```
+#### Deep heading stays inside
+## Install
+again
+# Usage #
+Run it.
+"""
+
+
+def test_split_sections_uses_heading_paths():
+    sections = split_sections(NOTE)
+    assert [s.section_id for s in sections] == [
+        "_preamble", "setup", "setup/install", "setup/install-2", "usage",
+    ]
+    assert sections[2].heading == "Install"
+    assert "# not a heading" in sections[2].content
+    assert "#### Deep heading" in sections[2].content
+    assert sections[4].heading == "Usage"
+    assert "".join(s.content for s in sections) == NOTE
+
+
+def test_section_ids_are_stable_across_unrelated_edits():
+    edited = NOTE.replace("Install things.", "Install many things first.")
+    before = {s.section_id: s.content for s in split_sections(NOTE)}
+    after = {s.section_id: s.content for s in split_sections(edited)}
+    assert before.keys() == after.keys()
+    assert [k for k in before if before[k] != after[k]] == ["setup"]
+
+
+def test_section_rid_round_trips():
+    rid = HackMDNoteSection("abc123", "setup/install", "team")
+    assert str(rid) == "orn:hackmd.note.section:team/abc123#setup/install"
+    parsed = RID.from_string(str(rid))
+    assert isinstance(parsed, HackMDNoteSection)
+    assert (parsed.workspace_id, parsed.note_id, parsed.section_id) == ("team", "abc123", "setup/install")
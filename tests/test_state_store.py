@@ -0,0 +1,72 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from koi_net_hackmd_sensor_node.state_store import (
+    JSONStateStore,
+    StateStore,
+    SQLiteStateStore,
+    open_state_store,
+)
+
+
+def test_json_store_commit_is_atomic_rewrite(tmp_path):
+    path = tmp_path / "state" / "hackmd_state.json"
+    store = JSONStateStore(str(path))
+    store["team/note-1"] = 10
+    store.commit()
+    assert json.loads(path.read_text()) == {"team/note-1": 10}
+    assert not (tmp_path / "state" / "hackmd_state.json.tmp").exists()
+    assert JSONStateStore(str(path))["team/note-1"] == 10
+
+
+def test_json_store_fsyncs_before_replacing(tmp_path, monkeypatch):
+    path = tmp_path / "hackmd_state.json"
+    events = []
+    monkeypatch.setattr(os, "fsync", lambda fd: events.append("fsync"))
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda *args: (events.append("replace"), real_replace(*args)))
+
+    store = JSONStateStore(str(path))
+    store["a"] = 1
+    store.commit()
+    assert events == ["fsync", "replace"]
+
+
+def test_state_store_backends_must_implement_commit():
+    class NoCommit(StateStore):
+        __getitem__ = __setitem__ = __delitem__ = __iter__ = __len__ = None
+
+    with pytest.raises(TypeError):
+        NoCommit()
+
+
+def test_sqlite_store_persists_only_committed_writes(tmp_path):
+    path = tmp_path / "state.sqlite3"
+    store = SQLiteStateStore(str(path))
+    store["a"] = 1
+    store.commit()
+    store["b"] = 2
+    assert store.get("b") == 2
+
+    # A second connection only sees the committed row
+    rows = sqlite3.connect(path).execute("SELECT key FROM state").fetchall()
+    assert rows == [("a",)]
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sqlite_backend_migrates_json_state(tmp_path):
+    json_path = tmp_path / "hackmd_state.json"
+    json_path.write_text(json.dumps({"team/note-1": 10, "note-2": 20}))
+
+    store = open_state_store("sqlite", str(json_path))
+    assert isinstance(store, SQLiteStateStore)
+    assert dict(store) == {"team/note-1": 10, "note-2": 20}
+    assert not json_path.exists()
+    assert (tmp_path / "hackmd_state.json.migrated").exists()
+    store.close()
+
+    reopened = open_state_store("sqlite", str(json_path))
+    assert reopened["note-2"] == 20
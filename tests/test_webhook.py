@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+import types
+from unittest.mock import Mock
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from koi_net_hackmd_sensor_node.hackmd_client import HackMDClient
+from koi_net_hackmd_sensor_node.ingestion import HackMDIngestionService
+from koi_net_hackmd_sensor_node.webhook import (
+    SIGNATURE_HEADER,
+    WebhookDebouncer,
+    note_refs,
+    sign_payload,
+    verify_signature,
+)
+from tests.test_ingestion import make_client, make_config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def send(client, secret, payload):
+    """Post `payload` the way HackMD would, signed with `secret`."""
+    body = json.dumps(payload).encode()
+    return client.post(
+        "/hackmd/webhook",
+        content=body,
+        headers={SIGNATURE_HEADER: sign_payload(secret, body), "Content-Type": "application/json"},
+    )
+
+
+def test_verify_signature():
+    body = b'{"noteId": "abc"}'
+    signature = sign_payload("s3cret", body)
+    assert verify_signature("s3cret", body, signature)
+    assert verify_signature("s3cret", body, signature.removeprefix("sha256="))
+    assert not verify_signature("other", body, signature)
+    assert not verify_signature("s3cret", body + b" ", signature)
+    assert not verify_signature("s3cret", body, None)
+
+
+def test_note_refs_accepts_event_shapes():
+    assert note_refs({"event": "note.updated", "note": {"id": "a", "teamPath": "team"}}) == [("a", "team")]
+    assert note_refs({"noteId": "b"}) == [("b", None)]
+    assert note_refs({"notes": [{"id": "c"}, {"id": "d"}]}) == [("c", None), ("d", None)]
+    assert note_refs({"event": "ping"}) == []
+
+
+def test_debouncer_coalesces_bursts_per_note():
+    clock = FakeClock()
+    debouncer = WebhookDebouncer(Mock(), delay=2.0, clock=clock)
+    debouncer.submit([("a", None)])
+    clock.now = 1.5
+    debouncer.submit([("a", None), ("b", None)])
+    clock.now = 3.0
+    # "a" was re-triggered at 1.5, so it isn't due yet
+    assert debouncer.due() == []
+    clock.now = 3.5
+    assert sorted(debouncer.due()) == [("a", None), ("b", None)]
+    assert debouncer.due() == []
+    assert (debouncer.received, debouncer.flushed) == (3, 2)
+
+
+def test_debouncer_flushes_continuously_edited_note_after_max_wait():
+    clock = FakeClock()
+    debouncer = WebhookDebouncer(Mock(), delay=2.0, max_wait=5.0, clock=clock)
+    for _ in range(4):
+        debouncer.submit([("busy", None)])
+        assert debouncer.due() == []
+        clock.now += 1.5
+    # Still being edited, but 5s have passed since the first event
+    assert debouncer.due() == [("busy", None)]
+    debouncer.submit([("busy", None)])
+    clock.now += 1.5
+    assert debouncer.due() == []
+
+
+def test_webhook_ignores_notes_outside_configured_workspaces(tmp_path):
+    config = make_config(tmp_path)
+    config.hackmd.workspace_ids = ["lab"]
+    service = HackMDIngestionService(config, Mock())
+    requested = []
+    service.client.get_note_metadata_for_ids = lambda ids: requested.extend(ids) or []
+
+    service.ingest_webhook_notes([("a", "lab"), ("b", "elsewhere"), ("c", None)])
+    assert requested == ["a", "c"]
+
+
+def test_webhook_fetches_only_affected_note_once(tmp_path, hackmd_payload):
+    config = make_config(tmp_path)
+    config.hackmd.webhook_enabled = True
+    config.hackmd.webhook_secret = "s3cret"
+    config.hackmd.webhook_debounce_seconds = 0.05
+    kobj_queue = Mock()
+    server = types.SimpleNamespace(app=FastAPI())
+    service = HackMDIngestionService(config, kobj_queue, server=server)
+    fetched = []
+    service.client = make_client(hackmd_payload, fetched, ["other-note", hackmd_payload["id"]])
+    assert service.poll_interval == 3600
+
+    flushed = threading.Event()
+    ingest = service.ingest_webhook_notes
+    service.webhook.debouncer.flush = lambda refs: (ingest(refs), flushed.set())
+    service._start_webhook()
+    try:
+        http = TestClient(server.app)
+        event = {"event": "note.updated", "note": {"id": hackmd_payload["id"]}}
+        for _ in range(3):
+            assert send(http, "s3cret", event).status_code == 202
+        assert send(http, "wrong", event).status_code == 401
+        assert flushed.wait(2)
+        time.sleep(0.1)
+    finally:
+        service.stop()
+
+    assert fetched == [hackmd_payload["id"]]
+    kobj_queue.push.assert_called_once()
+    assert service.webhook.rejected == 1
+
+    # A replayed event for the same revision is deduped against ingestion state
+    assert service.ingest_webhook_notes([(hackmd_payload["id"], None)]) == 0
+    kobj_queue.push.assert_called_once()
+
+
+def test_webhook_flush_during_poll_does_not_emit_twice(tmp_path, hackmd_payload):
+    service = HackMDIngestionService(make_config(tmp_path), Mock())
+    listing = {k: v for k, v in hackmd_payload.items() if k != "content"}
+    fetching = threading.Event()
+    release = threading.Event()
+
+    def handler(request):
+        if request.url.path == "/v1/notes":
+            return httpx.Response(200, json=[listing])
+        # Hold every content fetch until both paths are in flight
+        fetching.set()
+        assert release.wait(5)
+        return httpx.Response(200, json=hackmd_payload)
+
+    service.client = HackMDClient(api_token="token")
+    service.client.client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    poll = threading.Thread(target=service.poll_once)
+    poll.start()
+    assert fetching.wait(2)
+    flushed = []
+    flush = threading.Thread(
+        target=lambda: flushed.append(service.ingest_webhook_notes([(hackmd_payload["id"], None)]))
+    )
+    flush.start()
+    time.sleep(0.1)
+    release.set()
+    poll.join(5)
+    flush.join(5)
+
+    # The flush waited for the poll's checkpoint and found nothing new
+    assert flushed == [0]
+    service.kobj_queue.push.assert_called_once()
+    assert service.suppressed_updates == 0